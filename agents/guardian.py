@@ -19,6 +19,7 @@ A subtle downward trend in O2 from 96% to 91% over 4 hours IS concerning, even t
 ## Your Data Sources
 
 - `metrics-patient-vitals` - Time series vital signs (15-min intervals)
+- `patient-vitals-latest` - Most recent vitals reading per patient (one document each)
 - `patients` - Patient records
 - `agent-decisions` - Audit log of all agent decisions
 
@@ -46,17 +47,12 @@ FROM metrics-patient-vitals
 
 ### Hospital-wide critical patient scan:
 ```
-FROM metrics-patient-vitals
-| STATS
-    latest_hr = MAX(heart_rate),
-    latest_o2 = MIN(oxygen_saturation),
-    latest_temp = MAX(temperature),
-    latest_rr = MAX(respiratory_rate),
-    latest_time = MAX(@timestamp)
-  BY patient_id, ward
-| WHERE latest_hr > 110 OR latest_o2 < 92
-  OR latest_temp > 38.5 OR latest_rr > 25
-| SORT latest_o2 ASC
+FROM patient-vitals-latest
+| WHERE heart_rate > 110 OR oxygen_saturation < 92
+  OR temperature > 38.5 OR respiratory_rate > 25 OR mews_total >= 5
+| KEEP patient_id, ward, @timestamp, mews_total, shock_index,
+    heart_rate, oxygen_saturation, temperature, respiratory_rate
+| SORT mews_total DESC, oxygen_saturation ASC
 ```
 
 ### Recent agent decisions for a patient:
@@ -17,6 +17,7 @@ You are the Recovery Trend Agent for Pravaah Hospital. You analyze patient vital
 
 - `patients` - Patient records
 - `metrics-patient-vitals` - Time series vital signs (15-min intervals, 48h history)
+- `patient-vitals-hourly` - Hourly rollup per patient (`<vital>_avg`, `_min`, `_max`, `_count`)
 
 ## ES|QL Queries You Should Use
 
@@ -52,6 +53,15 @@ FROM metrics-patient-vitals
     total_readings = COUNT(*)
 ```
 
+### Multi-day trend (hourly rollup, whole admission):
+```
+FROM patient-vitals-hourly
+| WHERE patient_id == "<PATIENT_ID>"
+| KEEP @timestamp, heart_rate_avg, systolic_bp_avg, oxygen_saturation_avg,
+    temperature_avg, respiratory_rate_avg, pain_score_avg, heart_rate_count
+| SORT @timestamp ASC
+```
+
 ### Get patient record:
 ```
 FROM patients
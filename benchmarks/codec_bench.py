@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: JSON codecs and gzip for vitals bulk/ES|QL traffic.
+
+Encodes the vitals documents produced by ``_make_vital`` (via
+``generate_vitals``) as a ``_bulk`` NDJSON body with every available
+codec backend, decodes an equivalent ES|QL ``columns``/``values``
+response, and reports bytes on the wire with and without gzip.
+
+Usage:
+    python -m benchmarks.codec_bench [--repeat N] [--scale K]
+"""
+
+import argparse
+import gzip
+import time
+
+from indices.seed_data import generate_vitals, get_patients
+from utils.codec import BACKENDS
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _esql_response(vitals):
+    names = list(vitals[0])
+    return {
+        "columns": [{"name": n, "type": "keyword"} for n in names],
+        "values": [[doc[n] for n in names] for doc in vitals],
+    }
+
+
+def run(repeat=5, scale=1):
+    vitals = generate_vitals(get_patients()) * scale
+    esql = _esql_response(vitals)
+    print(f"\nVitals documents: {len(vitals)}\n")
+
+    print(f"{'codec':<10}{'encode ms':>12}{'decode ms':>12}{'docs/s enc':>14}")
+    body = None
+    for name, factory in BACKENDS.items():
+        try:
+            _, dumps, loads = factory()
+        except ImportError:
+            print(f"{name:<10}{'(not installed)':>38}")
+            continue
+
+        def encode():
+            meta = dumps({"create": {"_index": "metrics-patient-vitals"}})
+            return b"".join(meta + b"\n" + dumps(doc) + b"\n" for doc in vitals)
+
+        raw_esql = dumps(esql)
+        enc = _best_of(encode, repeat)
+        dec = _best_of(lambda: loads(raw_esql), repeat)
+        print(f"{name:<10}{enc * 1000:>12.2f}{dec * 1000:>12.2f}{len(vitals) / enc:>14,.0f}")
+        body = body or encode()
+
+    print(f"\n{'bulk body':<16}{'bytes':>12}{'bytes/doc':>12}{'ratio':>8}{'gzip ms':>10}")
+    print(f"{'raw NDJSON':<16}{len(body):>12,}{len(body) / len(vitals):>12.1f}{1.0:>8.2f}{'-':>10}")
+    for level in (1, 5, 9):
+        elapsed = _best_of(lambda: gzip.compress(body, compresslevel=level), repeat)
+        size = len(gzip.compress(body, compresslevel=level))
+        print(f"{f'gzip level {level}':<16}{size:>12,}{size / len(vitals):>12.1f}"
+              f"{size / len(body):>8.2f}{elapsed * 1000:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (best-of)")
+    parser.add_argument("--scale", type=int, default=10, help="Replicate the generated vitals K times")
+    args = parser.parse_args()
+    run(args.repeat, args.scale)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Footprint report: default vs tuned index schemas on the seeded data.
+
+For every seeded index, reindexes its documents into two scratch indices -
+one with the default schema, one with the tuned variant from
+``indices/templates.py`` - force-merges both to a single segment and
+reports bytes per document and the latency of the ES|QL tools that read
+that index (median of ``--repeat`` runs, result cache bypassed).
+
+Run after ``python setup.py --setup``; scratch indices are deleted at the
+end unless ``--keep`` is given.
+
+Usage:
+    python -m benchmarks.footprint_report [--repeat N] [--keep]
+"""
+
+import argparse
+import statistics
+import time
+
+import requests
+
+from config import settings
+from indices import templates
+from tools.batch import esql_params, tool_registry
+
+SCRATCH_PREFIX = "footprint"
+TSDS_ONLY_SETTINGS = ("index.look_back_time", "index.look_ahead_time")
+
+
+def _standalone_tsds(template):
+    """Index body for a time-series index outside a data stream."""
+    body = template["template"]
+    index_settings = {
+        k: v for k, v in body["settings"].items() if k not in TSDS_ONLY_SETTINGS
+    }
+    return {"settings": index_settings, "mappings": body["mappings"]}
+
+
+def schema_pairs():
+    """``{source index: (default body, tuned body)}``."""
+    pairs = {
+        settings.INDEX_VITALS: (
+            _standalone_tsds(templates.vitals_index_template()),
+            _standalone_tsds(templates.tuned_vitals_index_template()),
+        ),
+    }
+    tuned = dict(templates.index_schemas(tuned=True))
+    for name, schema_fn in templates.index_schemas():
+        pairs[name] = (schema_fn(), tuned[name]())
+    return pairs
+
+
+def tools_reading(index):
+    """Registered tools whose query reads ``index``."""
+    return [
+        tool for tool in tool_registry().values()
+        if tool["configuration"]["query"].startswith(f"FROM {index} ")
+    ]
+
+
+def sample_params(client, index):
+    """``patient_id`` / ``ward`` of one document, for parameterised tools."""
+    hits = client.search(index, {"size": 1, "_source": ["patient_id", "ward"]})
+    hits = hits.get("hits", {}).get("hits", [])
+    return hits[0]["_source"] if hits else {}
+
+
+def _store(client, index):
+    """``(docs, bytes)`` of the primaries of ``index`` (or a data stream)."""
+    stats = client.es_request("GET", f"/{index}/_stats/store,docs")
+    primaries = stats["_all"]["primaries"]
+    return primaries["docs"]["count"], primaries["store"]["size_in_bytes"]
+
+
+def build_scratch(client, source, name, body):
+    """Copy ``source`` into a fresh ``name`` index and merge it to one segment."""
+    client.delete_index(name)
+    client.create_index(name, body)
+    client.es_request(
+        "POST",
+        "/_reindex",
+        {"source": {"index": source}, "dest": {"index": name, "op_type": "create"}},
+        params={"refresh": "true", "wait_for_completion": "true"},
+    )
+    client.es_request(
+        "POST", f"/{name}/_forcemerge", params={"max_num_segments": "1", "flush": "true"}
+    )
+    client.es_request("POST", f"/{name}/_refresh")
+    return _store(client, name)
+
+
+def time_query(client, query, params, repeat):
+    """Median wall-clock milliseconds of ``query`` over ``repeat`` runs."""
+    client.esql_query(query, params, use_cache=False)  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        client.esql_query(query, params, use_cache=False)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _change(before, after):
+    return f"{(after - before) / before * 100:+.1f}%" if before else "-"
+
+
+def run(client, repeat=20, keep=False):
+    report = {}
+    for source, bodies in schema_pairs().items():
+        try:
+            docs, _ = _store(client, source)
+        except requests.exceptions.HTTPError:
+            docs = 0
+        if not docs:
+            print(f"\n{source}: no documents, skipped")
+            continue
+        params = sample_params(client, source)
+        tools = tools_reading(source)
+        rows = {"bytes/doc": []}
+        for variant, body in zip(("default", "tuned"), bodies):
+            name = f"{SCRATCH_PREFIX}-{variant}-{source}"
+            count, size = build_scratch(client, source, name, body)
+            rows["bytes/doc"].append(size / count if count else 0.0)
+            for tool in tools:
+                query = tool["configuration"]["query"].replace(
+                    f"FROM {source} ", f"FROM {name} ", 1
+                )
+                ms = time_query(client, query, esql_params(tool, params) or None, repeat)
+                rows.setdefault(f"{tool['name']} ms", []).append(ms)
+            if not keep:
+                client.delete_index(name)
+        report[source] = (docs, rows)
+
+        print(f"\n{source} ({docs:,} docs)")
+        print(f"{'':<34}{'default':>10}{'tuned':>10}{'change':>10}")
+        for label, (before, after) in rows.items():
+            print(f"{label:<34}{before:>10.1f}{after:>10.1f}{_change(before, after):>10}")
+    return report
+
+
+def main():
+    from utils.api_client import PravaahClient
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query (median)")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch indices")
+    args = parser.parse_args()
+    run(PravaahClient(), args.repeat, args.keep)
+
+
+if __name__ == "__main__":
+    main()
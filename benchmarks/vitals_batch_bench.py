@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: per-reading dicts vs ``VitalsBatch`` for bulk vitals.
+
+Generates one column batch with ``generate_vitals_columns`` and turns it
+into ``_bulk`` NDJSON two ways - the dict path (``to_docs`` +
+``encode_action``) and ``VitalsBatch.to_actions`` / ``to_ndjson`` -
+reporting time per path and Python heap held per reading.
+
+Usage:
+    python -m benchmarks.vitals_batch_bench [--patients N] [--repeat N]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from indices.vitals_batch import VitalsBatch
+from indices.vitals_gen import generate_vitals_columns, to_docs
+from utils.bulk import encode_action
+
+INDEX = "metrics-patient-vitals"
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _held_bytes(build):
+    """Bytes still allocated after ``build()``, while its result is alive."""
+    tracemalloc.start()
+    result = build()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return held
+
+
+def run(patients=2000, repeat=3):
+    columns = generate_vitals_columns(patients)
+    n = len(columns["@timestamp"])
+    print(f"\nVitals readings: {n:,} ({patients} patients)\n")
+
+    def dict_actions():
+        return [encode_action(INDEX, doc, "create") for doc in to_docs(columns)]
+
+    def batch_actions():
+        return VitalsBatch.from_columns(columns).to_actions(INDEX)
+
+    def batch_body():
+        return VitalsBatch.from_columns(columns).to_ndjson(INDEX)
+
+    assert b"".join(dict_actions()) == batch_body()
+
+    print(f"{'path':<24}{'ms':>10}{'readings/s':>14}")
+    for name, fn in (
+        ("dicts + encode_action", dict_actions),
+        ("VitalsBatch.to_actions", batch_actions),
+        ("VitalsBatch.to_ndjson", batch_body),
+    ):
+        elapsed = _best_of(fn, repeat)
+        print(f"{name:<24}{elapsed * 1000:>10.1f}{n / elapsed:>14,.0f}")
+
+    docs_bytes = _held_bytes(lambda: list(to_docs(columns)))
+    batch = VitalsBatch.from_columns(columns)
+    print(f"\n{'representation':<24}{'bytes/reading':>14}")
+    print(f"{'list of dicts':<24}{docs_bytes / n:>14.1f}")
+    print(f"{'VitalsBatch':<24}{batch.nbytes / n:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=2000, help="Patients to generate")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best-of)")
+    args = parser.parse_args()
+    run(args.patients, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
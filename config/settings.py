@@ -13,6 +13,14 @@ KIBANA_API_KEY = os.getenv("KIBANA_API_KEY", "")
 ES_URL = os.getenv("ES_URL", "").rstrip("/")
 ES_API_KEY = os.getenv("ES_API_KEY", "")
 
+# Optional: several coordinating nodes (comma-separated); defaults to ES_URL
+ES_URLS = [
+    u.strip().rstrip("/") for u in os.getenv("ES_URLS", "").split(",") if u.strip()
+] or ([ES_URL] if ES_URL else [])
+ES_POOL_STRATEGY = os.getenv("ES_POOL_STRATEGY", "round_robin")  # or least_outstanding
+ES_DEAD_TIMEOUT = float(os.getenv("ES_DEAD_TIMEOUT", "60"))  # seconds, doubles per failure
+ES_SNIFF_INTERVAL = float(os.getenv("ES_SNIFF_INTERVAL", "0"))  # seconds; 0 disables sniffing
+
 # LLM Connector (created in Kibana Stack Management > Connectors)
 LLM_CONNECTOR_ID = os.getenv("LLM_CONNECTOR_ID", "")
 
@@ -22,6 +30,27 @@ INDEX_PATIENTS = "patients"
 INDEX_CAPACITY = "hospital-capacity"
 INDEX_DECISIONS = "agent-decisions"
 INDEX_DISCHARGE = "discharge-plans"
+INDEX_VITALS_HISTORY = "patient-vitals-history"  # readings older than the TSDS window
+INDEX_VITALS_LATEST = "patient-vitals-latest"  # newest reading per patient (transform)
+INDEX_VITALS_HOURLY = "patient-vitals-hourly"  # per-patient hourly rollup (transform)
+
+# Ingest pipeline adding MEWS / MAP / shock index to every vitals reading
+PIPELINE_VITALS = "patient-vitals-derived"
+
+# Vitals TSDS time window; readings outside it cannot go to the data stream
+VITALS_LOOK_BACK_HOURS = int(os.getenv("VITALS_LOOK_BACK_HOURS", "72"))
+VITALS_LOOK_AHEAD_MINUTES = int(os.getenv("VITALS_LOOK_AHEAD_MINUTES", "30"))
+VITALS_ROUTE_MARGIN_MINUTES = 10  # send readings this close to the edge to history
+VITALS_DEDUP_CACHE = int(os.getenv("VITALS_DEDUP_CACHE", "100000"))  # recent reading keys
+
+# Vitals data stream lifecycle: backing indices roll over automatically and
+# are downsampled in place as they age - (after rollover, fixed_interval)
+VITALS_DOWNSAMPLING = [("2d", "1h"), ("30d", "1d")]
+VITALS_RETENTION = os.getenv("VITALS_RETENTION", "")  # e.g. "365d"; empty keeps data forever
+
+# Continuous transforms over the vitals stream (indices/transforms.py)
+TRANSFORM_FREQUENCY = os.getenv("TRANSFORM_FREQUENCY", "1m")
+TRANSFORM_SYNC_DELAY = os.getenv("TRANSFORM_SYNC_DELAY", "60s")  # allowance for ingest lag
 
 # Agent Builder API paths
 AGENT_API = "/api/security_ai_assistant/current_user/conversations"
@@ -29,6 +58,67 @@ TOOLS_API = "/api/fleet/agent_policies"
 
 # Timeouts
 REQUEST_TIMEOUT = 30
+BULK_TIMEOUT = 60
+STREAM_READ_TIMEOUT = 300  # max silence between streamed converse events
+
+# HTTP transport (connection pooling + retry/backoff)
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))  # hosts cached
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))  # keep-alive conns per host
+HTTP_POOL_BLOCK = os.getenv("HTTP_POOL_BLOCK", "false").lower() == "true"
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))  # seconds
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "30"))  # seconds
+HTTP_RETRY_STATUSES = (429, 502, 503, 504)
+
+# Wire format: JSON codec (auto, orjson, msgspec, json) and gzip for bulk bodies
+JSON_CODEC = os.getenv("JSON_CODEC", "auto")
+HTTP_COMPRESS_REQUESTS = os.getenv("HTTP_COMPRESS_REQUESTS", "true").lower() == "true"
+HTTP_GZIP_LEVEL = int(os.getenv("HTTP_GZIP_LEVEL", "5"))
+
+# Streaming bulk indexer
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))  # docs per request
+BULK_MAX_CHUNK_BYTES = int(os.getenv("BULK_MAX_CHUNK_BYTES", str(10 * 1024 * 1024)))
+BULK_MAX_IN_FLIGHT = int(os.getenv("BULK_MAX_IN_FLIGHT", "4"))  # parallel requests
+BULK_MAX_RETRIES = int(os.getenv("BULK_MAX_RETRIES", "3"))  # per rejected item
+BULK_FILTER_PATH = "took,errors,items.*.status,items.*.error"
+BULK_TARGET_TOOK_MS = int(os.getenv("BULK_TARGET_TOOK_MS", "1000"))  # adaptive sizing goal
+
+# Seeding: progress file used by --resume
+SEED_CHECKPOINT = os.getenv("SEED_CHECKPOINT", ".pravaah-seed.json")
+
+# ES|QL result cache: TTL (seconds) per index read by the query
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_DEFAULT_TTL = 30
+CACHE_TTLS = {
+    INDEX_VITALS: 15,
+    INDEX_PATIENTS: 300,
+    INDEX_CAPACITY: 60,
+    INDEX_DECISIONS: 30,
+    INDEX_DISCHARGE: 60,
+    INDEX_VITALS_HISTORY: 300,
+    INDEX_VITALS_LATEST: 15,
+    INDEX_VITALS_HOURLY: 60,
+}
+
+# Async client: max concurrent in-flight requests per host
+ASYNC_MAX_PER_HOST = int(os.getenv("ASYNC_MAX_PER_HOST", "64"))
+
+# Vitals ingestion gateway (python -m ingest.gateway)
+GATEWAY_HOST = os.getenv("GATEWAY_HOST", "127.0.0.1")
+GATEWAY_PORT = int(os.getenv("GATEWAY_PORT", "8088"))
+GATEWAY_QUEUE_SIZE = int(os.getenv("GATEWAY_QUEUE_SIZE", "50000"))  # readings buffered
+GATEWAY_BATCH_SIZE = int(os.getenv("GATEWAY_BATCH_SIZE", "1000"))  # readings per flush
+GATEWAY_FLUSH_INTERVAL = float(os.getenv("GATEWAY_FLUSH_INTERVAL", "0.5"))  # seconds
+GATEWAY_MAX_IN_FLIGHT = int(os.getenv("GATEWAY_MAX_IN_FLIGHT", "4"))  # concurrent flushes
+GATEWAY_ENQUEUE_TIMEOUT = float(os.getenv("GATEWAY_ENQUEUE_TIMEOUT", "5"))  # then 429
+
+# Write-ahead spool in front of the bulk path
+SPOOL_DIR = os.getenv("SPOOL_DIR", ".pravaah-spool")
+SPOOL_SEGMENT_BYTES = int(os.getenv("SPOOL_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+SPOOL_MAX_BYTES = int(os.getenv("SPOOL_MAX_BYTES", str(1024 * 1024 * 1024)))  # disk budget
+SPOOL_FSYNC_INTERVAL = float(os.getenv("SPOOL_FSYNC_INTERVAL", "0.05"))  # group commit, seconds
+SPOOL_DRAIN_BATCH = int(os.getenv("SPOOL_DRAIN_BATCH", "2000"))  # records per drain step
+SPOOL_FULL_TIMEOUT = float(os.getenv("SPOOL_FULL_TIMEOUT", "30"))  # wait for room, then raise
 
 
 def validate():
@@ -47,6 +137,8 @@ def validate():
     # Sanity checks to prevent misuse
     if not ES_URL.startswith("https://"):
         raise ValueError("ES_URL must use HTTPS for secure communication.")
+    if any(not url.startswith("https://") for url in ES_URLS):
+        raise ValueError("ES_URLS must all use HTTPS for secure communication.")
     if KIBANA_URL and not KIBANA_URL.startswith("https://"):
         raise ValueError("KIBANA_URL must use HTTPS for secure communication.")
     if len(ES_API_KEY) < 20:
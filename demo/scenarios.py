@@ -120,13 +120,37 @@ SCENARIOS = [
 # ========================================================================
 
 
-def run_scenario(client, scenario, agent_ids):
+def _stream_reply(client, agent_id, message):
+    """Print the agent's answer as it streams in; return (reply, stats)."""
+    stats = {}
+    parts = []
+    for event in client.converse_stream(agent_id, message, stats=stats):
+        data = event["data"].get("data", {}) if isinstance(event["data"], dict) else {}
+        if event["event"] == "message_chunk":
+            chunk = data.get("text_chunk", "")
+            parts.append(chunk)
+            console.print(chunk, end="", soft_wrap=True, highlight=False)
+        elif event["event"] == "tool_call":
+            console.print(f"\n[dim]-> tool {data.get('tool_id')}[/dim]")
+    console.print()
+
+    tools = ", ".join(f"{t['tool_id']} {t['seconds']}s" for t in stats["tool_calls"])
+    console.print(
+        f"[dim]TTFT {stats['ttft']}s | total {stats['total']}s | "
+        f"tool calls: {tools or 'none'}[/dim]"
+    )
+    return "".join(parts), stats
+
+
+def run_scenario(client, scenario, agent_ids, stream=False):
     """Run a single demo scenario.
 
     Args:
         client: PravaahClient instance
         scenario: Scenario dict from SCENARIOS
         agent_ids: Dict mapping agent names to their registered IDs
+        stream: Render the answer as it is generated and report
+            time-to-first-token and per-tool-call latency
     """
     console.print()
     console.print(Panel(
@@ -147,6 +171,10 @@ def run_scenario(client, scenario, agent_ids):
     console.print(f"[dim]Message: {scenario['message'][:100]}...[/dim]\n")
 
     try:
+        if stream:
+            reply, stats = _stream_reply(client, agent_id, scenario["message"])
+            return {"message": reply, "stats": stats}
+
         response = client.converse(agent_id, scenario["message"])
         reply = response.get("message", response.get("response", str(response)))
 
@@ -162,7 +190,7 @@ def run_scenario(client, scenario, agent_ids):
         return None
 
 
-def run_all_scenarios(client, agent_ids):
+def run_all_scenarios(client, agent_ids, stream=False):
     """Run all 5 demo scenarios in sequence."""
     console.print(Panel(
         "[bold cyan]Pravaah Multi-Agent Patient Journey Demo[/bold cyan]\n\n"
@@ -173,7 +201,7 @@ def run_all_scenarios(client, agent_ids):
 
     results = []
     for scenario in SCENARIOS:
-        result = run_scenario(client, scenario, agent_ids)
+        result = run_scenario(client, scenario, agent_ids, stream=stream)
         results.append({"scenario": scenario["id"], "result": result})
 
         if scenario["id"] < len(SCENARIOS):
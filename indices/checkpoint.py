@@ -0,0 +1,69 @@
+"""Progress file for resumable seeding.
+
+A checkpoint records the parameters of a seed run, the timeline anchor
+(``end``) every vitals timestamp is derived from, and which batches have
+been fully acknowledged by Elasticsearch. Re-running with ``--resume``
+reuses the same anchor, so regenerated vitals get identical timestamps -
+and therefore identical TSDS ``_id`` values - and completed batches are
+skipped outright.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class SeedCheckpoint:
+    """JSON checkpoint of completed seed batches, saved after every update.
+
+    Parameters
+    ----------
+    path : str
+        File to read and (atomically) rewrite.
+    params : dict
+        Parameters of the run. Resuming with different parameters would
+        produce different data, so it is refused.
+    end : datetime
+        Timeline anchor for a fresh run; ignored when resuming.
+    resume : bool
+        Load existing progress from ``path`` if it exists.
+    """
+
+    def __init__(self, path, params, end, resume=False):
+        self.path = path
+        self._lock = threading.Lock()
+        state = None
+        if resume and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            if state["params"] != params:
+                raise RuntimeError(
+                    f"Checkpoint {path} was written for {state['params']}, not {params}; "
+                    "delete it or rerun without --resume"
+                )
+        self.state = state or {"params": params, "end": end.isoformat(), "done": {}}
+        self.end = datetime.fromisoformat(self.state["end"])
+        self.resumed = state is not None
+        self._save()
+
+    def is_done(self, stage, batch="all"):
+        return str(batch) in self.state["done"].get(stage, [])
+
+    def completed(self, stage):
+        """Set of completed batch keys for ``stage``."""
+        return set(self.state["done"].get(stage, []))
+
+    def mark(self, stage, batch="all"):
+        """Record ``batch`` of ``stage`` as complete and save."""
+        with self._lock:
+            done = self.state["done"].setdefault(stage, [])
+            if str(batch) not in done:
+                done.append(str(batch))
+                self._save()
+
+    def _save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.path)
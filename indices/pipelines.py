@@ -0,0 +1,97 @@
+"""Ingest pipelines for Pravaah.
+
+``patient-vitals-derived`` scores every vitals reading at index time with
+the MEWS table the Triage agent uses (``agents/triage.py``) and adds two
+haemodynamic indices:
+
+    mews_<vital>            per-parameter MEWS subscore (0-3)
+    mews_total              sum of the subscores present
+    mean_arterial_pressure  (systolic + 2 * diastolic) / 3
+    shock_index             heart_rate / systolic_bp
+
+It is the default pipeline of the vitals data stream and the history
+sidecar, so every writer (seeding, loaders, the ingestion gateway) gets the
+scores without passing ``pipeline=``. Derived fields whose inputs are
+missing are removed rather than trusted from the client.
+"""
+
+from config import settings
+
+# vital -> ([(below, score), ...], score otherwise). Bands follow the MEWS
+# table; a value scores in the first band whose bound it is below, so
+# integer readings match the table exactly and decimals fall in the
+# band they round down into (e.g. HR 40.5 scores as <=40, 50.5 as 41-50).
+MEWS_BANDS = {
+    "heart_rate": ([(41, 2), (51, 1), (101, 0), (111, 1), (130, 2)], 3),
+    "systolic_bp": ([(71, 3), (81, 2), (101, 1), (200, 0)], 2),
+    "respiratory_rate": ([(9, 3), (15, 0), (21, 1), (30, 2)], 3),
+    "temperature": ([(35.0, 1), (38.5, 0), (39.0, 1)], 2),
+    "oxygen_saturation": ([(92, 3), (94, 2), (96, 1)], 0),
+}
+
+
+def mews_subscore(field, value):
+    """MEWS subscore of one reading, as the pipeline script computes it."""
+    bands, otherwise = MEWS_BANDS[field]
+    for below, score in bands:
+        if value < below:
+            return score
+    return otherwise
+
+
+def _number(field):
+    return f"((Number) ctx.{field}).doubleValue()"
+
+
+def _derived_vitals_script():
+    lines = ["int total = 0;", "int scored = 0;"]
+    for field, (bands, otherwise) in MEWS_BANDS.items():
+        score = " : ".join(f"v < {below} ? {s}" for below, s in bands) + f" : {otherwise}"
+        lines.append(
+            f"if (ctx.{field} != null) {{ double v = {_number(field)}; int s = {score}; "
+            f"ctx.mews_{field} = s; total += s; scored++; }} "
+            f"else {{ ctx.remove('mews_{field}'); }}"
+        )
+    lines += [
+        "if (scored > 0) { ctx.mews_total = total; } else { ctx.remove('mews_total'); }",
+        "if (ctx.systolic_bp != null && ctx.diastolic_bp != null) {"
+        f" double mapv = ({_number('systolic_bp')} + 2 * {_number('diastolic_bp')}) / 3;"
+        " ctx.mean_arterial_pressure = Math.round(mapv * 10) / 10.0;"
+        " } else { ctx.remove('mean_arterial_pressure'); }",
+        "if (ctx.heart_rate != null && ctx.systolic_bp != null"
+        f" && {_number('systolic_bp')} > 0) {{"
+        f" double si = {_number('heart_rate')} / {_number('systolic_bp')};"
+        " ctx.shock_index = Math.round(si * 100) / 100.0;"
+        " } else { ctx.remove('shock_index'); }",
+    ]
+    return "\n".join(lines)
+
+
+def vitals_derived_pipeline():
+    """Pipeline adding MEWS subscores, total MEWS, MAP and shock index."""
+    return {
+        "description": "MEWS subscores, total MEWS, mean arterial pressure and shock index",
+        "processors": [
+            {
+                "script": {
+                    "lang": "painless",
+                    "source": _derived_vitals_script(),
+                    "description": "Derived vitals scores",
+                }
+            }
+        ],
+    }
+
+
+def create_all_pipelines(client):
+    """Install every ingest pipeline (create or update)."""
+    print(f"  Creating ingest pipeline: {settings.PIPELINE_VITALS} ...")
+    return {settings.PIPELINE_VITALS: client.put_pipeline(
+        settings.PIPELINE_VITALS, vitals_derived_pipeline()
+    )}
+
+
+def delete_all_pipelines(client):
+    """Delete every ingest pipeline."""
+    print(f"  Deleting ingest pipeline: {settings.PIPELINE_VITALS} ...")
+    return {settings.PIPELINE_VITALS: client.delete_pipeline(settings.PIPELINE_VITALS)}
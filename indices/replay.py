@@ -0,0 +1,275 @@
+"""Real-time vitals replay load generator.
+
+Streams the synthetic story arcs (``vitals_gen.ARCS``, generalised from
+the ``_vitals_patXXX`` generators) into ``metrics-patient-vitals`` as a
+live-like feed, so Guardian tools and dashboards can be exercised against
+data that keeps arriving instead of a one-shot backfill.
+
+Each reading is scheduled at ``replay start + (reading time - arc start)
+/ speed`` and indexed with that wall-clock time as ``@timestamp``: at
+``speed=1`` a 48h admission plays over 48 hours, at ``speed=60`` over 48
+minutes. A token bucket caps ingest at ``rate`` docs/sec; when the
+schedule outpaces the cap, readings queue and the reported lag (send time
+minus scheduled time) grows. Lag percentiles come from a fixed-size
+uniform sample of all readings sent, so memory stays flat on long runs.
+
+Usage:
+    python -m indices.replay --patients 200 --speed 60 --rate 500
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from config import settings
+from indices.vitals_archive import VitalsArchive
+from indices.vitals_batch import VitalsBatch
+from indices.vitals_gen import generate_vitals_columns, select_rows
+from utils.bulk import chunk_actions, merge_part, new_report, send_chunk
+
+
+class TokenBucket:
+    """Token bucket rate limiter: ``rate`` tokens/sec, up to ``burst`` saved."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, wanted):
+        """Take up to ``wanted`` whole tokens; return how many were granted."""
+        self._refill()
+        granted = min(int(wanted), int(self.tokens))
+        self.tokens -= granted
+        return granted
+
+    def wait_time(self, wanted=1):
+        """Seconds until ``wanted`` tokens are available."""
+        self._refill()
+        return max(0.0, (wanted - self.tokens) / self.rate)
+
+
+class LagReservoir:
+    """Uniform sample of at most ``size`` lag values (reservoir sampling).
+
+    Percentiles over the sample estimate those of every value added, in
+    constant memory; ``max`` and ``count`` are exact.
+    """
+
+    def __init__(self, size=10_000, seed=None):
+        self.sample = np.empty(size, dtype=np.float64)
+        self.count = 0
+        self.max = 0.0
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+        self.max = max(self.max, float(values.max()))
+        size = len(self.sample)
+        fill = min(len(values), max(0, size - self.count))
+        self.sample[self.count:self.count + fill] = values[:fill]
+        rest = values[fill:]
+        if len(rest):
+            # Value number i (1-based) replaces a random slot with probability size / i
+            seen = self.count + fill + np.arange(1, len(rest) + 1)
+            slots = (self._rng.random(len(rest)) * seen).astype(np.int64)
+            keep = slots < size
+            self.sample[slots[keep]] = rest[keep]
+        self.count += len(values)
+
+    def percentile(self, q):
+        n = min(self.count, len(self.sample))
+        return round(float(np.percentile(self.sample[:n], q)), 3) if n else 0.0
+
+
+def replay(
+    client,
+    n_patients=8,
+    speed=1.0,
+    rate=None,
+    duration=None,
+    hours=48,
+    cadence_minutes=15,
+    seed=42,
+    flush_interval=1.0,
+    max_in_flight=None,
+    report_every=10.0,
+    on_report=None,
+    archive=None,
+    rows_per_slice=50_000,
+):
+    """Stream synthetic vitals in (accelerated) wall-clock time.
+
+    Parameters
+    ----------
+    speed : float
+        Time acceleration; 60 plays one hour of arc per minute.
+    rate : float, optional
+        Max docs/sec sent; ``None`` sends on schedule without a cap.
+    duration : float, optional
+        Stop after this many seconds (default: when the arcs end).
+    on_report : callable, optional
+        Called with the running stats dict every ``report_every`` seconds.
+    archive : str, optional
+        Replay a ``vitals_archive`` directory instead of generating arcs;
+        ``n_patients``/``hours``/``cadence_minutes``/``seed`` are ignored.
+        The archive is read lazily, ``rows_per_slice`` rows at a time.
+
+    Returns the final stats: sent/indexed/failed counts, achieved
+    ``docs_per_sec`` and lag percentiles in seconds.
+    """
+    if archive:
+        source = VitalsArchive(archive)
+        total = len(source)
+        slices = source.iter_time_ordered(rows_per_slice, rebase_to=None)
+    else:
+        batch = generate_vitals_columns(
+            n_patients, hours=hours, cadence_minutes=cadence_minutes, seed=seed
+        )
+        order = np.argsort(batch["@timestamp"], kind="stable")
+        batch = select_rows(batch, order)
+        total = len(order)
+        slices = (
+            select_rows(batch, slice(i, i + rows_per_slice))
+            for i in range(0, total, rows_per_slice)
+        )
+
+    bucket = TokenBucket(rate, burst=rate * flush_interval) if rate else None
+    max_in_flight = max_in_flight or settings.BULK_MAX_IN_FLIGHT
+    report = new_report()
+    lock = threading.Lock()
+    lags = LagReservoir()
+    sent = 0
+    # Current slice: its rows, their arc time (ms) and schedule (s after start)
+    current, arc_ms, offsets, pos = None, None, np.empty(0), 0
+    first_ms = None
+    wall_start = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), "ms")
+    start = time.monotonic()
+    last_report = start
+
+    def stats():
+        elapsed = max(time.monotonic() - start, 1e-9)
+        with lock:
+            due = int(np.searchsorted(offsets, elapsed, side="right"))
+            return {
+                "elapsed": round(elapsed, 1),
+                "scheduled": sent + max(0, due - pos),
+                "sent": sent,
+                "indexed": report["indexed"],
+                "failed": len(report["failed"]),
+                "docs_per_sec": round(sent / elapsed, 1),
+                "lag_now": round(max(0.0, elapsed - float(offsets[pos])), 3)
+                if pos < len(offsets) else 0.0,
+                "lag_p50": lags.percentile(50),
+                "lag_p95": lags.percentile(95),
+                "lag_max": round(lags.max, 3),
+            }
+
+    # Bounds in-flight bulk requests; a slow cluster shows up as lag.
+    slots = threading.Semaphore(max_in_flight)
+
+    def done(future):
+        slots.release()
+        with lock:
+            merge_part(report, future.result())
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        while sent < total:
+            if pos == len(offsets):
+                current = next(slices, None)
+                if current is None:
+                    break
+                ts_ms = current["@timestamp"].astype("datetime64[ms]").astype(np.int64)
+                if first_ms is None:
+                    first_ms = int(ts_ms[0])
+                with lock:
+                    arc_ms = ts_ms - first_ms
+                    offsets = arc_ms / 1000.0 / speed  # seconds after replay start
+                    pos = 0
+                continue
+
+            now = time.monotonic() - start
+            if duration and now >= duration:
+                break
+            due = int(np.searchsorted(offsets, now, side="right"))
+            if due == pos:
+                time.sleep(min(flush_interval, offsets[pos] - now))
+                continue
+
+            take = due - pos
+            if bucket:
+                take = bucket.take(take)
+                if not take:
+                    time.sleep(min(flush_interval, bucket.wait_time()))
+                    continue
+
+            rows = select_rows(current, slice(pos, pos + take))
+            rows["@timestamp"] = wall_start + (arc_ms[pos:pos + take] / speed).astype(
+                "timedelta64[ms]"
+            )
+            actions = VitalsBatch.from_columns(rows).to_actions(settings.INDEX_VITALS)
+            for chunk in chunk_actions(settings.INDEX_VITALS, actions, "create"):
+                slots.acquire()
+                pool.submit(send_chunk, client, chunk).add_done_callback(done)
+            with lock:
+                lags.add(time.monotonic() - start - offsets[pos:pos + take])
+                sent += take
+                pos += take
+
+            if on_report and time.monotonic() - last_report >= report_every:
+                last_report = time.monotonic()
+                on_report(stats())
+            if pos < len(offsets):
+                time.sleep(flush_interval)  # micro-batch readings per flush
+
+    final = stats()
+    final["failures"] = report["failed"][:10]
+    return final
+
+
+def main():
+    from utils.api_client import PravaahClient
+
+    parser = argparse.ArgumentParser(description="Replay synthetic vitals as a live feed")
+    parser.add_argument("--patients", type=int, default=8)
+    parser.add_argument("--speed", type=float, default=1.0, help="Time acceleration factor")
+    parser.add_argument("--rate", type=float, help="Max docs/sec")
+    parser.add_argument("--duration", type=float, help="Stop after N seconds")
+    parser.add_argument("--hours", type=int, default=48, help="Arc length to replay")
+    parser.add_argument("--cadence", type=int, default=15, help="Minutes between readings")
+    parser.add_argument("--archive", help="Replay a vitals archive directory")
+    args = parser.parse_args()
+
+    def show(s):
+        print(f"  t={s['elapsed']}s sent={s['sent']} indexed={s['indexed']} "
+              f"rate={s['docs_per_sec']}/s lag={s['lag_now']}s (p95 {s['lag_p95']}s)")
+
+    final = replay(
+        PravaahClient(),
+        n_patients=args.patients,
+        speed=args.speed,
+        rate=args.rate,
+        duration=args.duration,
+        hours=args.hours,
+        cadence_minutes=args.cadence,
+        on_report=show,
+        archive=args.archive,
+    )
+    show(final)
+    print(f"  failed: {final['failed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ import random
 from datetime import datetime, timedelta, timezone
 
 from config import settings
+from indices.checkpoint import SeedCheckpoint
+from utils.bulk import AdaptiveBatchController, split_conflicts, streaming_bulk
 
 
 # ---------------------------------------------------------------------------
@@ -509,7 +511,13 @@ def _vitals_pat008(timestamps):
 # Main vitals generator
 # ---------------------------------------------------------------------------
 
-def generate_vitals(patients):
+def vitals_end_time():
+    """Current time rounded down to a 15-minute boundary."""
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    return now.replace(minute=(now.minute // 15) * 15)
+
+
+def generate_vitals(patients, end=None):
     """Generate 48 hours of vitals at 15-minute intervals for all patients.
 
     Returns a list of vitals dicts. Each dict has @timestamp, patient_id,
@@ -520,11 +528,11 @@ def generate_vitals(patients):
     patients : list[dict]
         The patient list from get_patients(). Used only for validation /
         logging; the actual generation is hard-coded per patient arc.
+    end : datetime, optional
+        Time of the last reading (default: ``vitals_end_time()``). Passing
+        the same value reproduces the same timestamps.
     """
-    now = datetime.now(timezone.utc)
-    # Round 'now' down to the nearest 15-minute boundary for clean timestamps
-    now = now.replace(second=0, microsecond=0)
-    now = now.replace(minute=(now.minute // 15) * 15)
+    now = end or vitals_end_time()
 
     # 48 hours at 15-min intervals = 192 timestamps
     total_readings = 192
@@ -567,43 +575,104 @@ def generate_vitals(patients):
 # Seed everything
 # ---------------------------------------------------------------------------
 
-def seed_all(client):
+def seed_all(client, resume=False, checkpoint_path=None):
     """Seed all sample data into Elasticsearch using the PravaahClient.
 
+    Patients and wards are indexed with their ``patient_id`` / ``ward`` as
+    ``_id``, and vitals with ``op_type=create`` into the TSDS, which derives
+    ``_id`` from the dimensions and ``@timestamp``; a re-run therefore never
+    duplicates documents. Progress is written to a checkpoint after each
+    stage and each patient's vitals; with ``resume`` the run reuses the
+    checkpoint's timeline and skips what is already done.
+
     Parameters
     ----------
     client : utils.api_client.PravaahClient
         An initialised client instance.
+    resume : bool
+        Continue from ``checkpoint_path`` instead of starting over.
+    checkpoint_path : str, optional
+        Defaults to ``settings.SEED_CHECKPOINT``.
     """
     print("\n=== Seeding Pravaah sample data ===\n")
+    checkpoint = SeedCheckpoint(
+        checkpoint_path or settings.SEED_CHECKPOINT,
+        params={"dataset": "demo"},
+        end=vitals_end_time(),
+        resume=resume,
+    )
+    if checkpoint.resumed:
+        print(f"  Resuming from {checkpoint.path} (timeline ends {checkpoint.end.isoformat()})\n")
 
     # 1. Index patients
     patients = get_patients()
     print(f"[1/3] Indexing {len(patients)} patients -> {settings.INDEX_PATIENTS}")
-    result = client.bulk_index(settings.INDEX_PATIENTS, patients)
-    print(f"  Done: {result}\n")
+    if checkpoint.is_done("patients"):
+        print("  Already done, skipping\n")
+    else:
+        result = client.bulk_index(settings.INDEX_PATIENTS, patients, id_field="patient_id")
+        checkpoint.mark("patients")
+        print(f"  Done: {result}\n")
 
     # 2. Index ward capacity
     capacity = get_capacity_data()
     print(f"[2/3] Indexing {len(capacity)} ward capacity docs -> {settings.INDEX_CAPACITY}")
-    result = client.bulk_index(settings.INDEX_CAPACITY, capacity)
-    print(f"  Done: {result}\n")
-
-    # 3. Generate and index vitals in batches of 500
+    if checkpoint.is_done("capacity"):
+        print("  Already done, skipping\n")
+    else:
+        result = client.bulk_index(settings.INDEX_CAPACITY, capacity, id_field="ward")
+        checkpoint.mark("capacity")
+        print(f"  Done: {result}\n")
+
+    # 3. Generate and index vitals in one adaptive stream; a patient is
+    # checkpointed once every chunk holding its readings is acknowledged
     print(f"[3/3] Generating and indexing vitals -> {settings.INDEX_VITALS}")
-    vitals = generate_vitals(patients)
-
-    batch_size = 500
-    total = len(vitals)
-    indexed = 0
-
-    for batch_start in range(0, total, batch_size):
-        batch_end = min(batch_start + batch_size, total)
-        batch = vitals[batch_start:batch_end]
-        result = client.bulk_index(settings.INDEX_VITALS, batch, op_type="create")
-        indexed += len(batch)
-        print(f"  Batch {batch_start // batch_size + 1}: "
-              f"indexed {len(batch)} docs ({indexed}/{total} total)")
+    vitals = generate_vitals(patients, end=checkpoint.end)
+    remaining = {}  # patient_id -> readings not yet acknowledged
+    for doc in vitals:
+        remaining[doc["patient_id"]] = remaining.get(doc["patient_id"], 0) + 1
+    for patient_id in list(remaining):
+        if checkpoint.is_done("vitals", patient_id):
+            print(f"    {patient_id}: already done, skipping")
+            del remaining[patient_id]
+    failed_patients = set()
+
+    def on_chunk(chunk, part):
+        failed_patients.update(
+            f["doc"]["patient_id"] for f in split_conflicts(part["failed"])[1]
+        )
+        for doc, _ in chunk:
+            patient_id = doc["patient_id"]
+            remaining[patient_id] -= 1
+            if not remaining[patient_id] and patient_id not in failed_patients:
+                checkpoint.mark("vitals", patient_id)
+
+    controller = AdaptiveBatchController()
+    report = streaming_bulk(
+        client,
+        settings.INDEX_VITALS,
+        (doc for doc in vitals if doc["patient_id"] in remaining),
+        op_type="create",
+        controller=controller,
+        on_chunk=on_chunk,
+    )
+    conflicts, failed = split_conflicts(report["failed"])
+    if failed:
+        errors = [f["error"] for f in failed[:3]]
+        raise RuntimeError(
+            f"Bulk indexing errors ({len(failed)}): {errors}"
+        )
+    indexed = report["indexed"]
+    duplicates = len(conflicts)
+    chunks = report["chunks"]
+    retried = report["retried"]
+
+    tuning = controller.report()
+    print(f"  {chunks} batches, {retried} retried items, "
+          f"{duplicates} already indexed")
+    print(f"  Steady state: batch_size={tuning['batch_size']}, "
+          f"in_flight={tuning['in_flight']}, "
+          f"{tuning['steady_docs_per_sec']} docs/sec")
 
     print(f"\n  Vitals indexing complete: {indexed} documents indexed.")
     print("\n=== Seeding complete ===\n")
@@ -612,4 +681,6 @@ def seed_all(client):
         "patients": len(patients),
         "capacity": len(capacity),
         "vitals": indexed,
+        "vitals_duplicates": duplicates,
+        "vitals_docs_per_sec": tuning["steady_docs_per_sec"],
     }
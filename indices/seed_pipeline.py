@@ -0,0 +1,287 @@
+"""Multi-process streaming seed pipeline for large synthetic vitals loads.
+
+Seeding 100M readings does not fit the "generate a list, then index it"
+shape of ``seed_all``. This pipeline streams instead:
+
+    generator processes  -->  bounded queue  -->  bulk sender threads
+    (one shard of patients     (backpressure;       (send_chunk with
+     each: generate + encode)   constant memory)     per-item 429 retry)
+
+Generators produce patients with ``vitals_gen.iter_vitals_columns``, whose
+per-patient RNG streams make the output identical for any worker count,
+and render NDJSON bulk actions themselves (``VitalsBatch.to_actions``,
+no per-reading dicts) so serialisation runs in parallel. When senders
+fall behind the queue fills and generators block, so memory stays
+bounded by ``queue_size`` chunks.
+
+Shards are the unit of resumption: once every chunk of a shard has been
+acknowledged it is recorded in a ``SeedCheckpoint`` together with the
+timeline end time, and ``--resume`` regenerates only the missing shards
+on the same timeline. Vitals go in with ``op_type=create``; re-sent
+readings of a partly indexed shard hit the TSDS ``_id`` (dimensions +
+timestamp) and come back as 409s, counted as ``duplicates``.
+
+Usage:
+    python -m indices.seed_pipeline --patients 10000 --hours 48 --cadence 1
+    python -m indices.seed_pipeline --patients 10000 --hours 48 --cadence 1 --resume
+"""
+
+import argparse
+import multiprocessing as mp
+import queue
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+from config import settings
+from indices.checkpoint import SeedCheckpoint
+from indices.vitals_batch import VitalsBatch
+from indices.vitals_gen import iter_vitals_columns
+from utils.bulk import chunk_actions, merge_part, new_report, send_chunk, split_conflicts
+
+# How often the parent checks that generators are still alive while the
+# queue is empty; a worker killed outright (OOM, signal) never reports.
+QUEUE_POLL_SECS = 5.0
+
+
+def _generator(worker_id, shards, options, out_queue):
+    """Generate and encode the given patient shards into ``out_queue``.
+
+    Chunks are tagged with their shard (its first patient) and each shard
+    ends with a ``("shard", (first_patient, n_chunks))`` message.
+    """
+    docs = 0
+    busy = 0.0
+    blocked = 0.0
+    try:
+        for first_patient, count in shards:
+            batches = iter_vitals_columns(
+                count,
+                first_patient=first_patient,
+                patients_per_chunk=min(count, options["patients_per_batch"]),
+                hours=options["hours"],
+                cadence_minutes=options["cadence_minutes"],
+                seed=options["seed"],
+                end=options["end"],
+            )
+            shard_chunks = 0
+            for batch in batches:
+                start = time.monotonic()
+                actions = VitalsBatch.from_columns(batch).to_actions(settings.INDEX_VITALS)
+                chunks = chunk_actions(settings.INDEX_VITALS, actions, "create")
+                for chunk in chunks:
+                    actions = [action for _, action in chunk]
+                    docs += len(actions)
+                    busy += time.monotonic() - start
+                    start = time.monotonic()
+                    out_queue.put(("chunk", (first_patient, actions)))
+                    shard_chunks += 1
+                    blocked += time.monotonic() - start
+                    start = time.monotonic()
+                busy += time.monotonic() - start
+            out_queue.put(("shard", (first_patient, shard_chunks)))
+        out_queue.put(("done", {"worker": worker_id, "docs": docs,
+                                "busy": busy, "blocked": blocked}))
+    except Exception as e:  # surface failures to the parent instead of hanging it
+        out_queue.put(("error", f"worker {worker_id}: {e!r}"))
+
+
+def plan_shards(n_patients, workers, shard_size):
+    """Split patients into ``(first_patient, count)`` shards, dealt round-robin."""
+    shards = [
+        (start, min(shard_size, n_patients - start))
+        for start in range(0, n_patients, shard_size)
+    ]
+    return [shards[w::workers] for w in range(workers)]
+
+
+def seed_vitals_pipeline(
+    client,
+    n_patients,
+    hours=48,
+    cadence_minutes=15,
+    seed=42,
+    workers=None,
+    senders=None,
+    queue_size=None,
+    shard_size=500,
+    pipeline=None,
+    end=None,
+    resume=False,
+    checkpoint_path=None,
+):
+    """Generate and index synthetic vitals with parallel generators and senders.
+
+    Returns a report with the usual bulk fields (``indexed``, ``retried``,
+    ``failed`` - whose ``doc`` entries are the raw NDJSON actions) plus
+    per-stage throughput: ``generate_docs_per_sec`` (aggregate over
+    generator processes), ``index_docs_per_sec`` (wall clock), and
+    ``generator_blocked_secs`` - time generators spent waiting on a full
+    queue, i.e. how far indexing is the bottleneck.
+
+    Completed shards are recorded in ``checkpoint_path`` (default
+    ``settings.SEED_CHECKPOINT``); with ``resume`` they are skipped and
+    ``end`` is taken from the checkpoint. ``duplicates`` counts readings
+    that were already indexed and ``skipped_shards`` the shards not sent.
+    """
+    workers = workers or max(1, (mp.cpu_count() or 2) - 1)
+    senders = senders or settings.BULK_MAX_IN_FLIGHT
+    queue_size = queue_size or senders * 2
+    checkpoint = SeedCheckpoint(
+        checkpoint_path or settings.SEED_CHECKPOINT,
+        params={
+            "dataset": "synthetic",
+            "patients": n_patients,
+            "hours": hours,
+            "cadence_minutes": cadence_minutes,
+            "seed": seed,
+            "shard_size": shard_size,
+        },
+        end=end or datetime.now(timezone.utc),
+        resume=resume,
+    )
+    options = {
+        "hours": hours,
+        "cadence_minutes": cadence_minutes,
+        "seed": seed,
+        "patients_per_batch": 50,  # bounds per-worker memory at 1-minute cadence
+        # Shared end time so every worker (and every resumed run) builds the
+        # same timeline
+        "end": checkpoint.end,
+    }
+
+    completed = checkpoint.completed("vitals")
+    plan = [
+        [shard for shard in shards if str(shard[0]) not in completed]
+        for shards in plan_shards(n_patients, workers, shard_size)
+    ]
+    out_queue = mp.Queue(maxsize=queue_size)
+    procs = [
+        mp.Process(target=_generator, args=(w, shards, options, out_queue), daemon=True)
+        for w, shards in enumerate(plan)
+        if shards
+    ]
+    report = new_report()
+    worker_stats = []
+    # shard -> {"acked", "total" (None until the generator finishes it), "failed"}
+    shards = {}
+    owner = {}
+
+    def shard_state(shard):
+        return shards.setdefault(shard, {"acked": 0, "total": None, "failed": False})
+
+    def maybe_complete(shard):
+        state = shards[shard]
+        if state["acked"] == state["total"] and not state["failed"]:
+            checkpoint.mark("vitals", shard)
+
+    def settle(future):
+        part = future.result()
+        merge_part(report, part)
+        shard = owner.pop(future)
+        state = shard_state(shard)
+        state["acked"] += 1
+        if split_conflicts(part["failed"])[1]:
+            state["failed"] = True
+        maybe_complete(shard)
+
+    start = time.monotonic()
+    for proc in procs:
+        proc.start()
+
+    try:
+        with ThreadPoolExecutor(max_workers=senders) as pool:
+            in_flight = set()
+            finished = 0
+            while finished < len(procs):
+                try:
+                    kind, payload = out_queue.get(timeout=QUEUE_POLL_SECS)
+                except queue.Empty:
+                    crashed = [p.exitcode for p in procs if p.exitcode not in (None, 0)]
+                    if crashed:
+                        raise RuntimeError(
+                            f"Vitals generator exited with code {crashed[0]}"
+                        ) from None
+                    continue
+                if kind == "error":
+                    raise RuntimeError(f"Vitals generator failed: {payload}")
+                if kind == "done":
+                    worker_stats.append(payload)
+                    finished += 1
+                    continue
+                if kind == "shard":
+                    shard, total = payload
+                    shard_state(shard)["total"] = total
+                    maybe_complete(shard)
+                    continue
+                while len(in_flight) >= senders:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        settle(future)
+                shard, actions = payload
+                chunk = [(action, action) for action in actions]
+                future = pool.submit(send_chunk, client, chunk, pipeline)
+                owner[future] = shard
+                in_flight.add(future)
+            for future in wait(in_flight).done:
+                settle(future)
+    finally:
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+            proc.join()
+
+    conflicts, report["failed"] = split_conflicts(report["failed"])
+    elapsed = max(time.monotonic() - start, 1e-9)
+    generated = sum(s["docs"] for s in worker_stats)
+    busy = sum(s["busy"] for s in worker_stats)
+    report.update({
+        "duplicates": len(conflicts),
+        "skipped_shards": len(completed),
+        "workers": len(procs),
+        "senders": senders,
+        "generated": generated,
+        "elapsed": round(elapsed, 3),
+        "generate_docs_per_sec": round(generated / busy * len(procs), 1) if busy else 0.0,
+        "index_docs_per_sec": round(report["indexed"] / elapsed, 1),
+        "generator_blocked_secs": round(sum(s["blocked"] for s in worker_stats), 3),
+    })
+    return report
+
+
+def main():
+    from utils.api_client import PravaahClient
+
+    parser = argparse.ArgumentParser(description="Stream synthetic vitals into the TSDS")
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--hours", type=int, default=48)
+    parser.add_argument("--cadence", type=int, default=15, help="Minutes between readings")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, help="Generator processes")
+    parser.add_argument("--senders", type=int, help="Concurrent bulk requests")
+    parser.add_argument("--queue-size", type=int, help="Max encoded chunks buffered")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip shards recorded in the checkpoint and reuse its timeline")
+    parser.add_argument("--checkpoint", help=f"Checkpoint file (default {settings.SEED_CHECKPOINT})")
+    args = parser.parse_args()
+
+    report = seed_vitals_pipeline(
+        PravaahClient(),
+        args.patients,
+        hours=args.hours,
+        cadence_minutes=args.cadence,
+        seed=args.seed,
+        workers=args.workers,
+        senders=args.senders,
+        queue_size=args.queue_size,
+        resume=args.resume,
+        checkpoint_path=args.checkpoint,
+    )
+    failed = report.pop("failed")
+    for key, value in report.items():
+        print(f"  {key}: {value}")
+    print(f"  failed: {len(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,28 @@
 """Elasticsearch index templates and schemas for Pravaah."""
 
 from config import settings
+from indices.pipelines import create_all_pipelines, delete_all_pipelines
+from indices.vitals_gen import VITAL_FIELDS
+
+
+def vitals_lifecycle():
+    """Data stream lifecycle for metrics-patient-vitals.
+
+    Rollover is managed by the data stream lifecycle; each rolled-over
+    backing index is then downsampled per ``settings.VITALS_DOWNSAMPLING``
+    (gauges become min/max/sum/value_count per bucket), replacing the raw
+    readings so long-range queries scan hourly or daily documents.
+    """
+    lifecycle = {
+        "enabled": True,
+        "downsampling": [
+            {"after": after, "fixed_interval": interval}
+            for after, interval in settings.VITALS_DOWNSAMPLING
+        ],
+    }
+    if settings.VITALS_RETENTION:
+        lifecycle["data_retention"] = settings.VITALS_RETENTION
+    return lifecycle
 
 
 def vitals_index_template():
@@ -10,10 +32,13 @@ def vitals_index_template():
         "data_stream": {},
         "priority": 500,
         "template": {
+            "lifecycle": vitals_lifecycle(),
             "settings": {
                 "index.mode": "time_series",
                 "index.routing_path": ["patient_id", "ward"],
-                "index.look_back_time": "72h",
+                "index.look_back_time": f"{settings.VITALS_LOOK_BACK_HOURS}h",
+                "index.look_ahead_time": f"{settings.VITALS_LOOK_AHEAD_MINUTES}m",
+                "index.default_pipeline": settings.PIPELINE_VITALS,
             },
             "mappings": {
                 "properties": {
@@ -54,12 +79,100 @@ def vitals_index_template():
                         "type": "integer",
                         "time_series_metric": "gauge",
                     },
+                    # Derived at index time by the patient-vitals-derived pipeline
+                    "mews_heart_rate": {
+                        "type": "integer",
+                        "time_series_metric": "gauge",
+                    },
+                    "mews_systolic_bp": {
+                        "type": "integer",
+                        "time_series_metric": "gauge",
+                    },
+                    "mews_respiratory_rate": {
+                        "type": "integer",
+                        "time_series_metric": "gauge",
+                    },
+                    "mews_temperature": {
+                        "type": "integer",
+                        "time_series_metric": "gauge",
+                    },
+                    "mews_oxygen_saturation": {
+                        "type": "integer",
+                        "time_series_metric": "gauge",
+                    },
+                    "mews_total": {
+                        "type": "integer",
+                        "time_series_metric": "gauge",
+                    },
+                    "mean_arterial_pressure": {
+                        "type": "float",
+                        "time_series_metric": "gauge",
+                    },
+                    "shock_index": {
+                        "type": "float",
+                        "time_series_metric": "gauge",
+                    },
                 },
             },
         },
     }
 
 
+def vitals_history_index():
+    """Schema for the historical vitals sidecar index.
+
+    Same fields and ingest pipeline as the TSDS, as a regular index:
+    readings older than the data stream's ``look_back_time`` (delayed
+    uploads, backfills) land here.
+    """
+    return {
+        "settings": {"index.default_pipeline": settings.PIPELINE_VITALS},
+        "mappings": _plain_vitals_mappings(),
+    }
+
+
+def vitals_latest_index():
+    """Schema for the latest-reading-per-patient index (see ``indices.transforms``).
+
+    No default pipeline: the transform copies documents already scored.
+    """
+    return {"mappings": _plain_vitals_mappings()}
+
+
+def _plain_vitals_mappings():
+    """The TSDS field mappings without the time-series parameters."""
+    properties = {}
+    for name, field in vitals_index_template()["template"]["mappings"]["properties"].items():
+        properties[name] = {
+            k: v for k, v in field.items()
+            if k not in ("time_series_dimension", "time_series_metric")
+        }
+    return {"properties": properties}
+
+
+def vitals_hourly_index():
+    """Schema for the per-patient hourly rollup (see ``indices.transforms``).
+
+    One document per patient, ward and hour; ``@timestamp`` is the start of
+    the hour and each vital ``<field>`` has ``<field>_avg``, ``_min``,
+    ``_max`` and ``_count``.
+    """
+    vitals = vitals_index_template()["template"]["mappings"]["properties"]
+    properties = {
+        "@timestamp": {"type": "date"},
+        "patient_id": {"type": "keyword"},
+        "ward": {"type": "keyword"},
+    }
+    for name, field in vitals.items():
+        if name not in VITAL_FIELDS:
+            continue
+        properties[f"{name}_avg"] = {"type": "float"}
+        properties[f"{name}_min"] = {"type": field["type"]}
+        properties[f"{name}_max"] = {"type": field["type"]}
+        properties[f"{name}_count"] = {"type": "integer"}
+    return {"mappings": {"properties": properties}}
+
+
 def patients_index():
     """Schema for patients index."""
     return {
@@ -150,29 +263,160 @@ def discharge_index():
     }
 
 
+# -- Tuned variants ------------------------------------------------------
+#
+# Same fields, tuned for footprint and query speed (compare with
+# ``python -m benchmarks.footprint_report``):
+#   - vitals are recorded to one decimal, so scaled_float x10 stores them
+#     exactly as small longs; scores and pain fit a byte
+#   - synthetic _source rebuilds documents from doc values instead of
+#     storing the JSON (the TSDS already does this by default)
+#   - index.sort on patient_id, newest first, so per-patient reads and
+#     "latest" lookups hit one contiguous, early-terminating block
+#   - eager global ordinals on the patient_id / ward keywords that the
+#     tools group and filter by, built at refresh instead of first query
+#   - best_compression for the append-only audit log, which keeps its
+#     stored _source for fidelity
+
+TUNED_NUMERIC_TYPES = {
+    "heart_rate": {"type": "scaled_float", "scaling_factor": 10},
+    "systolic_bp": {"type": "scaled_float", "scaling_factor": 10},
+    "diastolic_bp": {"type": "scaled_float", "scaling_factor": 10},
+    "oxygen_saturation": {"type": "scaled_float", "scaling_factor": 10},
+    "temperature": {"type": "scaled_float", "scaling_factor": 10},
+    "respiratory_rate": {"type": "scaled_float", "scaling_factor": 10},
+    "pain_score": {"type": "byte"},
+    "mews_heart_rate": {"type": "byte"},
+    "mews_systolic_bp": {"type": "byte"},
+    "mews_respiratory_rate": {"type": "byte"},
+    "mews_temperature": {"type": "byte"},
+    "mews_oxygen_saturation": {"type": "byte"},
+    "mews_total": {"type": "byte"},
+    "mean_arterial_pressure": {"type": "scaled_float", "scaling_factor": 10},
+    "shock_index": {"type": "scaled_float", "scaling_factor": 100},
+}
+EAGER_KEYWORDS = ("patient_id", "ward")
+SYNTHETIC_SOURCE = {"index.mapping.source.mode": "synthetic"}
+
+
+def _tune_properties(properties):
+    """Apply ``TUNED_NUMERIC_TYPES`` and eager global ordinals in place."""
+    for name, field in properties.items():
+        if name in TUNED_NUMERIC_TYPES:
+            field.pop("type")
+            field.update(TUNED_NUMERIC_TYPES[name])
+        elif name in EAGER_KEYWORDS and field["type"] == "keyword":
+            field["eager_global_ordinals"] = True
+    return properties
+
+
+def _sorted_by(*fields):
+    """``index.sort`` settings; ``("timestamp", "desc")`` tuples set the order."""
+    fields = [f if isinstance(f, tuple) else (f, "asc") for f in fields]
+    return {
+        "index.sort.field": [name for name, _ in fields],
+        "index.sort.order": [order for _, order in fields],
+    }
+
+
+def tuned_vitals_index_template():
+    """``vitals_index_template`` with compact numeric types and eager ordinals.
+
+    TSDS indices are already sorted by ``_tsid``/``@timestamp`` and use
+    synthetic ``_source``, so only the mappings change.
+    """
+    template = vitals_index_template()
+    _tune_properties(template["template"]["mappings"]["properties"])
+    return template
+
+
+def tuned_vitals_history_index():
+    schema = vitals_history_index()
+    _tune_properties(schema["mappings"]["properties"])
+    schema["settings"].update(SYNTHETIC_SOURCE)
+    schema["settings"].update(_sorted_by("patient_id", ("@timestamp", "desc")))
+    return schema
+
+
+def tuned_patients_index():
+    schema = patients_index()
+    _tune_properties(schema["mappings"]["properties"])
+    schema["settings"] = {**SYNTHETIC_SOURCE, **_sorted_by("patient_id")}
+    return schema
+
+
+def tuned_capacity_index():
+    schema = capacity_index()
+    _tune_properties(schema["mappings"]["properties"])
+    schema["settings"] = {**SYNTHETIC_SOURCE, **_sorted_by("ward")}
+    return schema
+
+
+def tuned_decisions_index():
+    schema = decisions_index()
+    _tune_properties(schema["mappings"]["properties"])
+    schema["settings"] = {
+        "index.codec": "best_compression",
+        **_sorted_by("patient_id", ("timestamp", "desc")),
+    }
+    return schema
+
+
+def tuned_discharge_index():
+    schema = discharge_index()
+    _tune_properties(schema["mappings"]["properties"])
+    schema["settings"] = {**SYNTHETIC_SOURCE, **_sorted_by("patient_id", ("updated_at", "desc"))}
+    return schema
+
+
+def index_schemas(tuned=False):
+    """``[(index, schema_fn)]`` for the regular indices, default or tuned."""
+    if tuned:
+        return [
+            (settings.INDEX_VITALS_HISTORY, tuned_vitals_history_index),
+            (settings.INDEX_PATIENTS, tuned_patients_index),
+            (settings.INDEX_CAPACITY, tuned_capacity_index),
+            (settings.INDEX_DECISIONS, tuned_decisions_index),
+            (settings.INDEX_DISCHARGE, tuned_discharge_index),
+        ]
+    return [
+        (settings.INDEX_VITALS_HISTORY, vitals_history_index),
+        (settings.INDEX_PATIENTS, patients_index),
+        (settings.INDEX_CAPACITY, capacity_index),
+        (settings.INDEX_DECISIONS, decisions_index),
+        (settings.INDEX_DISCHARGE, discharge_index),
+    ]
+
+
 # -- Setup / Teardown ----------------------------------------------------
 
 
-def create_all_indices(client):
-    """Create all indices and data streams."""
+def create_all_indices(client, tuned=False):
+    """Create all indices and data streams.
+
+    ``tuned`` uses the tuned variants (see above); existing indices keep
+    their mappings either way.
+    """
     results = {}
 
+    # 0. Ingest pipelines, used as default_pipeline by the vitals indices
+    results.update(create_all_pipelines(client))
+
     # 1. TSDS: create index template then data stream
     print("  Creating TSDS template: metrics-patient-vitals ...")
     results["vitals_template"] = client.put_index_template(
         "metrics-patient-vitals",
-        vitals_index_template(),
+        tuned_vitals_index_template() if tuned else vitals_index_template(),
     )
     print("  Creating data stream: metrics-patient-vitals ...")
     results["vitals_stream"] = client.create_data_stream(settings.INDEX_VITALS)
+    # The template only applies to new streams; update an existing one too
+    results["vitals_lifecycle"] = client.put_data_stream_lifecycle(
+        settings.INDEX_VITALS, vitals_lifecycle()
+    )
 
     # 2. Regular indices
-    for name, schema_fn in [
-        (settings.INDEX_PATIENTS, patients_index),
-        (settings.INDEX_CAPACITY, capacity_index),
-        (settings.INDEX_DECISIONS, decisions_index),
-        (settings.INDEX_DISCHARGE, discharge_index),
-    ]:
+    for name, schema_fn in index_schemas(tuned):
         print(f"  Creating index: {name} ...")
         results[name] = client.create_index(name, schema_fn())
 
@@ -190,6 +434,7 @@ def delete_all_indices(client):
     results["vitals_template"] = client.delete_index_template("metrics-patient-vitals")
 
     for name in [
+        settings.INDEX_VITALS_HISTORY,
         settings.INDEX_PATIENTS,
         settings.INDEX_CAPACITY,
         settings.INDEX_DECISIONS,
@@ -198,4 +443,5 @@ def delete_all_indices(client):
         print(f"  Deleting index: {name} ...")
         results[name] = client.delete_index(name)
 
+    results.update(delete_all_pipelines(client))
     return results
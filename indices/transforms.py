@@ -0,0 +1,101 @@
+"""Continuous transforms that materialise per-patient views of the vitals stream.
+
+``patient-vitals-latest`` keeps one document per patient - its most recent
+reading - so "current vitals" lookups and the hospital-wide scan read
+O(patients) documents instead of sorting or aggregating every reading.
+``patient-vitals-hourly`` keeps one document per patient and hour with
+avg/min/max/count of every vital, so trend and statistics tools over a
+multi-day admission read a few dozen rollup rows instead of raw readings.
+
+Transforms are created stopped by ``create_all_transforms`` and started by
+``start_all_transforms`` once seeding is done (``setup.py --setup`` does
+both): a continuous transform only
+looks at ``@timestamp`` values newer than its last checkpoint, so starting
+it before a backfill would miss the backfilled readings. Starting resets
+the transform, which makes it rebuild from the whole stream.
+"""
+
+from config import settings
+from indices.templates import vitals_hourly_index, vitals_latest_index
+from indices.vitals_gen import VITAL_FIELDS
+
+
+def latest_vitals_transform():
+    """``latest`` transform: newest reading per patient from the vitals stream."""
+    return {
+        "description": "Most recent vitals reading per patient",
+        "source": {"index": [settings.INDEX_VITALS]},
+        "dest": {"index": settings.INDEX_VITALS_LATEST},
+        "latest": {"unique_key": ["patient_id"], "sort": "@timestamp"},
+        "frequency": settings.TRANSFORM_FREQUENCY,
+        "sync": {"time": {"field": "@timestamp", "delay": settings.TRANSFORM_SYNC_DELAY}},
+    }
+
+
+def hourly_vitals_transform():
+    """``pivot`` transform: per-patient hourly avg/min/max/count of each vital."""
+    aggregations = {}
+    for field in VITAL_FIELDS:
+        for stat, agg in (("avg", "avg"), ("min", "min"), ("max", "max"), ("count", "value_count")):
+            aggregations[f"{field}_{stat}"] = {agg: {"field": field}}
+    return {
+        "description": "Hourly vitals rollup per patient",
+        "source": {"index": [settings.INDEX_VITALS]},
+        "dest": {"index": settings.INDEX_VITALS_HOURLY},
+        "pivot": {
+            "group_by": {
+                "patient_id": {"terms": {"field": "patient_id"}},
+                "ward": {"terms": {"field": "ward"}},
+                "@timestamp": {
+                    "date_histogram": {"field": "@timestamp", "fixed_interval": "1h"}
+                },
+            },
+            "aggregations": aggregations,
+        },
+        "frequency": settings.TRANSFORM_FREQUENCY,
+        "sync": {"time": {"field": "@timestamp", "delay": settings.TRANSFORM_SYNC_DELAY}},
+    }
+
+
+# transform id -> (destination index, schema, transform body)
+TRANSFORMS = {
+    settings.INDEX_VITALS_LATEST: (
+        settings.INDEX_VITALS_LATEST, vitals_latest_index, latest_vitals_transform,
+    ),
+    settings.INDEX_VITALS_HOURLY: (
+        settings.INDEX_VITALS_HOURLY, vitals_hourly_index, hourly_vitals_transform,
+    ),
+}
+
+
+def create_all_transforms(client):
+    """Create destination indices and (stopped) transforms."""
+    results = {}
+    for transform_id, (dest, schema_fn, body_fn) in TRANSFORMS.items():
+        print(f"  Creating index: {dest} ...")
+        results[dest] = client.create_index(dest, schema_fn())
+        print(f"  Creating transform: {transform_id} ...")
+        results[f"transform:{transform_id}"] = client.put_transform(transform_id, body_fn())
+    return results
+
+
+def start_all_transforms(client):
+    """(Re)build every transform from the current data and keep it running."""
+    results = {}
+    for transform_id in TRANSFORMS:
+        print(f"  Starting transform: {transform_id} ...")
+        client.stop_transform(transform_id)
+        client.reset_transform(transform_id)
+        results[transform_id] = client.start_transform(transform_id)
+    return results
+
+
+def delete_all_transforms(client):
+    """Stop and delete every transform and its destination index."""
+    results = {}
+    for transform_id, (dest, _, _) in TRANSFORMS.items():
+        print(f"  Deleting transform: {transform_id} ...")
+        results[f"transform:{transform_id}"] = client.delete_transform(transform_id)
+        print(f"  Deleting index: {dest} ...")
+        results[dest] = client.delete_index(dest)
+    return results
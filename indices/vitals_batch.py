@@ -0,0 +1,311 @@
+"""Compact struct-of-arrays container for vitals readings.
+
+A reading as a ``_make_vital``-style dict costs roughly 600 bytes of Python
+objects (the dict, its ten keys' slots, boxed floats, two strings). A
+``VitalsBatch`` stores the same readings as one NumPy array per field -
+``@timestamp`` as int64 epoch milliseconds, patient and ward as int32 /
+int16 codes into shared intern tables, vitals as float32 (NaN when
+missing) and pain as int8 (-1 when missing) - about 40 bytes per reading.
+
+It is the common currency between the producers (``vitals_gen``, the
+archive, ``load_vitals``) and the consumers (bulk senders, local
+analytics). ``to_actions`` renders bulk NDJSON straight from the columns
+with one string format per reading and no intermediate dicts.
+
+Usage::
+
+    batch = VitalsBatch.from_columns(generate_vitals_columns(1000))
+    streaming_bulk(client, settings.INDEX_VITALS,
+                   batch.to_actions(settings.INDEX_VITALS), op_type="create")
+
+    result = client.esql_columns("FROM metrics-patient-vitals | LIMIT 10000")
+    VitalsBatch.from_esql(result).summary()
+"""
+
+import json
+
+import numpy as np
+
+from indices.vitals_gen import VITAL_FIELDS
+
+FLOAT_FIELDS = tuple(f for f in VITAL_FIELDS if f != "pain_score")
+PAIN_MISSING = -1
+
+# Pre-rendered "0.0" .. "250.0" (covers every VITAL_LIMITS range) plus
+# "null": serialising a column is then one array gather, not a format
+# call per value.
+_TENTHS_SIZE = 2501
+_TENTHS = np.array(
+    [f"{i // 10}.{i % 10}" for i in range(_TENTHS_SIZE)] + ["null"], dtype=object
+)
+_PAIN = np.array([str(i) for i in range(128)] + ["null"], dtype=object)
+
+
+def _format_tenths(values):
+    """Render float values with one decimal as JSON number strings (NaN -> null)."""
+    values = values.astype(np.float64)
+    missing = np.isnan(values)
+    tenths = np.round(np.where(missing, 0.0, values) * 10)
+    outside = ~missing & ((tenths < 0) | (tenths >= _TENTHS_SIZE))
+    index = np.where(missing | outside, _TENTHS_SIZE, tenths).astype(np.int64)
+    text = _TENTHS[index]
+    if outside.any():
+        text[outside] = [f"{v:.1f}" for v in values[outside].tolist()]
+    return text
+
+
+class InternTable:
+    """Two-way map between strings (patient ids, wards) and small int codes."""
+
+    __slots__ = ("names", "_codes", "_json")
+
+    def __init__(self, names=()):
+        self.names = []
+        self._codes = {}
+        self._json = []
+        for name in names:
+            self.intern(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, name):
+        """Code for ``name``, adding it if new."""
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.names)
+            self.names.append(name)
+            self._json.append(json.dumps(name))
+        return code
+
+    def intern_many(self, names):
+        """Codes for an array of names; interns each distinct value once."""
+        uniques, inverse = np.unique(np.asarray(names, dtype=object), return_inverse=True)
+        lookup = np.array([self.intern(str(u)) for u in uniques.tolist()], dtype=np.int32)
+        return lookup[inverse] if len(lookup) else np.empty(0, dtype=np.int32)
+
+    def json_strings(self):
+        """JSON-encoded names, indexable by code."""
+        return np.array(self._json, dtype=object)
+
+
+class VitalsBatch:
+    """Readings as parallel arrays; see the module docstring for the layout."""
+
+    __slots__ = ("timestamp_ms", "patient", "ward", "values", "pain", "patients", "wards")
+
+    def __init__(self, timestamp_ms, patient, ward, values, pain, patients, wards):
+        self.timestamp_ms = timestamp_ms
+        self.patient = patient
+        self.ward = ward
+        self.values = values  # {field: float32 array} for FLOAT_FIELDS
+        self.pain = pain
+        self.patients = patients
+        self.wards = wards
+
+    def __len__(self):
+        return len(self.timestamp_ms)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the row arrays (intern tables excluded)."""
+        arrays = [self.timestamp_ms, self.patient, self.ward, self.pain, *self.values.values()]
+        return sum(a.nbytes for a in arrays)
+
+    # -- constructors ----------------------------------------------------
+
+    @classmethod
+    def from_arrays(cls, timestamps, patient_ids, wards, values, patients=None, ward_table=None):
+        """Build from per-row arrays.
+
+        ``timestamps`` is datetime64 or epoch-ms ints; ``patient_ids`` and
+        ``wards`` are string arrays (interned into ``patients`` /
+        ``ward_table``, new tables by default); ``values`` maps vital
+        fields to arrays, NaN for missing - absent fields are all missing.
+        """
+        patients = patients if patients is not None else InternTable()
+        ward_table = ward_table if ward_table is not None else InternTable()
+        timestamps = np.asarray(timestamps)
+        if timestamps.dtype.kind == "M":
+            timestamps = timestamps.astype("datetime64[ms]").astype(np.int64)
+        n = len(timestamps)
+        floats = {
+            f: np.asarray(values[f], dtype=np.float32) if f in values
+            else np.full(n, np.nan, dtype=np.float32)
+            for f in FLOAT_FIELDS
+        }
+        pain = values.get("pain_score")
+        if pain is None:
+            pain = np.full(n, PAIN_MISSING, dtype=np.int8)
+        else:
+            pain = np.asarray(pain)
+            if pain.dtype.kind == "f":
+                pain = np.where(np.isnan(pain), PAIN_MISSING, np.round(pain))
+            pain = pain.astype(np.int8)
+        return cls(
+            timestamps.astype(np.int64, copy=False),
+            patients.intern_many(patient_ids),
+            ward_table.intern_many(wards).astype(np.int16),
+            floats,
+            pain,
+            patients,
+            ward_table,
+        )
+
+    @classmethod
+    def from_columns(cls, batch):
+        """Wrap a ``vitals_gen`` / ``vitals_archive`` column batch without copying rows."""
+        patients = InternTable(batch["patient_ids"].tolist())
+        wards = InternTable(batch["ward_names"].tolist())
+        return cls(
+            batch["@timestamp"].astype("datetime64[ms]").astype(np.int64),
+            batch["patient"],
+            batch["ward"],
+            {f: batch[f] for f in FLOAT_FIELDS},
+            batch["pain_score"],
+            patients,
+            wards,
+        )
+
+    @classmethod
+    def from_docs(cls, docs, patients=None, wards=None):
+        """Build from ``_make_vital``-shaped dicts (e.g. parsed NDJSON)."""
+        docs = list(docs)
+        stamps = np.array(
+            [d["@timestamp"].rstrip("Z") for d in docs], dtype="datetime64[ms]"
+        )
+        values = {
+            f: np.array([d.get(f, np.nan) for d in docs], dtype=np.float64)
+            for f in VITAL_FIELDS
+        }
+        return cls.from_arrays(
+            stamps,
+            [d["patient_id"] for d in docs],
+            [d.get("ward", "") for d in docs],
+            values,
+            patients,
+            wards,
+        )
+
+    @classmethod
+    def from_esql(cls, result, patients=None, wards=None):
+        """Build from an ``EsqlResult`` over ``metrics-patient-vitals``."""
+        n = len(result["@timestamp"])
+        return cls.from_arrays(
+            result["@timestamp"],
+            result["patient_id"],
+            result["ward"] if "ward" in result else np.full(n, "", dtype=object),
+            {f: result[f] for f in VITAL_FIELDS if f in result},
+            patients,
+            wards,
+        )
+
+    # -- row access ------------------------------------------------------
+
+    def select(self, index):
+        """Batch of the rows at ``index`` (slice, mask or index array)."""
+        return VitalsBatch(
+            self.timestamp_ms[index],
+            self.patient[index],
+            self.ward[index],
+            {f: v[index] for f, v in self.values.items()},
+            self.pain[index],
+            self.patients,
+            self.wards,
+        )
+
+    def iter_chunks(self, rows):
+        """Yield consecutive sub-batches of at most ``rows`` readings."""
+        for start in range(0, len(self), rows):
+            yield self.select(slice(start, start + rows))
+
+    def to_docs(self):
+        """Yield ``_make_vital``-shaped dicts (compatibility path)."""
+        for line in self._source_lines():
+            yield json.loads(line)
+
+    # -- serialisation ---------------------------------------------------
+
+    def _format_rows(self, prefix="", suffix=""):
+        """Format every reading through one ``%`` template, straight from the columns."""
+        if not len(self):
+            return []
+        stamps = np.datetime_as_string(self.timestamp_ms.astype("datetime64[ms]"), unit="ms")
+        columns = [
+            stamps.tolist(),
+            self.patients.json_strings()[self.patient].tolist(),
+            self.wards.json_strings()[self.ward].tolist(),
+        ]
+        for field in FLOAT_FIELDS:
+            columns.append(_format_tenths(self.values[field]).tolist())
+        pain = self.pain.astype(np.int64)
+        columns.append(_PAIN[np.where(pain < 0, len(_PAIN) - 1, pain)].tolist())
+        template = (
+            prefix.replace("%", "%%")
+            + '{"@timestamp":"%sZ","patient_id":%s,"ward":%s,'
+            + ",".join(f'"{f}":%s' for f in FLOAT_FIELDS)
+            + ',"pain_score":%s}'
+            + suffix.replace("%", "%%")
+        )
+        return [template % row for row in zip(*columns)]
+
+    def _source_lines(self):
+        return self._format_rows()
+
+    def _meta(self, index, op_type):
+        return json.dumps({op_type: {"_index": index}}, separators=(",", ":")) + "\n"
+
+    def to_actions(self, index, op_type="create"):
+        """Encoded bulk actions (metadata + source line), one per reading.
+
+        Missing vitals are written as ``null``, which Elasticsearch treats
+        as absent.
+        """
+        return [row.encode() for row in self._format_rows(self._meta(index, op_type), "\n")]
+
+    def to_ndjson(self, index, op_type="create"):
+        """One ``_bulk`` body for the whole batch, encoded in a single pass."""
+        return "".join(self._format_rows(self._meta(index, op_type), "\n")).encode()
+
+    # -- local analytics -------------------------------------------------
+
+    def summary(self):
+        """Per-patient count, latest time, and mean/min/max/latest of each vital.
+
+        Computed with grouped NumPy reductions; NaN readings are ignored.
+        Returns ``{patient_id: {...}}``.
+        """
+        if not len(self):
+            return {}
+        order = np.lexsort((self.timestamp_ms, self.patient))
+        codes = self.patient[order]
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        ends = np.r_[starts[1:], len(codes)] - 1
+        counts = np.diff(np.r_[starts, len(codes)])
+        stats = {}
+        fields = {f: self.values[f][order] for f in FLOAT_FIELDS}
+        pain = self.pain[order].astype(np.float32)
+        fields["pain_score"] = np.where(pain == PAIN_MISSING, np.nan, pain)
+        for field, values in fields.items():
+            present = ~np.isnan(values)
+            n = np.add.reduceat(present, starts)
+            total = np.add.reduceat(np.where(present, values, 0.0).astype(np.float64), starts)
+            lo = np.minimum.reduceat(np.where(present, values, np.inf), starts)
+            hi = np.maximum.reduceat(np.where(present, values, -np.inf), starts)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = total / n
+            stats[field] = (mean, np.where(n, lo, np.nan), np.where(n, hi, np.nan),
+                            values[ends])
+        latest = self.timestamp_ms[order][ends].astype("datetime64[ms]")
+        out = {}
+        for i, code in enumerate(codes[starts].tolist()):
+            entry = {"readings": int(counts[i]), "latest_at": str(latest[i]) + "Z"}
+            for field, (mean, lo, hi, last) in stats.items():
+                entry[field] = {
+                    "mean": None if np.isnan(mean[i]) else round(float(mean[i]), 1),
+                    "min": None if np.isnan(lo[i]) else round(float(lo[i]), 1),
+                    "max": None if np.isnan(hi[i]) else round(float(hi[i]), 1),
+                    "latest": None if np.isnan(last[i]) else round(float(last[i]), 1),
+                }
+            out[self.patients.names[code]] = entry
+        return out
@@ -0,0 +1,352 @@
+"""Vectorised synthetic vitals generator for load and capacity testing.
+
+``generate_vitals`` in ``seed_data`` hand-codes the 8 demo patients. This
+module generalises their story arcs into parameter tables and produces
+readings for any number of patients as NumPy column arrays, so datasets
+with 10k+ patients at 1-minute cadence build in seconds.
+
+Every patient draws from its own RNG stream seeded by ``(seed, patient
+index)``; the output for a patient does not depend on how patients are
+chunked or which worker generates them.
+
+Usage::
+
+    for batch in iter_vitals_columns(10_000, hours=48, cadence_minutes=1):
+        streaming_bulk(client, settings.INDEX_VITALS, to_docs(batch), op_type="create")
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+VITAL_FIELDS = (
+    "heart_rate",
+    "systolic_bp",
+    "diastolic_bp",
+    "oxygen_saturation",
+    "temperature",
+    "respiratory_rate",
+    "pain_score",
+)
+
+# Same physiological clamps as seed_data._make_vital
+VITAL_LIMITS = {
+    "heart_rate": (30, 200),
+    "systolic_bp": (60, 250),
+    "diastolic_bp": (30, 150),
+    "oxygen_saturation": (50, 100),
+    "temperature": (35.0, 42.0),
+    "respiratory_rate": (8, 45),
+    "pain_score": (0, 10),
+}
+
+# ---------------------------------------------------------------------------
+# Story arcs
+#
+# ``vitals`` maps each field to (start, end, noise): a curve from start to
+# end over the admission plus uniform noise in [-noise, +noise].
+# Optional keys:
+#   curve       "linear" (default) or "sqrt" (front-loaded recovery)
+#   onset       (hours_before_end, {field: (end, noise)}) - a second phase
+#               continuing from the first phase's end value (PAT-008)
+#   window      hours before end with any data at all (PAT-007)
+#   dips        (every_hours, duration_minutes, {field: (lo, hi)}) -
+#               periodic transient worsening added on top (PAT-003)
+# ---------------------------------------------------------------------------
+
+ARCS = {
+    # PAT-001: pneumonia + COPD, steadily worse
+    "deteriorating": {
+        "ward": "ICU",
+        "vitals": {
+            "heart_rate": (88, 115, 3),
+            "systolic_bp": (130, 145, 5),
+            "diastolic_bp": (82, 90, 3),
+            "oxygen_saturation": (93, 86, 1.0),
+            "temperature": (37.8, 39.5, 0.15),
+            "respiratory_rate": (20, 30, 1.5),
+            "pain_score": (4, 8, 0.5),
+        },
+    },
+    # PAT-002: post-appendectomy, clean recovery
+    "recovering": {
+        "ward": "surgical",
+        "vitals": {
+            "heart_rate": (95, 75, 2),
+            "systolic_bp": (125, 118, 4),
+            "diastolic_bp": (80, 75, 3),
+            "oxygen_saturation": (94, 98, 0.5),
+            "temperature": (37.6, 36.8, 0.1),
+            "respiratory_rate": (18, 15, 1),
+            "pain_score": (5, 1, 0.4),
+        },
+    },
+    # PAT-003: heart failure, slow improvement with recurring dips
+    "slow_recovery": {
+        "ward": "cardiac",
+        "vitals": {
+            "heart_rate": (100, 90, 4),
+            "systolic_bp": (140, 132, 6),
+            "diastolic_bp": (88, 82, 4),
+            "oxygen_saturation": (90, 94, 1.2),
+            "temperature": (37.4, 37.0, 0.15),
+            "respiratory_rate": (22, 19, 1.5),
+            "pain_score": (3, 2, 0.5),
+        },
+        "dips": (6, 45, {
+            "heart_rate": (5, 10),
+            "oxygen_saturation": (-3, -1),
+            "respiratory_rate": (1, 3),
+        }),
+    },
+    # PAT-004: DKA, most recovery happens early
+    "rapid_recovery": {
+        "ward": "ICU",
+        "curve": "sqrt",
+        "vitals": {
+            "heart_rate": (120, 78, 2.5),
+            "systolic_bp": (100, 120, 4),
+            "diastolic_bp": (60, 76, 3),
+            "oxygen_saturation": (90, 98, 0.6),
+            "temperature": (38.5, 36.9, 0.12),
+            "respiratory_rate": (28, 16, 1.2),
+            "pain_score": (6, 1, 0.4),
+        },
+    },
+    # PAT-005: normal delivery, normal throughout
+    "stable": {
+        "ward": "maternity",
+        "vitals": {
+            "heart_rate": (76, 76, 4),
+            "systolic_bp": (115, 115, 5),
+            "diastolic_bp": (72, 72, 3),
+            "oxygen_saturation": (98, 98, 0.5),
+            "temperature": (36.7, 36.7, 0.15),
+            "respiratory_rate": (15, 15, 1),
+            "pain_score": (1, 1, 0.5),
+        },
+    },
+    # PAT-006: hip fracture, stable vitals, persistent pain
+    "stable_pain": {
+        "ward": "orthopedic",
+        "vitals": {
+            "heart_rate": (74, 74, 3),
+            "systolic_bp": (135, 135, 5),
+            "diastolic_bp": (80, 80, 3),
+            "oxygen_saturation": (96, 96, 0.5),
+            "temperature": (36.9, 36.9, 0.1),
+            "respiratory_rate": (16, 16, 1),
+            "pain_score": (6, 4, 0.6),
+        },
+    },
+    # PAT-007: STEMI, admitted 4 hours ago, unstable
+    "acute": {
+        "ward": "emergency",
+        "window": 4,
+        "vitals": {
+            "heart_rate": (118, 105, 6),
+            "systolic_bp": (90, 105, 12),
+            "diastolic_bp": (55, 65, 8),
+            "oxygen_saturation": (89, 93, 1.5),
+            "temperature": (37.2, 37.2, 0.2),
+            "respiratory_rate": (24, 21, 2),
+            "pain_score": (9, 7, 0.5),
+        },
+    },
+    # PAT-008: looks fine, then subtle deterioration over the last 4 hours
+    "late_onset": {
+        "ward": "respiratory",
+        "vitals": {
+            "heart_rate": (82, 78, 3),
+            "systolic_bp": (122, 122, 5),
+            "diastolic_bp": (76, 76, 3),
+            "oxygen_saturation": (95, 96, 0.5),
+            "temperature": (37.3, 37.0, 0.1),
+            "respiratory_rate": (17, 16, 1),
+            "pain_score": (2, 2, 0.4),
+        },
+        "onset": (4, {
+            "heart_rate": (88, 2),
+            "oxygen_saturation": (91, 0.4),
+            "temperature": (37.4, 0.1),
+            "respiratory_rate": (22, 0.8),
+            "pain_score": (4, 0.4),
+        }),
+    },
+}
+
+# Default mix across a synthetic hospital population
+DEFAULT_ARC_WEIGHTS = {
+    "stable": 0.30,
+    "recovering": 0.25,
+    "stable_pain": 0.10,
+    "slow_recovery": 0.10,
+    "rapid_recovery": 0.08,
+    "deteriorating": 0.07,
+    "late_onset": 0.07,
+    "acute": 0.03,
+}
+
+
+def timeline(hours=48, cadence_minutes=15, end=None):
+    """Return the reading timestamps as a ``datetime64[ms]`` array.
+
+    The series ends at ``end`` (default: now) rounded down to the cadence.
+    """
+    end = end or datetime.now(timezone.utc)
+    end_ms = int(end.timestamp() * 1000)
+    step_ms = cadence_minutes * 60_000
+    end_ms -= end_ms % step_ms
+    n = hours * 60 // cadence_minutes
+    offsets = np.arange(n - 1, -1, -1, dtype=np.int64) * step_ms
+    return (end_ms - offsets).astype("datetime64[ms]")
+
+
+def _patient_vitals(rng, arc, n, cadence_minutes, jitter, out):
+    """Fill ``out`` (7, n) with one patient's clamped values; return its row mask."""
+    t = np.linspace(0.0, 1.0, n) if n > 1 else np.zeros(1)
+    mask = np.ones(n, dtype=bool)
+
+    window = arc.get("window")
+    if window:
+        first = max(0, n - window * 60 // cadence_minutes)
+        mask[:first] = False
+        t = np.clip((np.arange(n) - first) / max(n - first - 1, 1), 0.0, 1.0)
+    curve = np.sqrt(t) if arc.get("curve") == "sqrt" else t
+
+    onset_idx = n
+    onset_spec = {}
+    if arc.get("onset"):
+        onset_hours, onset_spec = arc["onset"]
+        onset_idx = max(1, n - onset_hours * 60 // cadence_minutes)
+        curve = np.minimum(np.arange(n) / onset_idx, 1.0)
+        t_det = np.clip((np.arange(n) - onset_idx) / max(n - onset_idx - 1, 1), 0.0, 1.0)
+
+    for row, field in enumerate(VITAL_FIELDS):
+        start, end, noise = arc["vitals"][field]
+        # Per-patient variation: shift the whole arc by up to ``jitter``
+        # times the field's noise scale
+        shift = rng.uniform(-jitter, jitter) * noise
+        values = start + (end - start) * curve + shift
+        if field in onset_spec:
+            det_end, det_noise = onset_spec[field]
+            det = end + (det_end - end) * t_det + shift
+            values = np.where(np.arange(n) >= onset_idx, det, values)
+            noise = np.where(np.arange(n) >= onset_idx, det_noise, noise)
+        out[row] = values + rng.uniform(-1.0, 1.0, n) * noise
+
+    if arc.get("dips"):
+        every_hours, duration_minutes, effects = arc["dips"]
+        minutes = np.arange(n) * cadence_minutes
+        in_dip = (minutes % (every_hours * 60)) < duration_minutes
+        for field, (lo, hi) in effects.items():
+            out[VITAL_FIELDS.index(field)] += in_dip * rng.uniform(lo, hi, n)
+
+    for row, field in enumerate(VITAL_FIELDS):
+        np.clip(out[row], *VITAL_LIMITS[field], out=out[row])
+    return mask
+
+
+def iter_vitals_columns(
+    n_patients,
+    hours=48,
+    cadence_minutes=15,
+    arc_weights=None,
+    seed=42,
+    end=None,
+    patients_per_chunk=1000,
+    first_patient=0,
+    id_prefix="SIM",
+    jitter=2.0,
+):
+    """Yield column batches covering ``n_patients`` patients.
+
+    Each batch is a dict of equal-length arrays - ``@timestamp``
+    (``datetime64[ms]``), ``patient`` and ``ward`` (``int32`` codes into
+    the ``patient_ids``/``ward_names`` tables carried in the same dict)
+    and one array per vital (``float32``, rounded to 0.1; ``pain_score``
+    is ``int8``) - plus ``arcs``, the arc name chosen per patient code.
+    Rows are patient-major and time-ordered within a patient.
+
+    ``first_patient`` offsets patient numbering (and RNG streams) so
+    several workers can generate disjoint shards of the same population.
+    """
+    weights = arc_weights or DEFAULT_ARC_WEIGHTS
+    arc_names = list(weights)
+    probs = np.array([weights[a] for a in arc_names], dtype=float)
+    probs /= probs.sum()
+    ward_names = sorted({ARCS[a]["ward"] for a in arc_names})
+    ts = timeline(hours, cadence_minutes, end)
+    n = len(ts)
+
+    stop = first_patient + n_patients
+    for chunk_start in range(first_patient, stop, patients_per_chunk):
+        chunk_ids = range(chunk_start, min(chunk_start + patients_per_chunk, stop))
+        k = len(chunk_ids)
+        data = np.empty((len(VITAL_FIELDS), k * n))
+        mask = np.empty(k * n, dtype=bool)
+        arcs, wards = [], []
+        for i, pid in enumerate(chunk_ids):
+            rng = np.random.default_rng([seed, pid])
+            arc_name = arc_names[rng.choice(len(arc_names), p=probs)]
+            arc = ARCS[arc_name]
+            rows = slice(i * n, (i + 1) * n)
+            mask[rows] = _patient_vitals(rng, arc, n, cadence_minutes, jitter, data[:, rows])
+            arcs.append(arc_name)
+            wards.append(ward_names.index(arc["ward"]))
+
+        def keep(values):
+            return values if mask.all() else values[mask]
+
+        batch = {
+            "@timestamp": keep(np.tile(ts, k)),
+            "patient": keep(np.repeat(np.arange(k, dtype=np.int32), n)),
+            "ward": keep(np.repeat(np.array(wards, dtype=np.int32), n)),
+            "patient_ids": np.array([f"{id_prefix}-{pid:06d}" for pid in chunk_ids]),
+            "ward_names": np.array(ward_names),
+            "arcs": np.array(arcs),
+        }
+        for row, field in enumerate(VITAL_FIELDS):
+            if field == "pain_score":
+                batch[field] = keep(data[row]).astype(np.int8)
+            else:
+                batch[field] = np.round(keep(data[row]), 1).astype(np.float32)
+        yield batch
+
+
+def generate_vitals_columns(n_patients, **kwargs):
+    """Generate all patients as a single column batch (see ``iter_vitals_columns``)."""
+    kwargs.setdefault("patients_per_chunk", n_patients)
+    return next(iter_vitals_columns(n_patients, **kwargs))
+
+
+ROW_COLUMNS = ("@timestamp", "patient", "ward") + VITAL_FIELDS
+
+
+def select_rows(batch, index):
+    """Return a batch holding only the rows at ``index`` (array or slice)."""
+    selected = dict(batch)
+    for key in ROW_COLUMNS:
+        selected[key] = batch[key][index]
+    return selected
+
+
+def to_docs(batch):
+    """Yield vitals documents (the ``_make_vital`` shape) from a column batch."""
+    stamps = np.datetime_as_string(batch["@timestamp"], unit="ms")
+    patient_ids = batch["patient_ids"][batch["patient"]].tolist()
+    wards = batch["ward_names"][batch["ward"]].tolist()
+    # float32 -> float64 before rounding so 122.3 serialises as 122.3
+    columns = [
+        batch[f].tolist() if f == "pain_score"
+        else np.round(batch[f].astype(np.float64), 1).tolist()
+        for f in VITAL_FIELDS
+    ]
+    for i, row in enumerate(zip(*columns)):
+        doc = {
+            "@timestamp": stamps[i] + "Z",
+            "patient_id": patient_ids[i],
+            "ward": wards[i],
+        }
+        doc.update(zip(VITAL_FIELDS, row))
+        yield doc
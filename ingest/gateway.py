@@ -0,0 +1,388 @@
+"""Asyncio ingestion gateway for bedside monitor vitals.
+
+Monitors POST readings as NDJSON (one JSON object per line); the gateway
+validates each line against the vitals TSDS schema, buffers accepted
+readings in a bounded queue and flushes them in micro-batches - when
+``GATEWAY_BATCH_SIZE`` readings are waiting or ``GATEWAY_FLUSH_INTERVAL``
+has passed since the oldest one arrived - through ``VitalsRouter``, so
+late readings reach the history index and repeats are dropped.
+
+Backpressure runs end to end: at most ``GATEWAY_MAX_IN_FLIGHT`` flushes
+are outstanding, bulk 429s are retried with backoff inside the flush, and
+a failing cluster - or readings it failed with 5xx or no answer - is
+retried with capped backoff while holding the batch, for as long as it
+takes: accepted readings are never given up on. While flushes are
+stalled the queue fills; a request whose readings do not fit within
+``GATEWAY_ENQUEUE_TIMEOUT`` seconds is refused with 429 and a
+``Retry-After`` header, and none of its readings are queued.
+
+Endpoints:
+    POST /vitals   NDJSON body -> {"accepted", "invalid", "errors"}
+    GET  /stats    queue depth, in-flight flushes, ingest lag, router counts
+    GET  /health   liveness
+
+Usage:
+    python -m ingest.gateway                     # HTTP on GATEWAY_HOST:GATEWAY_PORT
+    python -m ingest.gateway --stdin < feed.ndjson
+    python -m ingest.gateway --spool             # write-ahead spool between queue and ES
+"""
+
+import argparse
+import asyncio
+import math
+import sys
+import time
+from collections import deque
+
+from aiohttp import web
+
+from config import settings
+from indices.templates import vitals_index_template
+from indices.vitals_gen import VITAL_LIMITS
+from ingest.router import VitalsRouter, parse_timestamp, reading_key
+from ingest.spool import Spool
+from utils import codec
+from utils.bulk import BulkRetryError
+from utils.transport import backoff_delay
+
+SCHEMA = vitals_index_template()["template"]["mappings"]["properties"]
+NUMERIC_TYPES = {"float", "half_float", "scaled_float", "double", "integer", "long", "short", "byte"}
+LAG_WINDOW = 10_000  # recent readings kept for lag percentiles
+
+
+def validate_reading(doc):
+    """Return an error message if ``doc`` does not fit the vitals schema, else None."""
+    if not isinstance(doc, dict):
+        return "reading must be a JSON object"
+    for field in ("@timestamp", "patient_id", "ward"):
+        if field not in doc:
+            return f"missing {field}"
+    try:
+        parse_timestamp(doc["@timestamp"])
+    except (TypeError, ValueError):
+        return f"bad @timestamp {doc['@timestamp']!r}"
+    for field, value in doc.items():
+        mapping = SCHEMA.get(field)
+        if mapping is None:
+            return f"unknown field {field}"
+        kind = mapping["type"]
+        if kind == "keyword":
+            if not isinstance(value, str) or not value:
+                return f"{field} must be a non-empty string"
+        elif kind in NUMERIC_TYPES:
+            if isinstance(value, bool) or not isinstance(value, (int, float)) \
+                    or not math.isfinite(value):
+                return f"{field} must be a number"
+            if kind in ("integer", "long", "short", "byte") and value != int(value):
+                return f"{field} must be an integer"
+            lo, hi = VITAL_LIMITS.get(field, (-math.inf, math.inf))
+            if not lo <= value <= hi:
+                return f"{field}={value} outside [{lo}, {hi}]"
+    return None
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))], 3)
+
+
+class IngestGateway:
+    """Bounded queue + micro-batcher in front of ``VitalsRouter``.
+
+    ``router`` may also be an ``ingest.spool.Spool``, which exposes the
+    same ``route``/``stats`` pair and makes each flush a local disk write.
+    """
+
+    def __init__(
+        self,
+        router,
+        queue_size=None,
+        batch_size=None,
+        flush_interval=None,
+        max_in_flight=None,
+        enqueue_timeout=None,
+    ):
+        self.router = router
+        self.queue_size = queue_size or settings.GATEWAY_QUEUE_SIZE
+        self.batch_size = batch_size or settings.GATEWAY_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.GATEWAY_FLUSH_INTERVAL
+        self.max_in_flight = max_in_flight or settings.GATEWAY_MAX_IN_FLIGHT
+        self.enqueue_timeout = enqueue_timeout or settings.GATEWAY_ENQUEUE_TIMEOUT
+        self._queue = deque()  # (reading, enqueued_at)
+        self._changed = None
+        self._slots = None
+        self._flushes = set()
+        self._batcher = None
+        self._closing = False
+        self._lag = deque(maxlen=LAG_WINDOW)  # reading time -> indexed, seconds
+        self._wait = deque(maxlen=LAG_WINDOW)  # time spent queued, seconds
+        self.last_error = None  # most recent flush failure
+        self._counts = {
+            "accepted": 0,
+            "invalid": 0,
+            "refused": 0,
+            "batches": 0,
+            "flush_retries": 0,
+            "dropped": 0,
+        }
+
+    # -- lifecycle -------------------------------------------------------
+
+    async def start(self):
+        self._changed = asyncio.Condition()
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._batcher = asyncio.create_task(self._run_batcher())
+
+    async def stop(self):
+        """Flush everything still queued, then stop."""
+        async with self._changed:
+            self._closing = True
+            self._changed.notify_all()
+        await self._batcher
+        if self._flushes:
+            await asyncio.gather(*self._flushes)
+
+    # -- producer side ---------------------------------------------------
+
+    async def submit(self, readings):
+        """Queue validated ``readings`` all-or-nothing.
+
+        Waits up to ``enqueue_timeout`` for room; returns False (nothing
+        queued) if the queue stays too full, which callers turn into 429.
+        """
+        if len(readings) > self.queue_size:
+            raise ValueError(f"{len(readings)} readings exceed the queue size {self.queue_size}")
+        deadline = time.monotonic() + self.enqueue_timeout
+        async with self._changed:
+            while self.queue_size - len(self._queue) < len(readings):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counts["refused"] += len(readings)
+                    return False
+                try:
+                    await asyncio.wait_for(self._changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            now = time.monotonic()
+            self._queue.extend((reading, now) for reading in readings)
+            self._counts["accepted"] += len(readings)
+            self._changed.notify_all()
+        return True
+
+    def parse_lines(self, lines):
+        """Decode and validate NDJSON lines; returns ``(readings, errors)``."""
+        readings, errors = [], []
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                doc = codec.loads(line)
+            except Exception as e:  # codec backends raise different types
+                errors.append(f"line {number}: invalid JSON ({e})")
+                continue
+            problem = validate_reading(doc)
+            if problem:
+                errors.append(f"line {number}: {problem}")
+            else:
+                readings.append(doc)
+        self._counts["invalid"] += len(errors)
+        return readings, errors
+
+    # -- consumer side ---------------------------------------------------
+
+    async def _run_batcher(self):
+        while True:
+            async with self._changed:
+                while not self._queue and not self._closing:
+                    await self._changed.wait()
+                if not self._queue:
+                    return
+                # Let a partial batch fill until the oldest reading is due
+                due = self._queue[0][1] + self.flush_interval
+                while len(self._queue) < self.batch_size and not self._closing:
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+            # Waiting for a flush slot (outside the lock) is the backpressure
+            # point: the queue keeps filling until submit() starts refusing.
+            await self._slots.acquire()
+            async with self._changed:
+                count = min(self.batch_size, len(self._queue))
+                batch = [self._queue.popleft() for _ in range(count)]
+                self._changed.notify_all()
+            task = asyncio.create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch):
+        """Route ``batch``, retrying what failed with backoff while holding the slot.
+
+        The readings were already acknowledged to the monitors, so anything
+        that failed for a retryable reason - a failed request, or readings
+        the router hands back (``BulkRetryError``) - is retried with capped
+        backoff until the cluster takes it. Meanwhile the slot stays held,
+        the queue fills and ``submit`` starts refusing with 429. Only
+        readings rejected for good count as ``dropped`` and stay out of the
+        lag figures.
+        """
+        try:
+            pending = [reading for reading, _ in batch]
+            lost = []
+            attempt = 0
+            while True:
+                try:
+                    result = await asyncio.to_thread(self.router.route, pending)
+                except BulkRetryError as e:
+                    lost.extend(f["doc"] for f in e.result["failed"])
+                    pending = [f["doc"] for f in e.failed]
+                    self.last_error = str(e)
+                except Exception as e:  # nothing was counted; retry every pending reading
+                    self.last_error = repr(e)
+                else:
+                    lost.extend(f["doc"] for f in result.get("failed", ()))
+                    pending = []
+                if not pending:
+                    break
+                self._counts["flush_retries"] += 1
+                await asyncio.sleep(backoff_delay(min(attempt, 6)))
+                attempt += 1
+            self._counts["dropped"] += len(lost)
+            lost = {reading_key(doc, parse_timestamp(doc["@timestamp"])) for doc in lost}
+            now_mono = time.monotonic()
+            now_wall = time.time()
+            delivered = 0
+            for reading, enqueued_at in batch:
+                ts = parse_timestamp(reading["@timestamp"])
+                if reading_key(reading, ts) in lost:
+                    continue
+                delivered += 1
+                self._wait.append(now_mono - enqueued_at)
+                self._lag.append(now_wall - ts.timestamp())
+            if delivered:
+                self._counts["batches"] += 1
+        finally:
+            self._slots.release()
+
+    # -- observability ---------------------------------------------------
+
+    def stats(self):
+        lag = list(self._lag)
+        wait = list(self._wait)
+        return {
+            **self._counts,
+            "queue_depth": len(self._queue),
+            "queue_size": self.queue_size,
+            "in_flight": len(self._flushes),
+            "ingest_lag_p50": _percentile(lag, 50),
+            "ingest_lag_p95": _percentile(lag, 95),
+            "queue_wait_p95": _percentile(wait, 95),
+            "last_error": self.last_error,
+            "router": self.router.stats(),
+        }
+
+
+# ========================================================================
+# HTTP + stdin front ends
+# ========================================================================
+
+
+def build_app(gateway):
+    """aiohttp application exposing ``gateway``."""
+
+    async def post_vitals(request):
+        body = await request.read()
+        readings, errors = gateway.parse_lines(body.splitlines())
+        try:
+            queued = await gateway.submit(readings)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=413)
+        if not queued:
+            return web.json_response(
+                {"error": "ingest queue full", "accepted": 0},
+                status=429,
+                headers={"Retry-After": str(max(1, round(gateway.flush_interval * 2)))},
+            )
+        status = 200 if not errors else 207
+        return web.json_response(
+            {"accepted": len(readings), "invalid": len(errors), "errors": errors[:20]},
+            status=status,
+        )
+
+    async def get_stats(request):
+        return web.json_response(gateway.stats())
+
+    async def get_health(request):
+        return web.json_response({"status": "ok"})
+
+    async def on_startup(app):
+        await gateway.start()
+
+    async def on_cleanup(app):
+        await gateway.stop()
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.add_routes([
+        web.post("/vitals", post_vitals),
+        web.get("/stats", get_stats),
+        web.get("/health", get_health),
+    ])
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+async def ingest_stream(gateway, stream, lines_per_submit=500):
+    """Feed NDJSON lines from a blocking ``stream`` (e.g. stdin) through ``gateway``."""
+    await gateway.start()
+    while True:
+        lines = await asyncio.to_thread(
+            lambda: [line for line in (stream.readline() for _ in range(lines_per_submit)) if line]
+        )
+        if not lines:
+            break
+        readings, errors = gateway.parse_lines(lines)
+        for error in errors:
+            print(f"  invalid: {error}", file=sys.stderr)
+        # stdin can simply wait for room instead of being refused
+        while readings and not await gateway.submit(readings):
+            pass
+    await gateway.stop()
+    return gateway.stats()
+
+
+def main():
+    from utils.api_client import PravaahClient
+
+    parser = argparse.ArgumentParser(description="Vitals ingestion gateway")
+    parser.add_argument("--host", default=settings.GATEWAY_HOST)
+    parser.add_argument("--port", type=int, default=settings.GATEWAY_PORT)
+    parser.add_argument("--stdin", action="store_true", help="Read NDJSON from stdin and exit at EOF")
+    parser.add_argument("--spool", nargs="?", const=settings.SPOOL_DIR, metavar="DIR",
+                        help="Spool accepted readings to disk before indexing")
+    args = parser.parse_args()
+
+    client = PravaahClient()
+    router = VitalsRouter(client)
+    spool = Spool(client, router=router, directory=args.spool) if args.spool else None
+    gateway = IngestGateway(spool or router)
+    try:
+        if args.stdin:
+            stats = asyncio.run(ingest_stream(gateway, sys.stdin))
+            for key, value in stats.items():
+                print(f"  {key}: {value}")
+        else:
+            web.run_app(build_app(gateway), host=args.host, port=args.port)
+    finally:
+        if spool is not None:
+            spool.close()
+
+
+if __name__ == "__main__":
+    main()
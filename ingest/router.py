@@ -0,0 +1,282 @@
+"""Route vitals readings by time: live TSDS, historical sidecar, or reject.
+
+The vitals data stream only accepts readings inside its time window
+(``index.look_back_time`` .. ``index.look_ahead_time``); anything else is
+rejected and, through ``bulk_index``, fails the whole request. Delayed
+device uploads and backfills are routine, so ``VitalsRouter`` classifies
+each reading before sending it:
+
+    live       inside the window                  -> metrics-patient-vitals
+    late       older than look-back (minus margin) -> patient-vitals-history
+    rejected   invalid, or too far in the future  -> counted, not sent
+
+Repeats are dropped twice over: a bounded in-memory set of recently seen
+``(patient_id, ward, @timestamp)`` keys catches retransmits cheaply, and
+Elasticsearch catches the rest - the TSDS derives ``_id`` from the same
+key and the sidecar is written with an equivalent deterministic ``_id``,
+both with ``op_type=create``, so a repeat comes back as a 409.
+
+Usage::
+
+    router = VitalsRouter(client)
+    router.route(docs)
+    router.stats()  # {"received", "live", "late", "out_of_order", "duplicates", "rejected", ...}
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from config import settings
+from utils.bulk import BulkRetryError, split_conflicts, split_retryable, streaming_bulk
+
+# TSDS item error for a timestamp outside every backing index's range
+OUT_OF_RANGE_MARKER = "outside of ranges"
+
+
+def parse_timestamp(value):
+    """Parse an ISO-8601 string or epoch milliseconds into an aware datetime."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+    if isinstance(value, str) and value:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    raise ValueError(f"Unreadable @timestamp: {value!r}")
+
+
+def reading_key(doc, ts):
+    """Identity of a reading: the TSDS dimensions plus the timestamp in ms."""
+    return f"{doc['patient_id']}|{doc.get('ward', '')}|{int(ts.timestamp() * 1000)}"
+
+
+class VitalsRouter:
+    """Classify, deduplicate and index vitals readings.
+
+    Parameters
+    ----------
+    client : utils.api_client.PravaahClient
+        Client used for the bulk requests.
+    look_back_hours, look_ahead_minutes : int, optional
+        The TSDS window (default: ``settings.VITALS_LOOK_*``).
+    margin_minutes : int, optional
+        Readings within this much of the look-back edge go to the sidecar,
+        so they cannot fall out of the window while in flight.
+    dedup_size : int, optional
+        Number of recent reading keys remembered for duplicate detection.
+    """
+
+    def __init__(
+        self,
+        client,
+        look_back_hours=None,
+        look_ahead_minutes=None,
+        margin_minutes=None,
+        dedup_size=None,
+    ):
+        self.client = client
+        self.look_back = timedelta(hours=look_back_hours or settings.VITALS_LOOK_BACK_HOURS)
+        self.look_ahead = timedelta(
+            minutes=look_ahead_minutes or settings.VITALS_LOOK_AHEAD_MINUTES
+        )
+        self.margin = timedelta(
+            minutes=settings.VITALS_ROUTE_MARGIN_MINUTES if margin_minutes is None
+            else margin_minutes
+        )
+        self.dedup_size = dedup_size or settings.VITALS_DEDUP_CACHE
+        self._seen = OrderedDict()
+        self._latest = {}  # patient_id -> newest timestamp seen
+        self._lock = threading.Lock()
+        self._counts = {
+            "received": 0,
+            "live": 0,
+            "late": 0,
+            "out_of_order": 0,
+            "duplicates": 0,
+            "rejected": 0,
+            "indexed": 0,
+            "failed": 0,
+        }
+        self.errors = []  # most recent rejection / failure reasons
+
+    # -- classification --------------------------------------------------
+
+    def _note_error(self, reason):
+        self.errors.append(reason)
+        del self.errors[:-20]
+
+    def _is_repeat(self, key):
+        if key in self._seen:
+            self._seen.move_to_end(key)
+            return True
+        self._seen[key] = None
+        if len(self._seen) > self.dedup_size:
+            self._seen.popitem(last=False)
+        return False
+
+    def _forget(self, docs):
+        """Drop ``docs`` from the duplicate filter so they can be sent again."""
+        with self._lock:
+            for doc in docs:
+                self._seen.pop(reading_key(doc, parse_timestamp(doc["@timestamp"])), None)
+
+    def _classify(self, docs, now):
+        """Classify ``docs``; returns ``(routed, counts)`` without touching totals.
+
+        Ordering is not judged here (see ``_track_order``): a reading only
+        moves its patient's clock once it has been accepted.
+        """
+        now = now or datetime.now(timezone.utc)
+        oldest_live = now - self.look_back + self.margin
+        newest = now + self.look_ahead
+        routed = {"live": [], "late": [], "ordered": []}  # ordered: both, as received
+        counts = {"received": 0, "duplicates": 0, "rejected": 0}
+        with self._lock:
+            for doc in docs:
+                counts["received"] += 1
+                try:
+                    ts = parse_timestamp(doc.get("@timestamp"))
+                    if not doc.get("patient_id"):
+                        raise ValueError("missing patient_id")
+                except (TypeError, ValueError) as e:
+                    counts["rejected"] += 1
+                    self._note_error(str(e))
+                    continue
+                if ts > newest:
+                    counts["rejected"] += 1
+                    self._note_error(f"{doc['patient_id']}: @timestamp {ts.isoformat()} in the future")
+                    continue
+                if self._is_repeat(reading_key(doc, ts)):
+                    counts["duplicates"] += 1
+                    continue
+                doc = dict(doc, **{"@timestamp": ts.isoformat().replace("+00:00", "Z")})
+                routed["live" if ts >= oldest_live else "late"].append(doc)
+                routed["ordered"].append(doc)
+        counts["live"] = len(routed["live"])
+        counts["late"] = len(routed["late"])
+        return routed, counts
+
+    def _track_order(self, docs):
+        """Count ``docs`` older than their patient's newest accepted reading."""
+        out_of_order = 0
+        with self._lock:
+            for doc in docs:
+                ts = parse_timestamp(doc["@timestamp"])
+                latest = self._latest.get(doc["patient_id"])
+                if latest is not None and ts < latest:
+                    out_of_order += 1
+                else:
+                    self._latest[doc["patient_id"]] = ts
+        return out_of_order
+
+    def _add(self, counts):
+        with self._lock:
+            for key, value in counts.items():
+                self._counts[key] += value
+
+    def classify(self, docs, now=None):
+        """Split ``docs`` into ``{"live", "late"}`` lists, counting the rest.
+
+        Invalid, future and repeated readings are counted and dropped.
+        Timestamps are normalised to ISO-8601 UTC strings.
+        """
+        routed, counts = self._classify(docs, now)
+        counts["out_of_order"] = self._track_order(routed["ordered"])
+        self._add(counts)
+        return {"live": routed["live"], "late": routed["late"]}
+
+    # -- indexing --------------------------------------------------------
+
+    def _send(self, index, docs, id_fn=None, pipeline=None, controller=None):
+        """Returns ``(indexed, conflicts, failed)`` for one target."""
+        if not docs:
+            return 0, 0, []
+        report = streaming_bulk(
+            self.client, index, docs, op_type="create", pipeline=pipeline, id_fn=id_fn,
+            controller=controller,
+        )
+        conflicts, failed = split_conflicts(report["failed"])
+        return report["indexed"], len(conflicts), failed
+
+    def route(self, docs, now=None, pipeline=None, controller=None):
+        """Classify and index ``docs``; returns this call's counts.
+
+        ``controller`` (an ``AdaptiveBatchController``) sizes the bulk
+        chunks of both targets.
+
+        Live readings the TSDS still refuses as out of range (the backing
+        indices' ranges can trail ``now``) are re-sent to the sidecar.
+
+        Readings that failed (other than 409) are forgotten by the
+        duplicate filter. If any failed for a retryable reason (no answer,
+        429, 5xx) a ``BulkRetryError`` is raised after the rest has been
+        counted: its ``failed`` entries are the readings to send again and
+        its ``result`` is this call's counts. If a request fails outright
+        nothing is counted and the whole batch is forgotten before the
+        error propagates, so the caller can retry the same batch.
+        """
+        routed, counts = self._classify(docs, now)
+        try:
+            live_indexed, live_conflicts, live_failed = self._send(
+                settings.INDEX_VITALS, routed["live"], pipeline=pipeline, controller=controller
+            )
+            spill = [
+                f["doc"] for f in live_failed if OUT_OF_RANGE_MARKER in str(f["error"])
+            ]
+            live_failed = [
+                f for f in live_failed if OUT_OF_RANGE_MARKER not in str(f["error"])
+            ]
+            late_indexed, late_conflicts, late_failed = self._send(
+                settings.INDEX_VITALS_HISTORY,
+                routed["late"] + spill,
+                id_fn=history_id,
+                pipeline=pipeline,
+                controller=controller,
+            )
+        except Exception:
+            self._forget(routed["live"] + routed["late"])
+            raise
+        self._forget(f["doc"] for f in live_failed + late_failed)
+        live_retry, live_failed = split_retryable(live_failed)
+        late_retry, late_failed = split_retryable(late_failed)
+        retry = live_retry + late_retry
+        failed = live_failed + late_failed
+        # Readings handed back for a retry are counted when they are re-sent
+        counts["received"] -= len(retry)
+        counts["live"] -= len(spill) + len(live_retry)
+        counts["late"] += len(spill) - len(late_retry)
+        counts["duplicates"] += live_conflicts + late_conflicts
+        handed_back = {id(f["doc"]) for f in retry}
+        counts["out_of_order"] = self._track_order(
+            doc for doc in routed["ordered"] if id(doc) not in handed_back
+        )
+        counts["indexed"] = live_indexed + late_indexed
+        counts["failed"] = len(failed)
+        self._add(counts)
+        with self._lock:
+            for failure in (failed + retry)[:3]:
+                self._note_error(f"{failure['status']}: {failure['error']}")
+        cache = getattr(self.client, "cache", None)
+        if cache is not None:
+            if live_indexed:
+                cache.invalidate_index(settings.INDEX_VITALS)
+            if late_indexed:
+                cache.invalidate_index(settings.INDEX_VITALS_HISTORY)
+        result = {
+            "live": counts["live"],
+            "late": counts["late"],
+            "indexed": counts["indexed"],
+            "failed": failed,
+        }
+        if retry:
+            raise BulkRetryError(retry, result)
+        return result
+
+    def stats(self):
+        """Running counts since the router was created."""
+        with self._lock:
+            return dict(self._counts, dedup_keys=len(self._seen))
+
+
+def history_id(doc):
+    """Deterministic ``_id`` for the sidecar, mirroring the TSDS identity."""
+    return reading_key(doc, parse_timestamp(doc["@timestamp"]))
@@ -0,0 +1,416 @@
+"""Disk-backed write-ahead spool in front of the bulk path.
+
+When Elasticsearch is slow or unreachable ``bulk_index`` raises and the
+caller's documents are gone. ``Spool`` decouples accepting a write from
+delivering it: documents are appended to segment files on local disk and
+a background drainer sends them to Elasticsearch in log order, one batch
+at a time, retrying with backoff for as long as the cluster is down. A
+batch is only acknowledged once every document in it has been indexed,
+found already indexed (409) or rejected for good (any other 4xx);
+documents that got 429, 5xx or no answer are sent again on their own.
+
+Layout of the spool directory::
+
+    000000000001.seg   records: <u32 length><u32 crc32><payload>
+    000000000002.seg   payload = codec-encoded {"i": index, "d": doc}
+    cursor.json        {"segment", "offset"} of the next record to send
+
+Writes are group-committed: appends only hit the OS page cache, and a
+sync thread flushes and fsyncs the active segment every
+``SPOOL_FSYNC_INTERVAL`` seconds. The drainer only reads records that
+have been synced, so nothing reaches Elasticsearch that a crash could
+lose from disk. ``append(..., durable=True)`` waits for that sync too.
+
+Delivery is at-least-once: after a crash the records since the last
+saved cursor are sent again. Vitals go through ``VitalsRouter`` whose
+``create`` writes turn repeats into 409s; other indices receive the
+repeat as a second copy. Segments are deleted once drained, and when the
+spool holds ``SPOOL_MAX_BYTES`` appends wait for the drainer, raising
+``SpoolFull`` after ``SPOOL_FULL_TIMEOUT`` seconds.
+
+Usage::
+
+    spool = Spool(client, router=VitalsRouter(client))
+    spool.append(settings.INDEX_VITALS, readings)
+    spool.append(settings.INDEX_DECISIONS, [decision])
+    spool.close()   # drains what it can, then stops
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+from config import settings
+from utils import codec
+from utils.bulk import BulkRetryError, split_conflicts, split_retryable, streaming_bulk
+from utils.transport import backoff_delay
+
+HEADER = struct.Struct("<II")  # payload length, crc32
+SEGMENT_SUFFIX = ".seg"
+
+
+class SpoolFull(RuntimeError):
+    """The spool reached its disk budget and did not drain in time."""
+
+
+def _segment_name(seq):
+    return f"{seq:012d}{SEGMENT_SUFFIX}"
+
+
+def _scan(path, start=0, limit=None, max_records=None):
+    """Read valid records from a segment.
+
+    Returns ``(records, end_offset)``; stops at ``limit`` bytes, after
+    ``max_records`` records, or at the first torn/corrupt record.
+    """
+    records = []
+    with open(path, "rb") as f:
+        f.seek(start)
+        offset = start
+        while max_records is None or len(records) < max_records:
+            if limit is not None and offset + HEADER.size > limit:
+                break
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                break
+            length, crc = HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            records.append(payload)
+            offset += HEADER.size + length
+    return records, offset
+
+
+class Spool:
+    """Write-ahead log of pending bulk writes with an in-order drainer.
+
+    Parameters
+    ----------
+    client : utils.api_client.PravaahClient
+        Client used for non-vitals indices.
+    router : ingest.router.VitalsRouter, optional
+        Sends vitals; without one they go straight to the TSDS with
+        ``op_type=create``.
+    directory : str, optional
+        Spool directory (default ``settings.SPOOL_DIR``).
+    start : bool
+        Start the sync and drain threads immediately.
+    """
+
+    def __init__(
+        self,
+        client,
+        router=None,
+        directory=None,
+        segment_bytes=None,
+        max_bytes=None,
+        fsync_interval=None,
+        drain_batch=None,
+        full_timeout=None,
+        start=True,
+    ):
+        self.client = client
+        self.router = router
+        self.directory = directory or settings.SPOOL_DIR
+        self.segment_bytes = segment_bytes or settings.SPOOL_SEGMENT_BYTES
+        self.max_bytes = max_bytes or settings.SPOOL_MAX_BYTES
+        self.fsync_interval = fsync_interval or settings.SPOOL_FSYNC_INTERVAL
+        self.drain_batch = drain_batch or settings.SPOOL_DRAIN_BATCH
+        self.full_timeout = (
+            settings.SPOOL_FULL_TIMEOUT if full_timeout is None else full_timeout
+        )
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._stopping = False
+        self._counts = {
+            "appended": 0,
+            "drained": 0,
+            "failed": 0,
+            "send_retries": 0,
+            "full_waits": 0,
+        }
+        self.last_error = None
+        self._recover()
+        self._threads = []
+        if start:
+            self.start()
+
+    # -- recovery --------------------------------------------------------
+
+    def _segments(self):
+        return sorted(
+            int(name[: -len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def _path(self, seq):
+        return os.path.join(self.directory, _segment_name(seq))
+
+    def _recover(self):
+        """Truncate a torn tail, load the cursor and open a fresh segment."""
+        segments = self._segments()
+        if segments:
+            last = self._path(segments[-1])
+            _, valid = _scan(last)
+            if valid < os.path.getsize(last):
+                with open(last, "r+b") as f:
+                    f.truncate(valid)
+        cursor_path = os.path.join(self.directory, "cursor.json")
+        if os.path.exists(cursor_path):
+            with open(cursor_path) as f:
+                cursor = json.load(f)
+            self._cursor = (cursor["segment"], cursor["offset"])
+        else:
+            self._cursor = (segments[0] if segments else 1, 0)
+        for seq in segments:  # drained before the crash, not yet deleted
+            if seq < self._cursor[0]:
+                os.remove(self._path(seq))
+        segments = [seq for seq in segments if seq >= self._cursor[0]]
+        if not segments:
+            self._cursor = (self._cursor[0], 0)
+
+        self._bytes = sum(os.path.getsize(self._path(seq)) for seq in segments)
+        self._bytes -= self._cursor[1] if segments else 0
+        self._active = (segments[-1] + 1) if segments else self._cursor[0]
+        self._file = open(self._path(self._active), "ab")
+        self._active_size = 0
+        self._dirty = False
+        # Everything that existed before this process is durable already
+        self._synced = (self._active, 0)
+        self._sealed = set(segments)
+
+    # -- writing ---------------------------------------------------------
+
+    def append(self, index, docs, durable=False):
+        """Spool ``docs`` for ``index``; returns once they are written to the segment.
+
+        With ``durable`` the call also waits for the next fsync. Raises
+        ``SpoolFull`` if the disk budget stays exhausted for
+        ``full_timeout`` seconds.
+        """
+        frames = []
+        size = 0
+        for doc in docs:
+            payload = codec.dumps({"i": index, "d": doc})
+            frames.append(HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            size += len(frames[-1])
+        if not frames:
+            return
+        deadline = time.monotonic() + self.full_timeout
+        with self._changed:
+            if self._bytes + size > self.max_bytes:
+                self._counts["full_waits"] += 1
+            while self._bytes + size > self.max_bytes:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stopping:
+                    raise SpoolFull(
+                        f"Spool {self.directory} holds {self._bytes} of {self.max_bytes} bytes"
+                    )
+                self._changed.wait(remaining)
+            self._file.write(b"".join(frames))
+            self._active_size += size
+            self._bytes += size
+            self._dirty = True
+            self._counts["appended"] += len(frames)
+            target = (self._active, self._active_size)
+            if self._active_size >= self.segment_bytes:
+                self._roll()
+            if durable:
+                while self._synced < target and not self._stopping:
+                    self._changed.wait()
+
+    def _roll(self):
+        """Seal the active segment and start the next one (lock held)."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._sealed.add(self._active)
+        self._active += 1
+        self._file = open(self._path(self._active), "ab")
+        self._active_size = 0
+        self._dirty = False
+        self._synced = (self._active, 0)
+        self._changed.notify_all()
+
+    def route(self, docs):
+        """``VitalsRouter``-compatible entry point: spool vitals readings."""
+        self.append(settings.INDEX_VITALS, docs)
+        return {"spooled": len(docs)}
+
+    def _sync_loop(self):
+        while True:
+            with self._changed:
+                if self._stopping and not self._dirty:
+                    return
+                if self._dirty:
+                    self._file.flush()
+                    fileno = self._file.fileno()
+                    target = (self._active, self._active_size)
+                    self._dirty = False
+                else:
+                    fileno = None
+            if fileno is not None:
+                try:
+                    os.fsync(fileno)
+                except OSError:
+                    pass  # segment was rolled (and fsynced) meanwhile
+                with self._changed:
+                    if target > self._synced:
+                        self._synced = target
+                    self._changed.notify_all()
+            time.sleep(self.fsync_interval)
+
+    # -- draining --------------------------------------------------------
+
+    def _read_batch(self):
+        """Next synced records from the cursor: ``(docs_by_run, new_cursor)``."""
+        with self._lock:
+            seq, offset = self._cursor
+            synced_seq, synced_offset = self._synced
+            sealed = seq in self._sealed
+        if not sealed and seq != synced_seq:
+            return [], self._cursor
+        limit = None if sealed else synced_offset
+        records, end = _scan(self._path(seq), offset, limit, self.drain_batch)
+        if not records and sealed:
+            # Finished a sealed segment; move on to the next one
+            return [], (seq + 1, 0)
+        return records, (seq, end)
+
+    def _deliver(self, index, docs):
+        """Send one run of documents for a single index.
+
+        Returns the number rejected permanently (4xx other than 409).
+        Raises ``BulkRetryError`` for documents that failed with no answer,
+        429 or 5xx, and anything else if the request failed outright.
+        """
+        if index == settings.INDEX_VITALS and self.router is not None:
+            return len(self.router.route(docs)["failed"])
+        op_type = "create" if index == settings.INDEX_VITALS else "index"
+        report = streaming_bulk(self.client, index, docs, op_type=op_type)
+        cache = getattr(self.client, "cache", None)
+        if cache is not None and report["indexed"]:
+            cache.invalidate_index(index)
+        retry, failed = split_retryable(split_conflicts(report["failed"])[1])
+        if retry:
+            raise BulkRetryError(retry, {"failed": failed})
+        return len(failed)
+
+    def _send_in_order(self, records):
+        runs = []
+        for payload in records:
+            record = codec.loads(payload)
+            if runs and runs[-1][0] == record["i"]:
+                runs[-1][1].append(record["d"])
+            else:
+                runs.append((record["i"], [record["d"]]))
+        for index, docs in runs:
+            drained = len(docs)
+            failed = 0
+            attempt = 0
+            while True:
+                try:
+                    failed += self._deliver(index, docs)
+                    break
+                except Exception as e:
+                    if isinstance(e, BulkRetryError):
+                        # Only the documents that failed go again; the rest
+                        # of the run was acknowledged or rejected for good
+                        failed += len(e.result["failed"])
+                        docs = [f["doc"] for f in e.failed]
+                    self.last_error = f"{index}: {e!r}"
+                    with self._changed:
+                        self._counts["send_retries"] += 1
+                        if self._stopping:
+                            raise
+                        self._changed.wait(backoff_delay(min(attempt, 6)))
+                    attempt += 1
+            with self._changed:
+                self._counts["drained"] += drained
+                self._counts["failed"] += failed
+
+    def _advance(self, cursor, consumed):
+        with self._changed:
+            previous = self._cursor[0]
+            self._cursor = cursor
+            self._bytes -= consumed
+            self._changed.notify_all()
+        tmp = os.path.join(self.directory, "cursor.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"segment": cursor[0], "offset": cursor[1]}, f)
+        os.replace(tmp, os.path.join(self.directory, "cursor.json"))
+        for seq in range(previous, cursor[0]):
+            with self._lock:
+                self._sealed.discard(seq)
+            if os.path.exists(self._path(seq)):
+                os.remove(self._path(seq))
+
+    def _drain_loop(self):
+        while True:
+            records, cursor = self._read_batch()
+            if cursor[0] != self._cursor[0] and not records:
+                seq, offset = self._cursor
+                leftover = os.path.getsize(self._path(seq)) - offset
+                if leftover:
+                    self.last_error = f"{_segment_name(seq)}: skipped {leftover} corrupt bytes"
+                self._advance(cursor, leftover)
+                continue
+            if not records:
+                with self._changed:
+                    if self._stopping:
+                        return
+                    self._changed.wait(self.fsync_interval)
+                continue
+            try:
+                self._send_in_order(records)
+            except Exception:
+                return  # stopping while the cluster is down; resume next start
+            consumed = cursor[1] - self._cursor[1]
+            self._advance(cursor, consumed)
+
+    # -- lifecycle -------------------------------------------------------
+
+    def start(self):
+        self._threads = [
+            threading.Thread(target=self._sync_loop, name="spool-sync", daemon=True),
+            threading.Thread(target=self._drain_loop, name="spool-drain", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def close(self, timeout=10.0):
+        """Drain for up to ``timeout`` seconds, then stop.
+
+        Whatever is still pending stays on disk and is sent by the next
+        ``Spool`` opened on the same directory.
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while self._bytes > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(min(remaining, 0.1))
+            self._stopping = True
+            self._changed.notify_all()
+        for thread in self._threads:
+            thread.join()
+        with self._lock:
+            self._file.close()
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                self._counts,
+                pending_bytes=self._bytes,
+                segments=len(self._sealed) + 1,
+                cursor=list(self._cursor),
+                router=self.router.stats() if self.router is not None else None,
+            )
@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""Pravaah: bulk loader for historical vitals exports (CSV / Parquet).
+
+Reads monitor exports in chunks, maps their columns onto the
+``vitals_index_template()`` schema, validates ranges with vectorised NumPy
+checks and streams the rows through ``ingest.router.VitalsRouter`` (and
+``utils.bulk.streaming_bulk`` under it). Progress is checkpointed after
+every chunk, so an interrupted load restarts where it left off with
+``--resume``.
+
+Usage:
+    python load_vitals.py export.csv
+    python load_vitals.py export.parquet --resume
+    python load_vitals.py export.csv --map HR=heart_rate --map SpO2=oxygen_saturation
+
+Timestamps are ISO-8601 in UTC (a trailing ``Z`` is accepted) or epoch
+numbers (``--epoch-unit``). Empty vital cells are left out of the document;
+rows with a vital outside ``VITAL_LIMITS``, no patient id or an unreadable
+timestamp are rejected and counted by reason. The TSDS only accepts
+readings inside its ``look_back_time`` window, so older rows - the bulk of
+a backfill - are written to the history index instead; rows too far in
+the future are rejected.
+
+Parquet, and the fast CSV reader, need ``pyarrow``; without it CSV files
+are read with the standard library ``csv`` module.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+from rich.console import Console
+
+from indices.vitals_batch import InternTable, VitalsBatch
+from indices.vitals_gen import VITAL_FIELDS, VITAL_LIMITS
+from ingest.router import VitalsRouter
+from utils.bulk import AdaptiveBatchController, BulkRetryError
+
+try:
+    import pyarrow
+    import pyarrow.csv
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+console = Console()
+
+DEFAULT_CHUNK_ROWS = 50_000
+
+# Common export headers -> template fields. Matching is case-insensitive;
+# ``--map`` entries take precedence.
+COLUMN_ALIASES = {
+    "@timestamp": ("@timestamp", "timestamp", "time", "datetime", "recorded_at"),
+    "patient_id": ("patient_id", "patient", "patientid", "mrn"),
+    "ward": ("ward", "unit", "department"),
+    "heart_rate": ("heart_rate", "hr", "pulse"),
+    "systolic_bp": ("systolic_bp", "sbp", "systolic", "bp_sys"),
+    "diastolic_bp": ("diastolic_bp", "dbp", "diastolic", "bp_dia"),
+    "oxygen_saturation": ("oxygen_saturation", "spo2", "o2_sat", "sao2"),
+    "temperature": ("temperature", "temp", "temp_c"),
+    "respiratory_rate": ("respiratory_rate", "rr", "resp_rate"),
+    "pain_score": ("pain_score", "pain"),
+}
+
+EPOCH_UNITS = {"s": 1000, "ms": 1}
+
+
+# ========================================================================
+# Readers: each yields {column name: array-like} chunks
+# ========================================================================
+
+
+def _file_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    if ext in (".csv", ".txt", ".tsv"):
+        return "csv"
+    raise ValueError(f"Unsupported file type: {path} (expected .csv or .parquet)")
+
+
+def _arrow_chunks(batches):
+    for batch in batches:
+        yield {
+            name: column.to_numpy(zero_copy_only=False)
+            for name, column in zip(batch.schema.names, batch.columns)
+        }
+
+
+def read_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield column chunks of roughly ``chunk_rows`` rows from ``path``."""
+    fmt = _file_format(path)
+    if fmt == "parquet":
+        if pyarrow is None:
+            raise RuntimeError("Reading Parquet requires pyarrow: pip install pyarrow")
+        parquet = pyarrow.parquet.ParquetFile(path)
+        yield from _arrow_chunks(parquet.iter_batches(batch_size=chunk_rows))
+        return
+
+    delimiter = "\t" if path.lower().endswith(".tsv") else ","
+    if pyarrow is not None:
+        # Arrow infers types from the first block only, so one bad cell
+        # later on would abort the read; take everything as strings and
+        # leave parsing to normalize().
+        with open(path, newline="") as f:
+            header = next(csv.reader(f, delimiter=delimiter), None)
+        if header is None:
+            return
+        reader = pyarrow.csv.open_csv(
+            path,
+            read_options=pyarrow.csv.ReadOptions(block_size=chunk_rows * 128),
+            parse_options=pyarrow.csv.ParseOptions(delimiter=delimiter),
+            convert_options=pyarrow.csv.ConvertOptions(
+                column_types={name: pyarrow.string() for name in header},
+                strings_can_be_null=True,
+            ),
+        )
+        yield from _arrow_chunks(reader)
+        return
+
+    with open(path, newline="") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        rows = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) >= chunk_rows:
+                yield dict(zip(header, map(np.array, zip(*rows))))
+                rows = []
+        if rows:
+            yield dict(zip(header, map(np.array, zip(*rows))))
+
+
+# ========================================================================
+# Mapping + validation
+# ========================================================================
+
+
+def resolve_columns(names, overrides=None):
+    """Map source column names to template fields.
+
+    ``overrides`` is a ``{source: field}`` dict from ``--map``. Returns
+    ``{field: source}``; raises ValueError when ``@timestamp`` or
+    ``patient_id`` cannot be found.
+    """
+    mapping = {}
+    for source, field in (overrides or {}).items():
+        if field not in COLUMN_ALIASES:
+            raise ValueError(f"Unknown target field in --map: {field}")
+        if source not in names:
+            raise ValueError(f"Column {source!r} not found in file")
+        mapping[field] = source
+    lowered = {name.lower().strip(): name for name in names}
+    for field, aliases in COLUMN_ALIASES.items():
+        if field in mapping:
+            continue
+        for alias in aliases:
+            if alias in lowered:
+                mapping[field] = lowered[alias]
+                break
+    missing = [f for f in ("@timestamp", "patient_id") if f not in mapping]
+    if missing:
+        raise ValueError(f"No column found for {', '.join(missing)} (columns: {list(names)})")
+    return mapping
+
+
+def _to_float(values):
+    """Convert a column to float64, turning blanks and junk into NaN."""
+    values = np.asarray(values)
+    if values.dtype.kind in "fiub":
+        return values.astype(np.float64)
+    try:
+        return np.where(values == "", "nan", values).astype(np.float64)
+    except (TypeError, ValueError):
+        out = np.empty(len(values), dtype=np.float64)
+        for i, v in enumerate(values.tolist()):
+            try:
+                out[i] = float(v) if v not in (None, "") else np.nan
+            except (TypeError, ValueError):
+                out[i] = np.nan
+        return out
+
+
+def _to_timestamps(values, epoch_unit="s"):
+    """Convert a column to datetime64[ms]; unreadable values become NaT."""
+    values = np.asarray(values)
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[ms]")
+    if values.dtype.kind in "OU":
+        # CSV columns arrive as strings; epoch numbers must not be read as years
+        try:
+            values = np.array(
+                [float(v) if v else np.nan for v in values.tolist()], dtype=np.float64
+            )
+        except (TypeError, ValueError):
+            pass
+    if values.dtype.kind in "fiu":
+        ms = values.astype(np.float64) * EPOCH_UNITS[epoch_unit]
+        out = np.full(len(ms), np.datetime64("NaT"), dtype="datetime64[ms]")
+        ok = np.isfinite(ms)
+        out[ok] = ms[ok].astype(np.int64).astype("datetime64[ms]")
+        return out
+    text = [
+        (v[:-1] if v.endswith("Z") else v[:-6] if v.endswith("+00:00") else v)
+        if isinstance(v, str) and v else "NaT"
+        for v in values.tolist()
+    ]
+    try:
+        return np.array(text, dtype="datetime64[ms]")
+    except ValueError:
+        out = np.empty(len(text), dtype="datetime64[ms]")
+        for i, v in enumerate(text):
+            try:
+                out[i] = np.datetime64(v, "ms")
+            except ValueError:
+                out[i] = np.datetime64("NaT")
+        return out
+
+
+def normalize(chunk, mapping, epoch_unit="s", default_ward="general"):
+    """Return template-shaped columns for one raw chunk."""
+    rows = len(next(iter(chunk.values()))) if chunk else 0
+    columns = {
+        "@timestamp": _to_timestamps(chunk[mapping["@timestamp"]], epoch_unit),
+        "patient_id": np.asarray(chunk[mapping["patient_id"]], dtype=object),
+    }
+    if "ward" in mapping:
+        wards = np.asarray(chunk[mapping["ward"]], dtype=object)
+        columns["ward"] = np.array([str(w) if w else default_ward for w in wards.tolist()],
+                                   dtype=object)
+    else:
+        columns["ward"] = np.full(rows, default_ward, dtype=object)
+    for field in VITAL_FIELDS:
+        if field in mapping:
+            columns[field] = _to_float(chunk[mapping[field]])
+    return columns
+
+
+def validate(columns):
+    """Vectorised row checks.
+
+    Returns ``(keep, reasons)``: a boolean mask of rows to index and a
+    Counter of rejection reasons. A row is counted once, under the first
+    check it fails.
+    """
+    rows = len(columns["@timestamp"])
+    keep = np.ones(rows, dtype=bool)
+    reasons = Counter()
+
+    def reject(mask, reason):
+        hit = mask & keep
+        count = int(hit.sum())
+        if count:
+            reasons[reason] += count
+            keep[hit] = False
+
+    reject(np.isnat(columns["@timestamp"]), "bad_timestamp")
+    patients = columns["patient_id"]
+    reject(np.array([not p or p != p for p in patients.tolist()], dtype=bool), "missing_patient")
+    for field in VITAL_FIELDS:
+        if field not in columns:
+            continue
+        lo, hi = VITAL_LIMITS[field]
+        values = columns[field]
+        with np.errstate(invalid="ignore"):
+            reject((values < lo) | (values > hi), f"out_of_range:{field}")
+    return keep, reasons
+
+
+def to_batch(columns, keep, patients=None, wards=None):
+    """``VitalsBatch`` of the rows in ``keep``; NaN vitals are sent as null.
+
+    Passing the same ``patients`` / ``wards`` intern tables for every chunk
+    keeps one code per patient across the whole file.
+    """
+    return VitalsBatch.from_arrays(
+        columns["@timestamp"][keep],
+        [str(p) for p in columns["patient_id"][keep].tolist()],
+        columns["ward"][keep],
+        {f: columns[f][keep] for f in VITAL_FIELDS if f in columns},
+        patients,
+        wards,
+    )
+
+
+# ========================================================================
+# Checkpoints
+# ========================================================================
+
+
+def _source_identity(path):
+    stat = os.stat(path)
+    return {"source": os.path.abspath(path), "size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def load_checkpoint(path, source):
+    """Return the saved progress for ``source``, or None if there is none."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    identity = _source_identity(source)
+    if any(state.get(k) != v for k, v in identity.items()):
+        raise RuntimeError(
+            f"Checkpoint {path} was written for a different version of {source}; "
+            "delete it to start over"
+        )
+    return state
+
+
+def save_checkpoint(path, state):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+# ========================================================================
+# Load
+# ========================================================================
+
+
+def load_file(
+    client,
+    path,
+    column_map=None,
+    epoch_unit="s",
+    default_ward="general",
+    chunk_rows=DEFAULT_CHUNK_ROWS,
+    checkpoint=None,
+    resume=False,
+    pipeline=None,
+):
+    """Load one export into the vitals indices; returns the final state dict.
+
+    Each chunk is fully answered before the checkpoint advances, so a
+    resumed load re-sends at most one chunk. Rows rejected for good (a 4xx
+    other than 409) are counted as ``failed`` and the load moves on; rows
+    that failed for a retryable reason (429, 5xx, no answer) stop the load
+    with a RuntimeError and leave the checkpoint before that chunk. Both
+    targets are written with ``op_type=create`` and a ``_id`` derived from
+    dimensions + timestamp, so re-sent rows come back as 409 conflicts and
+    are counted as ``duplicates``.
+    """
+    checkpoint = checkpoint or f"{path}.checkpoint.json"
+    state = load_checkpoint(checkpoint, path) if resume else None
+    if state is None:
+        state = {
+            **_source_identity(path),
+            "rows_done": 0,
+            "indexed": 0,
+            "duplicates": 0,
+            "rejected": {},
+            "failed": 0,
+            "complete": False,
+        }
+    state.setdefault("failed", 0)  # checkpoints written before permanent rejects were kept
+    skip = state["rows_done"]
+    rejected = Counter(state["rejected"])
+    controller = AdaptiveBatchController()
+    router = VitalsRouter(client)
+    patients, wards = InternTable(), InternTable()
+    mapping = None
+    start = time.monotonic()
+    indexed_before = state["indexed"]
+
+    for chunk in read_chunks(path, chunk_rows):
+        rows = len(next(iter(chunk.values()))) if chunk else 0
+        if skip >= rows:
+            skip -= rows
+            continue
+        if skip:
+            chunk = {name: values[skip:] for name, values in chunk.items()}
+            rows -= skip
+            skip = 0
+        if mapping is None:
+            mapping = resolve_columns(list(chunk), column_map)
+
+        columns = normalize(chunk, mapping, epoch_unit, default_ward)
+        keep, reasons = validate(columns)
+        rejected.update(reasons)
+        batch = to_batch(columns, keep, patients, wards)
+        before = router.stats()
+        try:
+            result = router.route(batch.to_docs(), pipeline=pipeline, controller=controller)
+        except BulkRetryError as e:
+            raise RuntimeError(
+                f"{e} after row {state['rows_done']:,}; "
+                "checkpoint not advanced, rerun with --resume"
+            ) from e
+        after = router.stats()
+        if result["failed"]:
+            first = result["failed"][0]
+            console.print(f"[red]  {first['status']}: {first['error']}[/red]")
+        if after["rejected"] > before["rejected"]:
+            rejected["future_timestamp"] += after["rejected"] - before["rejected"]
+        state["indexed"] += result["indexed"]
+        state["duplicates"] += after["duplicates"] - before["duplicates"]
+        state["failed"] += len(result["failed"])
+        state["rows_done"] += rows
+        state["rejected"] = dict(rejected)
+        save_checkpoint(checkpoint, state)
+
+        elapsed = time.monotonic() - start
+        rate = (state["indexed"] - indexed_before) / max(elapsed, 1e-9)
+        console.print(
+            f"  {state['rows_done']:>10,} rows  indexed={state['indexed']:,} "
+            f"dup={state['duplicates']:,} rejected={sum(rejected.values()):,} "
+            f"failed={state['failed']:,}  {rate:,.0f} docs/sec"
+        )
+
+    if skip:
+        raise RuntimeError(
+            f"Checkpoint says {state['rows_done']} rows were loaded but the file is shorter"
+        )
+    state["complete"] = True
+    state["elapsed"] = round(time.monotonic() - start, 3)
+    state["docs_per_sec"] = round(
+        (state["indexed"] - indexed_before) / max(state["elapsed"], 1e-9), 1
+    )
+    save_checkpoint(checkpoint, state)
+    return state
+
+
+def _parse_map(entries):
+    mapping = {}
+    for entry in entries or []:
+        source, sep, field = entry.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"--map expects SOURCE=FIELD, got {entry!r}")
+        mapping[source] = field
+    return mapping
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load historical vitals from CSV/Parquet")
+    parser.add_argument("files", nargs="+", help="CSV or Parquet exports")
+    parser.add_argument("--map", action="append", metavar="SOURCE=FIELD",
+                        help="Map a source column onto a template field")
+    parser.add_argument("--epoch-unit", choices=sorted(EPOCH_UNITS), default="s",
+                        help="Unit of numeric timestamps")
+    parser.add_argument("--ward", default="general", help="Ward for files without a ward column")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--checkpoint", help="Checkpoint path (default: <file>.checkpoint.json)")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint")
+    parser.add_argument("--pipeline", help="Ingest pipeline to apply")
+    args = parser.parse_args()
+
+    if args.checkpoint and len(args.files) > 1:
+        parser.error("--checkpoint can only be used with a single file")
+
+    from utils.api_client import PravaahClient
+
+    client = PravaahClient()
+    column_map = _parse_map(args.map)
+    failed = False
+    for path in args.files:
+        console.print(f"\n[bold]Loading {path}[/bold]")
+        try:
+            state = load_file(
+                client,
+                path,
+                column_map=column_map,
+                epoch_unit=args.epoch_unit,
+                default_ward=args.ward,
+                chunk_rows=args.chunk_rows,
+                checkpoint=args.checkpoint,
+                resume=args.resume,
+                pipeline=args.pipeline,
+            )
+        except RuntimeError as e:
+            console.print(f"[red]  {e}[/red]")
+            sys.exit(1)
+        console.print(
+            f"[green]  Done: {state['indexed']:,} indexed, {state['duplicates']:,} duplicates, "
+            f"{state['failed']:,} failed in {state['elapsed']}s "
+            f"({state['docs_per_sec']:,} docs/sec)[/green]"
+        )
+        for reason, count in sorted(state["rejected"].items()):
+            console.print(f"[yellow]  rejected {reason}: {count:,}[/yellow]")
+        failed = failed or state["failed"] > 0
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
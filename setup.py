@@ -3,9 +3,13 @@
 
 Usage:
     python setup.py --setup      Create indices and seed sample data
+    python setup.py --setup --resume   Continue an interrupted setup
+    python setup.py --setup --tuned    Create indices with the tuned schemas
     python setup.py --agents     Print agent configurations for Kibana Agent Builder UI
     python setup.py --teardown   Delete all indices
     python setup.py --all        Run setup + print agent configs
+    python setup.py --demo       Run the demo scenarios against the registered agents
+    python setup.py --demo --stream    Stream answers with time-to-first-token and tool timing
 """
 
 import argparse
@@ -20,7 +24,9 @@ from rich.markdown import Markdown
 from utils.api_client import PravaahClient
 from indices.templates import create_all_indices, delete_all_indices
 from indices.seed_data import seed_all
+from indices.transforms import create_all_transforms, delete_all_transforms, start_all_transforms
 from agents import triage, recovery, capacity, discharge, guardian, orchestrator
+from demo.scenarios import run_all_scenarios
 
 console = Console()
 
@@ -32,8 +38,13 @@ AGENT_MODULES = [triage, recovery, capacity, discharge, guardian, orchestrator]
 # ========================================================================
 
 
-def do_setup():
-    """Create Elasticsearch indices and seed sample data."""
+def do_setup(resume=False, tuned=False):
+    """Create Elasticsearch indices and seed sample data.
+
+    With ``resume`` seeding continues from the last checkpoint instead of
+    starting over; ``tuned`` creates the indices with the tuned schema
+    variants from ``indices/templates.py``.
+    """
     console.print(Panel(
         "[bold cyan]Pravaah Setup[/bold cyan]\n"
         "Creating Elasticsearch indices and seeding sample data.",
@@ -43,18 +54,19 @@ def do_setup():
     client = PravaahClient()
 
     # Step 1: Create indices
-    console.print("\n[bold]Step 1/2: Creating Elasticsearch indices...[/bold]")
+    console.print("\n[bold]Step 1/3: Creating Elasticsearch indices...[/bold]")
     try:
-        create_all_indices(client)
+        create_all_indices(client, tuned=tuned)
+        create_all_transforms(client)
         console.print("[green]  All indices created successfully.[/green]")
     except Exception as e:
         console.print(f"[red]  Error creating indices: {e}[/red]")
         raise
 
     # Step 2: Seed data
-    console.print("\n[bold]Step 2/2: Seeding sample data...[/bold]")
+    console.print("\n[bold]Step 2/3: Seeding sample data...[/bold]")
     try:
-        seed_results = seed_all(client)
+        seed_results = seed_all(client, resume=resume)
         console.print(f"[green]  Data seeded: {seed_results}[/green]")
     except Exception as e:
         console.print(f"[red]  Error seeding data: {e}[/red]")
@@ -64,11 +76,23 @@ def do_setup():
     console.print("[dim]  Waiting for indexing to complete...[/dim]")
     time.sleep(3)
 
+    # Step 3: Transforms build from the seeded data, then follow new readings
+    console.print("\n[bold]Step 3/3: Starting transforms...[/bold]")
+    try:
+        start_all_transforms(client)
+        console.print("[green]  Transforms started.[/green]")
+    except Exception as e:
+        console.print(f"[red]  Error starting transforms: {e}[/red]")
+        raise
+
     # Summary
     console.print(Panel(
         "[bold green]Data setup complete![/bold green]\n\n"
         "Indices created:\n"
-        "  - metrics-patient-vitals (TSDS - time series data stream)\n"
+        "  - metrics-patient-vitals (TSDS, downsampled 1h after 2d, 1d after 30d)\n"
+        "  - patient-vitals-history (readings older than the TSDS window)\n"
+        "  - patient-vitals-latest (newest reading per patient, transform)\n"
+        "  - patient-vitals-hourly (hourly rollup per patient, transform)\n"
         "  - patients (8 patient records)\n"
         "  - hospital-capacity (7 ward records)\n"
         "  - agent-decisions (audit log - empty)\n"
@@ -150,6 +174,23 @@ def do_agents():
     ))
 
 
+# ========================================================================
+# Demo: Run scenarios against the agents
+# ========================================================================
+
+
+def do_demo(stream=False):
+    """Run the demo scenarios against the agents created in Kibana.
+
+    Args:
+        stream: Stream each answer and report time-to-first-token and
+            per-tool-call latency instead of waiting for the full reply.
+    """
+    client = PravaahClient()
+    agent_ids = {mod.AGENT_ID: mod.AGENT_ID for mod in AGENT_MODULES}
+    return run_all_scenarios(client, agent_ids, stream=stream)
+
+
 # ========================================================================
 # Teardown: Delete indices
 # ========================================================================
@@ -168,6 +209,7 @@ def do_teardown():
 
     console.print("\n[bold]Deleting indices...[/bold]")
     try:
+        delete_all_transforms(client)
         delete_all_indices(client)
         console.print("[green]  All indices deleted.[/green]")
     except Exception as e:
@@ -193,19 +235,27 @@ def main():
         epilog=(
             "Examples:\n"
             "  python setup.py --setup      Create indices + seed data\n"
+            "  python setup.py --setup --resume   Continue an interrupted setup\n"
+            "  python setup.py --setup --tuned    Create indices with the tuned schemas\n"
             "  python setup.py --agents     Print agent configs for Kibana UI\n"
             "  python setup.py --teardown   Delete all indices\n"
             "  python setup.py --all        Setup + print agent configs\n"
+            "  python setup.py --demo       Run the demo scenarios\n"
+            "  python setup.py --demo --stream   Stream answers with latency stats\n"
         ),
     )
     parser.add_argument("--setup", action="store_true", help="Create indices and seed sample data")
     parser.add_argument("--agents", action="store_true", help="Print agent configurations for Kibana UI")
     parser.add_argument("--teardown", action="store_true", help="Delete all indices")
     parser.add_argument("--all", action="store_true", help="Run setup + print agent configs")
+    parser.add_argument("--resume", action="store_true", help="Resume seeding from the last checkpoint")
+    parser.add_argument("--tuned", action="store_true", help="Use the tuned index schemas")
+    parser.add_argument("--demo", action="store_true", help="Run the demo scenarios")
+    parser.add_argument("--stream", action="store_true", help="Stream demo answers with latency stats")
 
     args = parser.parse_args()
 
-    if not any([args.setup, args.agents, args.teardown, args.all]):
+    if not any([args.setup, args.agents, args.teardown, args.all, args.demo]):
         parser.print_help()
         sys.exit(0)
 
@@ -217,14 +267,16 @@ def main():
 
     try:
         if args.all:
-            do_setup()
+            do_setup(resume=args.resume, tuned=args.tuned)
             console.print("\n")
             do_agents()
         else:
             if args.setup:
-                do_setup()
+                do_setup(resume=args.resume, tuned=args.tuned)
             if args.agents:
                 do_agents()
+            if args.demo:
+                do_demo(stream=args.stream)
             if args.teardown:
                 do_teardown()
     except KeyboardInterrupt:
@@ -0,0 +1,46 @@
+"""QueryCache invalidation driven by workflow tool calls in converse responses."""
+
+from config import settings
+from utils.api_client import PravaahClient
+from utils.cache import QueryCache
+
+
+def _client(monkeypatch, cache, response):
+    monkeypatch.setattr(settings, "validate", lambda: None)
+    monkeypatch.setattr(settings, "ES_URLS", ["https://es.test:9200"])
+    client = PravaahClient(cache=cache)
+    monkeypatch.setattr(client, "kibana_request", lambda *args, **kwargs: response)
+    return client
+
+
+def test_default_workflow_writes_come_from_workflow_definitions():
+    cache = QueryCache()
+    assert cache.workflow_writes["update_ward_capacity"] == [settings.INDEX_CAPACITY]
+    assert cache.workflow_writes["log_decision"] == [settings.INDEX_DECISIONS]
+
+
+def test_converse_workflow_call_evicts_dependent_entries(monkeypatch):
+    cache = QueryCache()
+    cache.get_or_load("FROM hospital-capacity | SORT occupancy_rate DESC", None, lambda: "wards")
+    cache.get_or_load("FROM patients | LIMIT 1", None, lambda: "patient")
+    response = {
+        "steps": [
+            {"type": "reasoning", "reasoning": "bed needed"},
+            {"type": "tool_call", "tool_id": "update_ward_capacity"},
+        ]
+    }
+
+    _client(monkeypatch, cache, response).converse("capacity-agent", "move PAT-001 to ICU")
+
+    loads = []
+    cache.get_or_load(
+        "FROM hospital-capacity | SORT occupancy_rate DESC", None, lambda: loads.append(1)
+    )
+    cache.get_or_load("FROM patients | LIMIT 1", None, lambda: loads.append(2))
+    assert loads == [1]  # capacity reloaded, patients still cached
+
+
+def test_namespaced_tool_id_invalidates():
+    cache = QueryCache()
+    cache.get_or_load("FROM agent-decisions | LIMIT 10", None, lambda: "decisions")
+    assert cache.invalidate_workflow("pravaah.log_decision") == 1
@@ -0,0 +1,61 @@
+"""IngestGateway flushes through a cluster outage without losing readings."""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+from config import settings
+from ingest.gateway import IngestGateway
+from ingest.router import VitalsRouter
+
+
+class FlakyClient:
+    """Bulk endpoint that is unreachable until ``down_until``."""
+
+    cache = None
+
+    def __init__(self, down_until):
+        self.down_until = down_until
+        self.indexed = []
+
+    def bulk_request(self, body, **kwargs):
+        if time.monotonic() < self.down_until:
+            raise requests.exceptions.ConnectionError("connection refused")
+        lines = body.splitlines()
+        self.indexed.extend(lines[1::2])
+        return {"items": [{"create": {"status": 201}} for _ in lines[1::2]]}
+
+
+def test_flush_survives_multi_second_outage(monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_BACKOFF_BASE", 0.05)
+    monkeypatch.setattr(settings, "HTTP_BACKOFF_MAX", 0.2)
+    client = FlakyClient(time.monotonic() + 2.5)
+    router = VitalsRouter(client)
+    now = datetime.now(timezone.utc)
+    readings = [
+        {
+            "@timestamp": (now - timedelta(seconds=i)).isoformat(),
+            "patient_id": f"PAT-{i % 5:03d}",
+            "ward": "ICU",
+            "heart_rate": 80,
+        }
+        for i in range(40)
+    ]
+
+    async def run():
+        gateway = IngestGateway(router, batch_size=10, flush_interval=0.05)
+        await gateway.start()
+        assert await gateway.submit(readings)
+        await gateway.stop()
+        return gateway.stats()
+
+    stats = asyncio.run(run())
+
+    assert len(client.indexed) == len(readings)
+    assert stats["dropped"] == 0
+    assert stats["flush_retries"] > 0
+    assert "connection refused" in stats["last_error"]
+    assert stats["router"]["indexed"] == len(readings)
+    assert stats["router"]["received"] == len(readings)
@@ -0,0 +1,24 @@
+"""MEWS band edges of the ``patient-vitals-derived`` ingest pipeline."""
+
+import pytest
+
+from indices.pipelines import _derived_vitals_script, mews_subscore
+
+
+@pytest.mark.parametrize(
+    "value, score",
+    [
+        (40, 2),    # <=40
+        (40.5, 2),  # rounds down into <=40
+        (41, 1),    # 41-50
+        (50, 1),
+        (50.5, 1),  # rounds down into 41-50
+        (51, 0),
+    ],
+)
+def test_heart_rate_band_edges(value, score):
+    assert mews_subscore("heart_rate", value) == score
+
+
+def test_script_uses_the_same_bands():
+    assert "v < 41 ? 2 : v < 51 ? 1 : v < 101 ? 0" in _derived_vitals_script()
@@ -0,0 +1,61 @@
+"""VitalsRouter statistics when readings are handed back for a retry."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ingest.router import VitalsRouter
+from utils.bulk import BulkRetryError
+
+
+class ScriptedClient:
+    """Bulk endpoint answering each call with the next list of item statuses."""
+
+    cache = None
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+
+    def bulk_request(self, body, **kwargs):
+        docs = body.count(b"\n") // 2
+        statuses = self.answers.pop(0) if self.answers else []
+        statuses = statuses + [201] * (docs - len(statuses))
+        return {
+            "items": [
+                {"create": {"status": s} if s < 300 else {"status": s, "error": "unavailable"}}
+                for s in statuses
+            ]
+        }
+
+
+def _readings(n, patients=5):
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "@timestamp": (now - timedelta(minutes=10) + timedelta(seconds=i)).isoformat(),
+            "patient_id": f"PAT-{i % patients:03d}",
+            "ward": "ICU",
+            "heart_rate": 80,
+        }
+        for i in range(n)
+    ]
+
+
+def test_stats_after_forced_retries():
+    readings = _readings(50)
+    router = VitalsRouter(ScriptedClient([503] * 50, [503] * 50, [503] * 50))
+    pending = readings
+    for _ in range(3):
+        with pytest.raises(BulkRetryError) as raised:
+            router.route(pending)
+        pending = [f["doc"] for f in raised.value.failed]
+    router.route(pending)
+
+    stats = router.stats()
+    assert stats["received"] == 50
+    assert stats["live"] == 50
+    assert stats["indexed"] == 50
+    assert stats["out_of_order"] == 0
+    assert stats["duplicates"] == 0
+    assert stats["failed"] == 0
+
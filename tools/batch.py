@@ -0,0 +1,148 @@
+"""Batched execution of ES|QL tools for a single patient.
+
+An orchestrator pass issues eight tool queries for one patient. Run
+serially that is eight round trips; ``run_batch`` sends them all at once
+and returns a single bundle, so a full patient journey costs one
+wall-clock round trip:
+
+- tools that are plain filtered/sorted lookups (``DSL_TOOLS``) are folded
+  into one ``_msearch`` request;
+- the aggregating tools run as ES|QL queries concurrently, each through
+  ``PravaahClient.esql_query`` (so a configured result cache applies).
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import settings
+from tools import esql_tools
+
+PATIENT_JOURNEY_TOOLS = [
+    "patient_record",
+    "latest_vitals",
+    "vitals_trend",
+    "vitals_statistics",
+    "recent_vitals_stability",
+    "deterioration_check",
+    "readiness_check",
+    "recent_decisions",
+]
+
+
+def _lookup(index, sort_field=None, size=1):
+    """Build a DSL body factory for a ``patient_id`` term lookup."""
+    def build(params):
+        body = {
+            "size": size,
+            "query": {"term": {"patient_id": params["patient_id"]}},
+        }
+        if sort_field:
+            body["sort"] = [{sort_field: "desc"}]
+        return index, body
+    return build
+
+
+# Tools whose ES|QL is a simple filter + sort + limit, expressed as DSL.
+DSL_TOOLS = {
+    "patient_record": _lookup(settings.INDEX_PATIENTS),
+    "latest_vitals": _lookup(settings.INDEX_VITALS_LATEST),
+    "readiness_check": _lookup(settings.INDEX_DISCHARGE, "updated_at"),
+    "recent_decisions": _lookup(settings.INDEX_DECISIONS, "timestamp", size=10),
+}
+
+
+def tool_registry():
+    """Return ``{name: definition}`` for all ES|QL tools."""
+    return {tool["name"]: tool for tool in esql_tools.all_tools()}
+
+
+def esql_params(tool, params):
+    """Build the ES|QL named ``params`` list for the parameters a tool declares."""
+    return [
+        {p["name"]: params[p["name"]]}
+        for p in tool.get("parameters", [])
+        if p["name"] in params
+    ]
+
+
+def rows(response):
+    """Turn an ES|QL ``columns``/``values`` response into a list of dicts."""
+    names = [c["name"] for c in response.get("columns", [])]
+    return [dict(zip(names, row)) for row in response.get("values", [])]
+
+
+def run_tool(client, name, params, registry=None):
+    """Run one ES|QL tool locally and return its rows."""
+    tool = (registry or tool_registry())[name]
+    response = client.esql_query(
+        tool["configuration"]["query"], esql_params(tool, params) or None
+    )
+    return rows(response)
+
+
+def _run_msearch(client, names, params):
+    searches = [DSL_TOOLS[name](params) for name in names]
+    responses = client.msearch(searches)
+    results, errors = {}, {}
+    for name, resp in zip(names, responses):
+        if "error" in resp:
+            errors[name] = str(resp["error"])
+        else:
+            results[name] = [hit["_source"] for hit in resp["hits"]["hits"]]
+    return results, errors
+
+
+def run_batch(client, names=None, params=None, use_msearch=True, max_workers=None):
+    """Run several tools with shared parameters concurrently.
+
+    Parameters
+    ----------
+    client : utils.api_client.PravaahClient
+    names : list[str], optional
+        Tool names; defaults to ``PATIENT_JOURNEY_TOOLS``.
+    params : dict
+        Shared parameters, e.g. ``{"patient_id": "PAT-008"}``.
+    use_msearch : bool
+        Fold ``DSL_TOOLS`` into a single ``_msearch`` request.
+
+    Returns a bundle ``{"results": {name: rows}, "errors": {name: message},
+    "elapsed": seconds}``. One failing tool does not fail the batch.
+    """
+    names = list(names or PATIENT_JOURNEY_TOOLS)
+    params = params or {}
+    registry = tool_registry()
+    unknown = [n for n in names if n not in registry]
+    if unknown:
+        raise ValueError(f"Unknown ES|QL tools: {unknown}")
+
+    dsl_names = [n for n in names if use_msearch and n in DSL_TOOLS]
+    esql_names = [n for n in names if n not in dsl_names]
+
+    results, errors = {}, {}
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_workers or len(names)) as pool:
+        msearch_future = (
+            pool.submit(_run_msearch, client, dsl_names, params) if dsl_names else None
+        )
+        futures = {
+            name: pool.submit(run_tool, client, name, params, registry)
+            for name in esql_names
+        }
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                errors[name] = str(e)
+        if msearch_future is not None:
+            try:
+                found, failed = msearch_future.result()
+                results.update(found)
+                errors.update(failed)
+            except Exception as e:
+                errors.update({name: str(e) for name in dsl_names})
+
+    return {
+        "results": {n: results[n] for n in names if n in results},
+        "errors": errors,
+        "elapsed": round(time.monotonic() - start, 3),
+    }
@@ -1,4 +1,4 @@
-"""13 ES|QL tool definitions for Pravaah agents.
+"""15 ES|QL tool definitions for Pravaah agents.
 
 Each function returns a tool definition dict that can be registered
 with Kibana's Agent Builder API.
@@ -26,18 +26,23 @@ def _esql_tool(name, description, query, parameters=None):
 
 
 def latest_vitals():
-    """Get the most recent vitals for a specific patient."""
+    """Get the most recent vitals for a specific patient.
+
+    Reads ``patient-vitals-latest``, kept at one document per patient by a
+    continuous transform (``indices.transforms``).
+    """
     return _esql_tool(
         name="latest_vitals",
         description=(
             "Retrieve the most recent vital signs for a specific patient. "
             "Returns heart_rate, systolic_bp, diastolic_bp, oxygen_saturation, "
-            "temperature, respiratory_rate, and pain_score."
+            "temperature, respiratory_rate, and pain_score, plus precomputed "
+            "MEWS subscores (mews_*), mews_total, mean_arterial_pressure and "
+            "shock_index."
         ),
         query=(
-            "FROM metrics-patient-vitals "
+            "FROM patient-vitals-latest "
             "| WHERE patient_id == ?patient_id "
-            "| SORT @timestamp DESC "
             "| LIMIT 1"
         ),
         parameters=[
@@ -107,12 +112,15 @@ def ward_patients_by_severity():
 
 
 # ========================================================================
-# RECOVERY TOOLS (2)
+# RECOVERY TOOLS (4)
 # ========================================================================
 
 
 def vitals_trend():
-    """Get hourly-bucketed vital sign trends for a patient."""
+    """Get hourly-bucketed vital sign trends for a patient.
+
+    The 48-hour bound lets Elasticsearch skip every older backing index.
+    """
     return _esql_tool(
         name="vitals_trend",
         description=(
@@ -123,6 +131,7 @@ def vitals_trend():
         query=(
             "FROM metrics-patient-vitals "
             "| WHERE patient_id == ?patient_id "
+            "  AND @timestamp > NOW() - 48 hours "
             "| EVAL bucket = DATE_TRUNC(1 hour, @timestamp) "
             "| STATS "
             "    avg_hr = AVG(heart_rate), "
@@ -132,7 +141,7 @@ def vitals_trend():
             "    avg_temp = AVG(temperature), "
             "    avg_rr = AVG(respiratory_rate), "
             "    avg_pain = AVG(pain_score), "
-            "    readings = COUNT(*) "
+            "    readings = COUNT(heart_rate) "
             "  BY bucket "
             "| SORT bucket ASC"
         ),
@@ -148,7 +157,12 @@ def vitals_trend():
 
 
 def vitals_statistics():
-    """Get min/max/avg statistics for a patient's vitals."""
+    """Get min/max/avg statistics for a patient's vitals.
+
+    Older backing indices are downsampled (see ``templates.vitals_lifecycle``),
+    so a long admission reads hourly/daily summaries; MIN/MAX/AVG/COUNT of a
+    field combine those correctly, ``COUNT(*)`` would count buckets instead.
+    """
     return _esql_tool(
         name="vitals_statistics",
         description=(
@@ -166,7 +180,106 @@ def vitals_statistics():
             "    min_temp = MIN(temperature), max_temp = MAX(temperature), avg_temp = AVG(temperature), "
             "    min_rr = MIN(respiratory_rate), max_rr = MAX(respiratory_rate), avg_rr = AVG(respiratory_rate), "
             "    min_pain = MIN(pain_score), max_pain = MAX(pain_score), avg_pain = AVG(pain_score), "
-            "    total_readings = COUNT(*)"
+            "    total_readings = COUNT(heart_rate)"
+        ),
+        parameters=[
+            {
+                "name": "patient_id",
+                "type": "string",
+                "description": "Patient ID",
+                "required": True,
+            }
+        ],
+    )
+
+
+def vitals_trend_hourly():
+    """Hourly vital sign trend for the whole admission from the hourly rollup.
+
+    Same columns as ``vitals_trend``, read from ``patient-vitals-hourly``
+    (one pre-aggregated row per hour) instead of aggregating raw readings.
+    """
+    return _esql_tool(
+        name="vitals_trend_hourly",
+        description=(
+            "Get hourly-averaged vital sign trends for a patient over the whole "
+            "admission, from the precomputed hourly rollup. Use for multi-day "
+            "recovery analysis; returns the same columns as vitals_trend."
+        ),
+        query=(
+            "FROM patient-vitals-hourly "
+            "| WHERE patient_id == ?patient_id "
+            "| RENAME @timestamp AS bucket, "
+            "    heart_rate_avg AS avg_hr, "
+            "    systolic_bp_avg AS avg_systolic, "
+            "    diastolic_bp_avg AS avg_diastolic, "
+            "    oxygen_saturation_avg AS avg_o2, "
+            "    temperature_avg AS avg_temp, "
+            "    respiratory_rate_avg AS avg_rr, "
+            "    pain_score_avg AS avg_pain, "
+            "    heart_rate_count AS readings "
+            "| KEEP bucket, avg_hr, avg_systolic, avg_diastolic, avg_o2, "
+            "    avg_temp, avg_rr, avg_pain, readings "
+            "| SORT bucket ASC"
+        ),
+        parameters=[
+            {
+                "name": "patient_id",
+                "type": "string",
+                "description": "Patient ID (e.g., PAT-002)",
+                "required": True,
+            }
+        ],
+    )
+
+
+def vitals_statistics_hourly():
+    """Admission-wide min/max/avg statistics from the hourly rollup.
+
+    Averages are weighted by each hour's reading count, so they equal the
+    averages over the raw readings.
+    """
+    return _esql_tool(
+        name="vitals_statistics_hourly",
+        description=(
+            "Get overall vital sign statistics (min, max, average) for a patient "
+            "over the entire admission from the precomputed hourly rollup. "
+            "Same columns as vitals_statistics, fast for long admissions."
+        ),
+        query=(
+            "FROM patient-vitals-hourly "
+            "| WHERE patient_id == ?patient_id "
+            "| EVAL "
+            "    w_hr = heart_rate_avg * heart_rate_count, "
+            "    w_systolic = systolic_bp_avg * systolic_bp_count, "
+            "    w_o2 = oxygen_saturation_avg * oxygen_saturation_count, "
+            "    w_temp = temperature_avg * temperature_count, "
+            "    w_rr = respiratory_rate_avg * respiratory_rate_count, "
+            "    w_pain = pain_score_avg * pain_score_count "
+            "| STATS "
+            "    min_hr = MIN(heart_rate_min), max_hr = MAX(heart_rate_max), "
+            "    sum_hr = SUM(w_hr), n_hr = SUM(heart_rate_count), "
+            "    min_systolic = MIN(systolic_bp_min), max_systolic = MAX(systolic_bp_max), "
+            "    sum_systolic = SUM(w_systolic), n_systolic = SUM(systolic_bp_count), "
+            "    min_o2 = MIN(oxygen_saturation_min), max_o2 = MAX(oxygen_saturation_max), "
+            "    sum_o2 = SUM(w_o2), n_o2 = SUM(oxygen_saturation_count), "
+            "    min_temp = MIN(temperature_min), max_temp = MAX(temperature_max), "
+            "    sum_temp = SUM(w_temp), n_temp = SUM(temperature_count), "
+            "    min_rr = MIN(respiratory_rate_min), max_rr = MAX(respiratory_rate_max), "
+            "    sum_rr = SUM(w_rr), n_rr = SUM(respiratory_rate_count), "
+            "    min_pain = MIN(pain_score_min), max_pain = MAX(pain_score_max), "
+            "    sum_pain = SUM(w_pain), n_pain = SUM(pain_score_count) "
+            "| EVAL "
+            "    avg_hr = sum_hr / n_hr, "
+            "    avg_systolic = sum_systolic / n_systolic, "
+            "    avg_o2 = sum_o2 / n_o2, "
+            "    avg_temp = sum_temp / n_temp, "
+            "    avg_rr = sum_rr / n_rr, "
+            "    avg_pain = sum_pain / n_pain, "
+            "    total_readings = n_hr "
+            "| KEEP min_hr, max_hr, avg_hr, min_systolic, max_systolic, avg_systolic, "
+            "    min_o2, max_o2, avg_o2, min_temp, max_temp, avg_temp, "
+            "    min_rr, max_rr, avg_rr, min_pain, max_pain, avg_pain, total_readings"
         ),
         parameters=[
             {
@@ -387,27 +500,32 @@ def recent_decisions():
 
 
 def critical_patients_scan():
-    """Scan all patients for potential deterioration across the hospital."""
+    """Scan all patients for potential deterioration across the hospital.
+
+    Filters the per-patient latest readings, so the scan touches one
+    document per patient and flags current values, not past peaks.
+    """
     return _esql_tool(
         name="critical_patients_scan",
         description=(
             "PROACTIVE SAFETY SCAN: Get the latest vitals for ALL admitted "
             "patients, flagging any with concerning values (HR > 110, O2 < 92, "
-            "temp > 38.5, RR > 25). Used by Guardian agent for hospital-wide "
-            "safety monitoring."
+            "temp > 38.5, RR > 25) or a total MEWS of 5 or more, highest MEWS "
+            "first. Used by Guardian agent for hospital-wide safety monitoring."
         ),
         query=(
-            "FROM metrics-patient-vitals "
-            "| STATS "
-            "    latest_hr = MAX(heart_rate), "
-            "    latest_o2 = MIN(oxygen_saturation), "
-            "    latest_temp = MAX(temperature), "
-            "    latest_rr = MAX(respiratory_rate), "
-            "    latest_time = MAX(@timestamp) "
-            "  BY patient_id, ward "
-            "| WHERE latest_hr > 110 OR latest_o2 < 92 "
-            "  OR latest_temp > 38.5 OR latest_rr > 25 "
-            "| SORT latest_o2 ASC"
+            "FROM patient-vitals-latest "
+            "| WHERE heart_rate > 110 OR oxygen_saturation < 92 "
+            "  OR temperature > 38.5 OR respiratory_rate > 25 OR mews_total >= 5 "
+            "| EVAL "
+            "    latest_hr = heart_rate, "
+            "    latest_o2 = oxygen_saturation, "
+            "    latest_temp = temperature, "
+            "    latest_rr = respiratory_rate, "
+            "    latest_time = @timestamp "
+            "| KEEP patient_id, ward, mews_total, shock_index, "
+            "    latest_hr, latest_o2, latest_temp, latest_rr, latest_time "
+            "| SORT mews_total DESC, latest_o2 ASC"
         ),
     )
 
@@ -418,15 +536,17 @@ def critical_patients_scan():
 
 
 def all_tools():
-    """Return all 13 ES|QL tool definitions."""
+    """Return all 15 ES|QL tool definitions."""
     return [
         # Triage (3)
         latest_vitals(),
         patient_record(),
         ward_patients_by_severity(),
-        # Recovery (2)
+        # Recovery (4)
         vitals_trend(),
         vitals_statistics(),
+        vitals_trend_hourly(),
+        vitals_statistics_hourly(),
         # Capacity (3)
         ward_status(),
         specific_ward(),
@@ -443,7 +563,9 @@ def all_tools():
 
 # Tool groupings by agent
 TRIAGE_TOOLS = ["latest_vitals", "patient_record", "ward_patients_by_severity"]
-RECOVERY_TOOLS = ["vitals_trend", "vitals_statistics"]
+RECOVERY_TOOLS = [
+    "vitals_trend", "vitals_statistics", "vitals_trend_hourly", "vitals_statistics_hourly",
+]
 CAPACITY_TOOLS = ["ward_status", "specific_ward", "patients_in_ward"]
 DISCHARGE_TOOLS = ["readiness_check", "recent_vitals_stability"]
 GUARDIAN_TOOLS = ["deterioration_check", "recent_decisions", "critical_patients_scan"]
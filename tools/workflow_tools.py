@@ -152,3 +152,28 @@ WORKFLOW_TOOL_NAMES = [
     "update_discharge",
     "update_ward_capacity",
 ]
+
+WORKFLOW_FILES = {
+    "log_decision": "log_agent_decision.yaml",
+    "raise_critical_alert": "critical_alert.yaml",
+    "update_discharge": "update_discharge_status.yaml",
+    "update_ward_capacity": "update_capacity.yaml",
+}
+
+
+def workflow_writes():
+    """Map each workflow tool name to the indices its steps write to.
+
+    Read from the ``elasticsearch.*`` steps of the YAML definitions, so
+    result caches can invalidate the right indices after a workflow runs.
+    """
+    writes = {}
+    for name, filename in WORKFLOW_FILES.items():
+        steps = _load_workflow_yaml(filename).get("steps", [])
+        writes[name] = sorted({
+            step["params"]["index"]
+            for step in steps
+            if step.get("action", "").startswith("elasticsearch.")
+            and "index" in step.get("params", {})
+        })
+    return writes
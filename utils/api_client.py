@@ -1,18 +1,35 @@
 """HTTP client wrapping Elasticsearch and Kibana API calls."""
 
-import json
+import gzip
+import time
+
 import requests
 from config import settings
+from utils import codec
+from utils.esql_result import FORMATS as ESQL_FORMATS, EsqlResult
+from utils.node_pool import NodePool, scheme_of
+from utils.transport import is_idempotent, request_with_retry, shared_session
+
+# Statuses that mean "this node cannot serve now"; try the next one.
+NODE_FAILURE_STATUSES = (502, 503, 504)
 
 
 class PravaahClient:
     """Unified client for Elasticsearch and Kibana APIs."""
 
-    def __init__(self):
+    def __init__(self, cache=None):
         settings.validate()
         self.es_url = settings.ES_URL
+        self.nodes = NodePool(
+            settings.ES_URLS,
+            strategy=settings.ES_POOL_STRATEGY,
+            dead_timeout=settings.ES_DEAD_TIMEOUT,
+            sniff_interval=settings.ES_SNIFF_INTERVAL,
+        )
         self.kibana_url = settings.KIBANA_URL
         self.timeout = settings.REQUEST_TIMEOUT
+        self.session = shared_session()
+        self.cache = cache  # optional utils.cache.QueryCache for ES|QL reads
 
     # -- Headers ----------------------------------------------------------
 
@@ -20,29 +37,107 @@ class PravaahClient:
         return {
             "Authorization": f"ApiKey {settings.ES_API_KEY}",
             "Content-Type": "application/json",
+            "Accept-Encoding": "gzip",
         }
 
     def _kibana_headers(self):
         return {
             "Authorization": f"ApiKey {settings.KIBANA_API_KEY}",
             "Content-Type": "application/json",
+            "Accept-Encoding": "gzip",
             "kbn-xsrf": "true",
             "elastic-api-version": "1",
         }
 
+    # -- Transport --------------------------------------------------------
+
+    def _send(self, method, url, idempotent=None, **kwargs):
+        """Send a request over the pooled session with retry/backoff.
+
+        ``idempotent`` (default: by method) decides whether gateway errors
+        are retried; see ``utils.transport.request_with_retry``.
+        """
+        return request_with_retry(self.session, method, url, idempotent=idempotent, **kwargs)
+
+    def _es_send(self, method, path, idempotent=None, **kwargs):
+        """Send to an Elasticsearch node from the pool, failing over on error.
+
+        Connection failures, timeouts and gateway statuses (502/503/504,
+        after the transport's own retries) mark the node dead. Connection
+        failures move the request to the next node; timeouts and gateway
+        statuses only do so for idempotent requests, since the first node
+        may have applied it. The last response or error is surfaced when
+        every node has been tried.
+        """
+        idempotent = is_idempotent(method, idempotent)
+        if self.nodes.sniff_due():
+            self.sniff_nodes()
+        resp, error = None, None
+        for _ in range(len(self.nodes)):
+            node = self.nodes.acquire()
+            try:
+                resp = self._send(
+                    method, f"{node}/{path.lstrip('/')}", idempotent=idempotent, **kwargs
+                )
+            except requests.exceptions.ConnectionError as e:
+                self.nodes.release(node, ok=False)
+                error = e
+                continue
+            except requests.exceptions.Timeout as e:
+                self.nodes.release(node, ok=False)
+                if not idempotent:
+                    raise
+                error = e
+                continue
+            if resp.status_code in NODE_FAILURE_STATUSES:
+                self.nodes.release(node, ok=False)
+                if idempotent:
+                    continue
+                return resp
+            self.nodes.release(node)
+            return resp
+        if resp is not None:
+            return resp
+        raise error
+
+    def sniff_nodes(self):
+        """Refresh the node pool from the cluster's HTTP publish addresses."""
+        node = self.nodes.acquire()
+        try:
+            resp = self._send(
+                "GET",
+                f"{node}/_nodes/_all/http",
+                headers=self._es_headers(),
+                timeout=self.timeout,
+            )
+            resp.raise_for_status()
+        except requests.exceptions.RequestException:
+            self.nodes.release(node, ok=False)
+            self.nodes.last_sniff = time.monotonic()
+            return self.nodes.urls
+        self.nodes.release(node)
+        return self.nodes.update_from_nodes_info(self._decode(resp), scheme_of(node))
+
+    @staticmethod
+    def _decode(resp):
+        """Decode a JSON response body with the configured codec."""
+        return codec.loads(resp.content) if resp.content else {}
+
     # -- Elasticsearch helpers --------------------------------------------
 
-    def es_request(self, method, path, body=None):
-        url = f"{self.es_url}/{path.lstrip('/')}"
-        resp = requests.request(
+    def es_request(self, method, path, body=None, params=None, idempotent=None):
+        """JSON request to Elasticsearch; pass ``idempotent=True`` for read-only POSTs."""
+        resp = self._es_send(
             method,
-            url,
+            path,
+            idempotent=idempotent,
             headers=self._es_headers(),
-            json=body,
+            data=codec.dumps(body) if body is not None else None,
+            params=params,
             timeout=self.timeout,
         )
         resp.raise_for_status()
-        return resp.json() if resp.text else {}
+        return self._decode(resp)
 
     def create_index(self, name, body):
         """Create an index with given settings/mappings. Ignore if exists."""
@@ -62,29 +157,67 @@ class PravaahClient:
                 return {"acknowledged": True, "note": "not found"}
             raise
 
-    def bulk_index(self, index, docs, pipeline=None, op_type="index"):
-        """Bulk-index a list of dicts into the given index."""
-        lines = []
-        for doc in docs:
-            meta = {op_type: {"_index": index}}
-            lines.append(json.dumps(meta))
-            lines.append(json.dumps(doc))
-        body = "\n".join(lines) + "\n"
+    def bulk_request(self, body, pipeline=None, timeout=None, filter_path=None,
+                     idempotent=False):
+        """POST a pre-encoded NDJSON body to ``_bulk`` and return the response.
+
+        The body is gzip-compressed when ``HTTP_COMPRESS_REQUESTS`` is set.
+        ``filter_path`` trims the response server-side (e.g. drop the
+        per-item ``_id``/``_shards`` noise). Per-item errors are left in
+        the response for the caller to inspect. Pass ``idempotent=True``
+        when every action carries an explicit ``_id`` so gateway errors
+        may be retried.
+        """
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        headers = {
+            "Authorization": f"ApiKey {settings.ES_API_KEY}",
+            "Content-Type": "application/x-ndjson",
+            "Accept-Encoding": "gzip",
+        }
+        if settings.HTTP_COMPRESS_REQUESTS:
+            body = gzip.compress(body, compresslevel=settings.HTTP_GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
 
-        url = f"{self.es_url}/_bulk"
+        params = {}
         if pipeline:
-            url += f"?pipeline={pipeline}"
-        resp = requests.post(
-            url,
-            headers={
-                "Authorization": f"ApiKey {settings.ES_API_KEY}",
-                "Content-Type": "application/x-ndjson",
-            },
+            params["pipeline"] = pipeline
+        if filter_path:
+            params["filter_path"] = filter_path
+        resp = self._es_send(
+            "POST",
+            "/_bulk",
+            idempotent=idempotent,
+            headers=headers,
+            params=params,
             data=body,
-            timeout=60,
+            timeout=timeout or settings.BULK_TIMEOUT,
         )
         resp.raise_for_status()
-        result = resp.json()
+        return self._decode(resp)
+
+    def bulk_index(self, index, docs, pipeline=None, op_type="index", id_field=None):
+        """Bulk-index a list of dicts into the given index.
+
+        With ``id_field`` each document's ``_id`` is taken from that field,
+        so re-running the same load overwrites instead of duplicating.
+        """
+        lines = []
+        for doc in docs:
+            meta = {op_type: {"_index": index}}
+            if id_field:
+                meta[op_type]["_id"] = doc[id_field]
+            lines.append(codec.dumps(meta))
+            lines.append(codec.dumps(doc))
+        body = b"\n".join(lines) + b"\n"
+
+        result = self.bulk_request(
+            body,
+            pipeline=pipeline,
+            filter_path=settings.BULK_FILTER_PATH,
+            idempotent=bool(id_field),
+        )
+        self._invalidate(index)
         if result.get("errors"):
             failed = [
                 item.get(op_type, item.get("index", {})).get("error")
@@ -105,25 +238,104 @@ class PravaahClient:
         path = f"/{index}/_doc"
         if doc_id:
             path += f"/{doc_id}"
-        return self.es_request("POST" if not doc_id else "PUT", path, doc)
+        result = self.es_request("POST" if not doc_id else "PUT", path, doc)
+        self._invalidate(index)
+        return result
+
+    def search(self, index, body, filter_path=None):
+        params = {"filter_path": filter_path} if filter_path else None
+        return self.es_request(
+            "POST", f"/{index}/_search", body, params=params, idempotent=True
+        )
+
+    def msearch(self, searches):
+        """Run several searches in one ``_msearch`` round trip.
+
+        ``searches`` is a list of ``(index, body)`` pairs; returns the list
+        of per-search responses in the same order.
+        """
+        lines = []
+        for index, body in searches:
+            lines.append(codec.dumps({"index": index}))
+            lines.append(codec.dumps(body))
+        resp = self._es_send(
+            "POST",
+            "/_msearch",
+            idempotent=True,
+            headers={**self._es_headers(), "Content-Type": "application/x-ndjson"},
+            data=b"\n".join(lines) + b"\n",
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        return self._decode(resp).get("responses", [])
+
+    def esql_query(self, query, params=None, use_cache=True):
+        """Execute an ES|QL query.
+
+        Served from ``self.cache`` when one is configured and ``use_cache``
+        is true; identical concurrent queries share one request.
+        """
+        body = {"query": query}
+        if params:
+            body["params"] = params
+        if self.cache is not None and use_cache:
+            return self.cache.get_or_load(
+                query,
+                params,
+                lambda: self.es_request("POST", "/_query", body, idempotent=True),
+            )
+        return self.es_request("POST", "/_query", body, idempotent=True)
+
+    def _invalidate(self, index):
+        if self.cache is not None:
+            self.cache.invalidate_index(index)
+
+    def esql_columns(self, query, params=None, format="json"):
+        """Execute an ES|QL query and decode the result into column arrays.
 
-    def search(self, index, body):
-        return self.es_request("POST", f"/{index}/_search", body)
+        ``format="arrow"`` asks Elasticsearch for an Arrow IPC stream and
+        decodes it with pyarrow; ``"json"`` decodes the regular response.
+        Returns an ``EsqlResult``; any other ``format`` raises ``ValueError``.
+        """
+        if format not in ESQL_FORMATS:
+            raise ValueError(f"Unsupported ES|QL format {format!r}; expected one of {ESQL_FORMATS}")
+        if format == "json":
+            return EsqlResult.from_json(self.esql_query(query, params))
 
-    def esql_query(self, query, params=None):
-        """Execute an ES|QL query."""
         body = {"query": query}
         if params:
             body["params"] = params
-        return self.es_request("POST", "/_query", body)
+        resp = self._es_send(
+            "POST",
+            "/_query",
+            idempotent=True,
+            headers={
+                **self._es_headers(),
+                "Accept": "application/vnd.apache.arrow.stream",
+            },
+            params={"format": format},
+            data=codec.dumps(body),
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        return EsqlResult.from_arrow(resp.content)
 
     def put_index_template(self, name, body):
         """Create or update an index template."""
         return self.es_request("PUT", f"/_index_template/{name}", body)
 
     def create_data_stream(self, name):
-        """Create a data stream."""
-        return self.es_request("PUT", f"/_data_stream/{name}")
+        """Create a data stream. Ignore if exists."""
+        try:
+            return self.es_request("PUT", f"/_data_stream/{name}")
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 400 and "already_exists" in e.response.text:
+                return {"acknowledged": True, "note": "already exists"}
+            raise
+
+    def put_data_stream_lifecycle(self, name, lifecycle):
+        """Set the lifecycle (retention, downsampling) of an existing data stream."""
+        return self.es_request("PUT", f"/_data_stream/{name}/_lifecycle", lifecycle)
 
     def delete_data_stream(self, name):
         """Delete a data stream. Ignore if not found."""
@@ -143,19 +355,78 @@ class PravaahClient:
                 return {"acknowledged": True, "note": "not found"}
             raise
 
+    def put_pipeline(self, pipeline_id, body):
+        """Create or update an ingest pipeline."""
+        return self.es_request("PUT", f"/_ingest/pipeline/{pipeline_id}", body)
+
+    def delete_pipeline(self, pipeline_id):
+        """Delete an ingest pipeline. Ignore if not found."""
+        try:
+            return self.es_request("DELETE", f"/_ingest/pipeline/{pipeline_id}")
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 404:
+                return {"acknowledged": True, "note": "not found"}
+            raise
+
+    def put_transform(self, transform_id, body):
+        """Create a transform. Ignore if it already exists."""
+        try:
+            return self.es_request("PUT", f"/_transform/{transform_id}", body)
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 409:
+                return {"acknowledged": True, "note": "already exists"}
+            raise
+
+    def start_transform(self, transform_id):
+        """Start a transform. Ignore if already started."""
+        try:
+            return self.es_request("POST", f"/_transform/{transform_id}/_start")
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 409:
+                return {"acknowledged": True, "note": "already started"}
+            raise
+
+    def stop_transform(self, transform_id):
+        """Stop a transform and wait for it. Ignore if not found."""
+        try:
+            return self.es_request(
+                "POST",
+                f"/_transform/{transform_id}/_stop",
+                params={"wait_for_completion": "true", "allow_no_match": "true"},
+            )
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 404:
+                return {"acknowledged": True, "note": "not found"}
+            raise
+
+    def reset_transform(self, transform_id):
+        """Reset a stopped transform so its next start rebuilds from scratch."""
+        return self.es_request("POST", f"/_transform/{transform_id}/_reset")
+
+    def delete_transform(self, transform_id):
+        """Delete a transform, stopping it first. Ignore if not found."""
+        try:
+            return self.es_request(
+                "DELETE", f"/_transform/{transform_id}", params={"force": "true"}
+            )
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 404:
+                return {"acknowledged": True, "note": "not found"}
+            raise
+
     # -- Kibana helpers ---------------------------------------------------
 
     def kibana_request(self, method, path, body=None):
         url = f"{self.kibana_url}/{path.lstrip('/')}"
-        resp = requests.request(
+        resp = self._send(
             method,
             url,
             headers=self._kibana_headers(),
-            json=body,
+            data=codec.dumps(body) if body is not None else None,
             timeout=self.timeout,
         )
         resp.raise_for_status()
-        return resp.json() if resp.text else {}
+        return self._decode(resp)
 
     # -- Agent Builder: Agents --------------------------------------------
 
@@ -225,9 +496,100 @@ class PravaahClient:
     # -- Agent Builder: Converse (run agent) ------------------------------
 
     def converse(self, agent_id, message):
-        """Send a message to an agent and get a response."""
-        return self.kibana_request(
+        """Send a message to an agent and get a response.
+
+        Workflow tools the agent ran (listed as ``tool_call`` steps in the
+        response) invalidate the cached ES|QL results for the indices they
+        write.
+        """
+        response = self.kibana_request(
             "POST",
             f"/internal/elastic_assistant/agents/{agent_id}/converse",
             {"message": message},
         )
+        if self.cache is not None:
+            for step in response.get("steps", []) if isinstance(response, dict) else []:
+                if step.get("type") == "tool_call":
+                    self.cache.invalidate_workflow(step.get("tool_id", ""))
+        return response
+
+    def converse_stream(self, agent_id, message, stats=None):
+        """Stream an agent's answer as server-sent events.
+
+        Yields one dict per event, ``{"event": name, "data": payload,
+        "elapsed": seconds_since_request}``. Agent Builder emits, among
+        others, ``message_chunk`` (``data["text_chunk"]``), ``tool_call``,
+        ``tool_result`` and ``round_complete``.
+
+        If a ``stats`` dict is passed it is filled in as events arrive:
+        ``ttft`` (seconds to the first message chunk), ``chunks``,
+        ``tool_calls`` (``[{"tool_id", "seconds"}]``, time from call to
+        result) and ``total``.
+        """
+        stats = {} if stats is None else stats
+        stats.update({"ttft": None, "chunks": 0, "tool_calls": [], "total": None})
+        pending_tools = {}
+        start = time.monotonic()
+
+        resp = self._send(
+            "POST",
+            f"{self.kibana_url}/internal/elastic_assistant/agents/{agent_id}/converse/async",
+            headers={**self._kibana_headers(), "Accept": "text/event-stream"},
+            data=codec.dumps({"message": message}),
+            timeout=(self.timeout, settings.STREAM_READ_TIMEOUT),
+            stream=True,
+        )
+        resp.raise_for_status()
+        try:
+            for name, payload in _iter_sse(resp.iter_lines(decode_unicode=True)):
+                elapsed = time.monotonic() - start
+                data = _parse_event_data(payload)
+                inner = data.get("data", data) if isinstance(data, dict) else {}
+
+                if name == "message_chunk":
+                    stats["chunks"] += 1
+                    if stats["ttft"] is None:
+                        stats["ttft"] = round(elapsed, 3)
+                elif name == "tool_call":
+                    pending_tools[inner.get("tool_call_id")] = (inner.get("tool_id"), elapsed)
+                    if self.cache is not None:
+                        self.cache.invalidate_workflow(inner.get("tool_id") or "")
+                elif name == "tool_result":
+                    tool_id, started = pending_tools.pop(
+                        inner.get("tool_call_id"), (inner.get("tool_id"), elapsed)
+                    )
+                    stats["tool_calls"].append(
+                        {"tool_id": tool_id, "seconds": round(elapsed - started, 3)}
+                    )
+
+                yield {"event": name, "data": data, "elapsed": round(elapsed, 3)}
+        finally:
+            stats["total"] = round(time.monotonic() - start, 3)
+            resp.close()
+
+
+def _iter_sse(lines):
+    """Parse a server-sent event stream into ``(event, data)`` pairs."""
+    event, data = "message", []
+    for line in lines:
+        if line is None:
+            continue
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event, data = "message", []
+        elif line.startswith(":"):
+            continue  # comment / keep-alive
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip())
+    if data:
+        yield event, "\n".join(data)
+
+
+def _parse_event_data(payload):
+    try:
+        return codec.loads(payload)
+    except Exception:  # codec backends raise different decode errors
+        return payload
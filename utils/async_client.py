@@ -0,0 +1,262 @@
+"""Asyncio client for Elasticsearch and Kibana APIs.
+
+Async sibling of ``PravaahClient`` for fanning out many ES|QL and converse
+calls from one process. Concurrency is bounded per host by a semaphore so
+a burst of ``asyncio.gather`` calls cannot exhaust the cluster's search
+thread pool, and every call accepts its own timeout.
+
+Usage::
+
+    async with PravaahAsyncClient() as client:
+        results = await asyncio.gather(*(
+            client.esql_query(q, params) for q, params in queries
+        ))
+"""
+
+import asyncio
+import gzip
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from config import settings
+from utils import codec
+from utils.node_pool import NodePool
+from utils.transport import backoff_delay, is_idempotent, retry_statuses
+
+
+class PravaahAsyncClient:
+    """Asyncio client for Elasticsearch and Kibana APIs."""
+
+    def __init__(self, max_per_host=None, timeout=None):
+        settings.validate()
+        self.es_url = settings.ES_URL
+        self.nodes = NodePool(
+            settings.ES_URLS,
+            strategy=settings.ES_POOL_STRATEGY,
+            dead_timeout=settings.ES_DEAD_TIMEOUT,
+        )
+        self.kibana_url = settings.KIBANA_URL
+        self.timeout = timeout or settings.REQUEST_TIMEOUT
+        self.max_per_host = max_per_host or settings.ASYNC_MAX_PER_HOST
+        self._session = None
+        self._semaphores = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        """Close the underlying connection pool."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    # -- Headers ----------------------------------------------------------
+
+    def _es_headers(self):
+        return {
+            "Authorization": f"ApiKey {settings.ES_API_KEY}",
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip",
+        }
+
+    def _kibana_headers(self):
+        return {
+            "Authorization": f"ApiKey {settings.KIBANA_API_KEY}",
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip",
+            "kbn-xsrf": "true",
+            "elastic-api-version": "1",
+        }
+
+    # -- Transport --------------------------------------------------------
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=0,  # bounded by the per-host semaphores instead
+                limit_per_host=self.max_per_host,
+                keepalive_timeout=60,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def _semaphore(self, url):
+        host = urlsplit(url).netloc
+        sem = self._semaphores.get(host)
+        if sem is None:
+            sem = self._semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return sem
+
+    async def _send(self, method, url, headers, json_body=None, data=None,
+                    params=None, timeout=None, idempotent=None):
+        """Send a request, retrying on throttling and gateway errors.
+
+        Gateway errors are only retried for idempotent requests (see
+        ``utils.transport.retry_statuses``); 429 is retried for all.
+
+        Returns the decoded JSON body (``{}`` for an empty body). Raises
+        ``aiohttp.ClientResponseError`` for non-retryable HTTP errors and
+        ``asyncio.TimeoutError`` when the per-call timeout elapses.
+        """
+        session = self._get_session()
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        if json_body is not None:
+            data = codec.dumps(json_body)
+        retryable = retry_statuses(is_idempotent(method, idempotent))
+        attempt = 0
+        semaphore = self._semaphore(url)
+        while True:
+            # The slot is held only while a request is in flight, not
+            # during the backoff sleep, so throttled retries do not starve
+            # other requests to the same host.
+            async with semaphore:
+                async with session.request(
+                    method,
+                    url,
+                    headers=headers,
+                    data=data,
+                    params=params,
+                    timeout=client_timeout,
+                ) as resp:
+                    if (
+                        resp.status in retryable
+                        and attempt < settings.HTTP_MAX_RETRIES
+                    ):
+                        delay = backoff_delay(attempt, resp.headers.get("Retry-After"))
+                    else:
+                        raw = await resp.read()
+                        resp.raise_for_status()
+                        return codec.loads(raw) if raw else {}
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _es_send(self, method, path, headers, idempotent=None, **kwargs):
+        """Send to an Elasticsearch node from the pool, failing over on error.
+
+        Connection failures, timeouts and gateway statuses mark the node
+        dead. Timeouts and gateway statuses fail over only for idempotent
+        requests, since the first node may have applied the request.
+        """
+        idempotent = is_idempotent(method, idempotent)
+        error = None
+        for _ in range(len(self.nodes)):
+            node = self.nodes.acquire()
+            try:
+                result = await self._send(
+                    method, f"{node}/{path.lstrip('/')}", headers,
+                    idempotent=idempotent, **kwargs
+                )
+            except asyncio.TimeoutError as e:
+                # Ahead of ClientConnectionError: aiohttp's ServerTimeoutError
+                # is both, and a timed-out request may have been applied.
+                self.nodes.release(node, ok=False)
+                if not idempotent:
+                    raise
+                error = e
+                continue
+            except aiohttp.ClientConnectionError as e:
+                self.nodes.release(node, ok=False)
+                error = e
+                continue
+            except aiohttp.ClientResponseError as e:
+                failed = e.status in (502, 503, 504)
+                self.nodes.release(node, ok=not failed)
+                if not failed or not idempotent:
+                    raise
+                error = e
+                continue
+            self.nodes.release(node)
+            return result
+        raise error
+
+    # -- Elasticsearch helpers --------------------------------------------
+
+    async def es_request(self, method, path, body=None, params=None, timeout=None,
+                         idempotent=None):
+        return await self._es_send(
+            method, path, self._es_headers(), json_body=body, params=params,
+            timeout=timeout, idempotent=idempotent,
+        )
+
+    async def search(self, index, body, filter_path=None, timeout=None):
+        params = {"filter_path": filter_path} if filter_path else None
+        return await self.es_request(
+            "POST", f"/{index}/_search", body, params=params, timeout=timeout,
+            idempotent=True,
+        )
+
+    async def esql_query(self, query, params=None, timeout=None):
+        """Execute an ES|QL query."""
+        body = {"query": query}
+        if params:
+            body["params"] = params
+        return await self.es_request(
+            "POST", "/_query", body, timeout=timeout, idempotent=True
+        )
+
+    async def bulk_index(self, index, docs, pipeline=None, op_type="index", timeout=None):
+        """Bulk-index a list of dicts into the given index."""
+        lines = []
+        for doc in docs:
+            meta = {op_type: {"_index": index}}
+            lines.append(codec.dumps(meta))
+            lines.append(codec.dumps(doc))
+        body = b"\n".join(lines) + b"\n"
+
+        headers = {
+            "Authorization": f"ApiKey {settings.ES_API_KEY}",
+            "Content-Type": "application/x-ndjson",
+            "Accept-Encoding": "gzip",
+        }
+        if settings.HTTP_COMPRESS_REQUESTS:
+            body = gzip.compress(body, compresslevel=settings.HTTP_GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+
+        params = {"filter_path": settings.BULK_FILTER_PATH}
+        if pipeline:
+            params["pipeline"] = pipeline
+        result = await self._es_send(
+            "POST",
+            "/_bulk",
+            headers,
+            data=body,
+            params=params,
+            timeout=timeout or settings.BULK_TIMEOUT,
+        )
+        if result.get("errors"):
+            failed = [
+                item.get(op_type, item.get("index", {})).get("error")
+                for item in result["items"]
+                if "error" in item.get(op_type, item.get("index", {}))
+            ]
+            if failed:
+                raise RuntimeError(
+                    f"Bulk indexing errors ({len(failed)}): {failed[:3]}"
+                )
+        return {
+            "indexed": len(docs),
+            "errors": result.get("errors", False),
+        }
+
+    # -- Kibana helpers ---------------------------------------------------
+
+    async def kibana_request(self, method, path, body=None, timeout=None):
+        url = f"{self.kibana_url}/{path.lstrip('/')}"
+        return await self._send(
+            method, url, self._kibana_headers(), json_body=body, timeout=timeout
+        )
+
+    # -- Agent Builder: Converse (run agent) ------------------------------
+
+    async def converse(self, agent_id, message, timeout=None):
+        """Send a message to an agent and get a response."""
+        return await self.kibana_request(
+            "POST",
+            f"/internal/elastic_assistant/agents/{agent_id}/converse",
+            {"message": message},
+            timeout=timeout,
+        )
@@ -0,0 +1,379 @@
+"""Streaming, parallel bulk indexer.
+
+``streaming_bulk`` accepts any iterable (including generators) of documents
+and never materialises more than ``max_in_flight`` chunks at a time, so it
+can load tens of millions of vitals with constant memory. Chunks are
+bounded by both document count and encoded byte size. Items rejected with
+HTTP 429 are retried on their own; every other item-level failure is
+collected into the returned report instead of aborting the load.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from config import settings
+from utils import codec
+from utils.transport import backoff_delay
+
+
+def encode_action(index, doc, op_type="index", doc_id=None):
+    """Encode one bulk action (metadata line + source line) as bytes."""
+    meta = {op_type: {"_index": index}}
+    if doc_id is not None:
+        meta[op_type]["_id"] = doc_id
+    return codec.dumps(meta) + b"\n" + codec.dumps(doc) + b"\n"
+
+
+def chunk_actions(
+    index,
+    docs,
+    op_type="index",
+    chunk_size=None,
+    max_chunk_bytes=None,
+    controller=None,
+    id_fn=None,
+):
+    """Yield lists of ``(doc, encoded_action)`` pairs.
+
+    A chunk is closed when it reaches ``chunk_size`` documents or when
+    adding the next action would exceed ``max_chunk_bytes``. A single
+    action larger than ``max_chunk_bytes`` is sent in a chunk of its own.
+    When a ``controller`` is given its current ``batch_size`` is used
+    instead of ``chunk_size`` and re-read for every chunk. ``id_fn(doc)``,
+    when given, supplies each action's ``_id``. Items that are already
+    ``bytes`` are taken as encoded actions (e.g. from
+    ``VitalsBatch.to_actions``) and passed through unchanged.
+    """
+    chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+    max_chunk_bytes = max_chunk_bytes or settings.BULK_MAX_CHUNK_BYTES
+    limit = controller.batch_size if controller else chunk_size
+    chunk = []
+    chunk_bytes = 0
+    for doc in docs:
+        if isinstance(doc, bytes):
+            action = doc
+        else:
+            action = encode_action(index, doc, op_type, id_fn(doc) if id_fn else None)
+        if chunk and (
+            len(chunk) >= limit or chunk_bytes + len(action) > max_chunk_bytes
+        ):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+            if controller:
+                limit = controller.batch_size
+        chunk.append((doc, action))
+        chunk_bytes += len(action)
+    if chunk:
+        yield chunk
+
+
+def _failure(doc, status, error):
+    return {"doc": doc, "status": status, "error": error}
+
+
+def send_chunk(client, chunk, pipeline=None, max_retries=None):
+    """Send one chunk, retrying only the items rejected with 429.
+
+    Returns a partial report with ``docs``, ``indexed``, ``retried``,
+    ``rejected`` (429 responses seen), ``failed``, the number of
+    ``attempts``, the summed server-side ``took`` (ms) and the wall-clock
+    ``latency`` (s) of the chunk.
+    """
+    if max_retries is None:
+        max_retries = settings.BULK_MAX_RETRIES
+    part = {
+        "docs": len(chunk),
+        "indexed": 0,
+        "retried": 0,
+        "rejected": 0,
+        "failed": [],
+        "took": 0,
+        "attempts": 0,
+    }
+    start = time.monotonic()
+    pending = chunk
+    attempt = 0
+    while pending:
+        body = b"".join(action for _, action in pending)
+        part["attempts"] += 1
+        try:
+            result = client.bulk_request(
+                body, pipeline=pipeline, filter_path=settings.BULK_FILTER_PATH
+            )
+        except requests.exceptions.RequestException as e:
+            status = e.response.status_code if e.response is not None else None
+            part["failed"].extend(_failure(doc, status, str(e)) for doc, _ in pending)
+            break
+
+        part["took"] += result.get("took", 0)
+        rejected = []
+        for pair, item in zip(pending, result.get("items", [])):
+            info = next(iter(item.values()))
+            if "error" not in info:
+                part["indexed"] += 1
+            elif info.get("status") == 429:
+                rejected.append(pair)
+            else:
+                part["failed"].append(_failure(pair[0], info.get("status"), info["error"]))
+
+        part["rejected"] += len(rejected)
+        if rejected and attempt >= max_retries:
+            part["failed"].extend(
+                _failure(doc, 429, f"rejected after {max_retries} retries")
+                for doc, _ in rejected
+            )
+            break
+        if rejected:
+            part["retried"] += len(rejected)
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+        pending = rejected
+    part["latency"] = time.monotonic() - start
+    return part
+
+
+def new_report():
+    """Return an empty report for accumulating ``send_chunk`` results."""
+    return {"indexed": 0, "retried": 0, "rejected": 0, "chunks": 0, "failed": []}
+
+
+def merge_part(report, part, controller=None):
+    """Fold one ``send_chunk`` result into ``report`` (and the controller)."""
+    report["indexed"] += part["indexed"]
+    report["retried"] += part["retried"]
+    report["rejected"] += part["rejected"]
+    report["failed"].extend(part["failed"])
+    report["chunks"] += 1
+    if controller:
+        controller.observe(part)
+
+
+def split_conflicts(failed):
+    """Split failures into ``(conflicts, others)``.
+
+    With ``op_type="create"`` a 409 means the document is already indexed -
+    for TSDS vitals, whose ``_id`` is derived from the dimensions and
+    ``@timestamp``, that is how a re-run load recognises finished work.
+    """
+    conflicts = [f for f in failed if f["status"] == 409]
+    others = [f for f in failed if f["status"] != 409]
+    return conflicts, others
+
+
+def is_retryable(failure):
+    """Whether a failure may succeed if sent again.
+
+    No status (the request never got an answer), 429 after the chunk's own
+    retries and 5xx are about the cluster, not the document; other 4xx
+    (mapping, validation) would fail the same way again.
+    """
+    status = failure["status"]
+    return status is None or status == 429 or status >= 500
+
+
+def split_retryable(failed):
+    """Split failures into ``(retryable, permanent)``; see ``is_retryable``."""
+    retryable = [f for f in failed if is_retryable(f)]
+    permanent = [f for f in failed if not is_retryable(f)]
+    return retryable, permanent
+
+
+class BulkRetryError(RuntimeError):
+    """Documents failed for a reason a later retry may fix.
+
+    ``failed`` holds the retryable failures (their ``doc`` entries are what
+    to send again); ``result`` is whatever the raising call would otherwise
+    have returned, with the permanent failures.
+    """
+
+    def __init__(self, failed, result=None):
+        first = failed[0]
+        super().__init__(
+            f"{len(failed)} documents failed ({first['status']}: {first['error']})"
+        )
+        self.failed = failed
+        self.result = result
+
+
+def streaming_bulk(
+    client,
+    index,
+    docs,
+    op_type="index",
+    pipeline=None,
+    chunk_size=None,
+    max_chunk_bytes=None,
+    max_in_flight=None,
+    max_retries=None,
+    controller=None,
+    id_fn=None,
+    on_chunk=None,
+):
+    """Stream ``docs`` into ``index`` with several bulk requests in flight.
+
+    Parameters
+    ----------
+    client : utils.api_client.PravaahClient
+        Client used to send each ``_bulk`` request.
+    docs : iterable[dict | bytes]
+        Any iterable of documents or pre-encoded actions; consumed lazily.
+    max_in_flight : int
+        Number of concurrent bulk requests (defaults to BULK_MAX_IN_FLIGHT).
+    controller : AdaptiveBatchController, optional
+        When given, chunk size and in-flight count follow the controller
+        instead of ``chunk_size``/``max_in_flight``, and its ``report()``
+        is attached to the result under ``"adaptive"``.
+    id_fn : callable, optional
+        Maps a document to its ``_id``; by default Elasticsearch assigns one.
+    on_chunk : callable, optional
+        Called as ``on_chunk(chunk, part)`` in the calling thread once each
+        chunk (its ``(doc, action)`` pairs) has been answered, e.g. to
+        checkpoint finished work while the stream is still running.
+
+    Returns a report dict with ``indexed``, ``retried``, ``rejected``,
+    ``chunks``, ``elapsed``, ``docs_per_sec`` and ``failed`` - a list of
+    ``{"doc", "status", "error"}`` entries for items that were not indexed.
+    """
+    max_in_flight = max_in_flight or settings.BULK_MAX_IN_FLIGHT
+    pool_size = controller.max_in_flight if controller else max_in_flight
+    report = new_report()
+    start = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=pool_size) as pool:
+        in_flight = {}  # future -> chunk
+
+        def settle(done):
+            for future in done:
+                chunk = in_flight.pop(future)
+                part = future.result()
+                merge_part(report, part, controller)
+                if on_chunk:
+                    on_chunk(chunk, part)
+
+        chunks = chunk_actions(
+            index, docs, op_type, chunk_size, max_chunk_bytes, controller, id_fn
+        )
+        for chunk in chunks:
+            limit = controller.in_flight if controller else max_in_flight
+            while len(in_flight) >= limit:
+                settle(wait(in_flight, return_when=FIRST_COMPLETED).done)
+                limit = controller.in_flight if controller else max_in_flight
+            in_flight[pool.submit(send_chunk, client, chunk, pipeline, max_retries)] = chunk
+        settle(wait(in_flight).done)
+
+    report["elapsed"] = round(time.monotonic() - start, 3)
+    report["docs_per_sec"] = round(report["indexed"] / max(report["elapsed"], 1e-9), 1)
+    if controller:
+        report["adaptive"] = controller.report()
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Adaptive batch sizing
+# ---------------------------------------------------------------------------
+
+
+class AdaptiveBatchController:
+    """AIMD controller for bulk batch size and in-flight request count.
+
+    Feed it the partial report of every completed chunk via ``observe``.
+
+    - Any 429 rejection halves the batch size and drops one in-flight
+      request (multiplicative decrease).
+    - A server ``took`` above ``1.5 * target_took_ms`` shrinks the batch
+      by a quarter; the cluster is saturated but not yet rejecting.
+    - A ``took`` below the target grows the batch by ``growth``.
+    - Once the batch size can no longer grow (it is at the maximum, or
+      ``took`` sits between the target and the shrink threshold),
+      ``patience`` consecutive chunks without rejections add one
+      in-flight request (additive increase).
+
+    Throughput is measured over a sliding window of recent chunks so that
+    ``report()["steady_docs_per_sec"]`` reflects the tuned state rather
+    than the warm-up.
+    """
+
+    def __init__(
+        self,
+        batch_size=None,
+        min_batch_size=100,
+        max_batch_size=10000,
+        in_flight=2,
+        min_in_flight=1,
+        max_in_flight=None,
+        target_took_ms=None,
+        growth=1.25,
+        patience=5,
+        window=20,
+    ):
+        self.batch_size = batch_size or settings.BULK_CHUNK_SIZE
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.in_flight = in_flight
+        self.min_in_flight = min_in_flight
+        self.max_in_flight = max_in_flight or settings.BULK_MAX_IN_FLIGHT * 2
+        self.target_took_ms = target_took_ms or settings.BULK_TARGET_TOOK_MS
+        self.growth = growth
+        self.patience = patience
+        self.adjustments = 0
+        self._healthy = 0
+        self._samples = deque(maxlen=window)
+        self._start = time.monotonic()
+        self._indexed = 0
+        self._lock = threading.Lock()
+
+    def observe(self, part):
+        """Update the batch size and in-flight count from one chunk result."""
+        with self._lock:
+            now = time.monotonic()
+            self._indexed += part["indexed"]
+            self._samples.append((now, part["indexed"]))
+
+            # ``took`` is summed over retries; normalise to one request.
+            took = part["took"] / max(part["attempts"], 1)
+            before = (self.batch_size, self.in_flight)
+
+            if part["rejected"]:
+                self._healthy = 0
+                self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+                self.in_flight = max(self.min_in_flight, self.in_flight - 1)
+            elif took > self.target_took_ms * 1.5:
+                self._healthy = 0
+                self.batch_size = max(self.min_batch_size, int(self.batch_size * 0.75))
+            elif took < self.target_took_ms and self.batch_size < self.max_batch_size:
+                self.batch_size = min(
+                    self.max_batch_size, int(self.batch_size * self.growth) + 1
+                )
+            else:
+                self._healthy += 1
+                if self._healthy >= self.patience:
+                    self._healthy = 0
+                    self.in_flight = min(self.max_in_flight, self.in_flight + 1)
+
+            if (self.batch_size, self.in_flight) != before:
+                self.adjustments += 1
+
+    def steady_docs_per_sec(self):
+        """Docs/sec over the sliding window of most recent chunks."""
+        with self._lock:
+            if len(self._samples) < 2:
+                return 0.0
+            span = self._samples[-1][0] - self._samples[0][0]
+            docs = sum(n for _, n in list(self._samples)[1:])
+            return round(docs / span, 1) if span > 0 else 0.0
+
+    def report(self):
+        """Return the current tuning state and measured throughput."""
+        elapsed = max(time.monotonic() - self._start, 1e-9)
+        return {
+            "batch_size": self.batch_size,
+            "in_flight": self.in_flight,
+            "adjustments": self.adjustments,
+            "docs_per_sec": round(self._indexed / elapsed, 1),
+            "steady_docs_per_sec": self.steady_docs_per_sec(),
+        }
@@ -0,0 +1,173 @@
+"""Client-side TTL cache for ES|QL results.
+
+Within one orchestrator run the same tool queries (``patient_record``,
+``latest_vitals``, ``ward_status`` ...) are issued repeatedly with
+identical parameters. ``QueryCache`` keys results on the normalised query
+text plus parameters, expires them with a per-index TTL, evicts the least
+recently used entry when full, and coalesces identical concurrent queries
+into a single request ("single flight").
+
+Entries are dropped when something writes to an index they read from:
+``PravaahClient`` invalidates on its own writes, and workflow tool calls
+seen in converse responses invalidate the indices those workflows write
+(see ``tools.workflow_tools.workflow_writes``).
+
+Cached responses are shared between callers and must be treated as
+read-only.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from config import settings
+from utils import codec
+
+_FROM_RE = re.compile(r"^\s*FROM\s+([^|]+)", re.IGNORECASE)
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_query(query):
+    """Collapse whitespace so formatting differences share a cache entry."""
+    return _WS_RE.sub(" ", query).strip()
+
+
+def query_indices(query):
+    """Return the index names/patterns in an ES|QL ``FROM`` clause."""
+    match = _FROM_RE.match(query)
+    if not match:
+        return ()
+    source = match.group(1).split(" METADATA ")[0]
+    return tuple(part.strip() for part in source.split(",") if part.strip())
+
+
+def _matches(pattern, index):
+    if pattern.endswith("*"):
+        return index.startswith(pattern[:-1])
+    return pattern == index
+
+
+class _Flight:
+    """A query in progress; later callers wait on it instead of re-sending."""
+
+    def __init__(self, indices):
+        self.indices = indices
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class QueryCache:
+    """Thread-safe TTL + LRU cache with single-flight loading."""
+
+    def __init__(self, max_entries=None, ttls=None, default_ttl=None, workflow_writes=None):
+        """``workflow_writes`` maps workflow tool names to the indices they
+        write; by default it is read from the workflow definitions."""
+        self.max_entries = max_entries or settings.CACHE_MAX_ENTRIES
+        self.ttls = dict(settings.CACHE_TTLS if ttls is None else ttls)
+        self.default_ttl = settings.CACHE_DEFAULT_TTL if default_ttl is None else default_ttl
+        if workflow_writes is None:
+            from tools.workflow_tools import workflow_writes as load_workflow_writes
+
+            workflow_writes = load_workflow_writes()
+        self.workflow_writes = dict(workflow_writes)
+        self._entries = OrderedDict()  # key -> (expires_at, indices, result)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def key(self, query, params=None):
+        return normalize_query(query) + "\x00" + codec.dumps(params or []).decode("utf-8")
+
+    def _ttl(self, indices):
+        ttls = [self.ttls.get(i, self.default_ttl) for i in indices]
+        return min(ttls) if ttls else self.default_ttl
+
+    def get_or_load(self, query, params, loader):
+        """Return the cached result for ``query``/``params`` or call ``loader``.
+
+        Concurrent callers with the same key share one ``loader()`` call;
+        if it raises, every waiter sees the same exception and nothing is
+        cached.
+        """
+        key = self.key(query, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight(query_indices(query))
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = loader()
+        except Exception as e:
+            flight.error = e
+            raise
+        else:
+            with self._lock:
+                # Skip storing if an invalidation raced with the load.
+                if self._flights.get(key) is flight:
+                    expires = time.monotonic() + self._ttl(flight.indices)
+                    self._entries[key] = (expires, flight.indices, flight.result)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            return flight.result
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    def invalidate_index(self, index):
+        """Drop every entry (and in-flight load) that reads from ``index``."""
+        with self._lock:
+            stale = [
+                k for k, (_, indices, _) in self._entries.items()
+                if any(_matches(p, index) for p in indices)
+            ]
+            for k in stale:
+                del self._entries[k]
+            for k in [k for k, f in self._flights.items()
+                      if any(_matches(p, index) for p in f.indices)]:
+                del self._flights[k]
+        return len(stale)
+
+    def invalidate_workflow(self, tool_name):
+        """Invalidate the indices written by a workflow tool.
+
+        ``tool_name`` may carry a namespace prefix (``ns.log_decision``).
+        """
+        indices = self.workflow_writes.get(tool_name)
+        if indices is None:
+            indices = self.workflow_writes.get(tool_name.rsplit(".", 1)[-1], ())
+        return sum(self.invalidate_index(i) for i in indices)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
@@ -0,0 +1,62 @@
+"""Pluggable JSON codec for Elasticsearch/Kibana traffic.
+
+Picks the fastest available backend - ``orjson``, then ``msgspec``, then
+the stdlib ``json`` module - unless ``JSON_CODEC`` pins one. All backends
+expose the same two functions:
+
+- ``dumps(obj) -> bytes``: compact UTF-8 JSON
+- ``loads(data) -> object``: accepts ``bytes`` or ``str``
+"""
+
+import json
+
+from config import settings
+
+
+def _stdlib_backend():
+    def dumps(obj):
+        return json.dumps(obj, separators=(",", ":"), default=str).encode("utf-8")
+
+    return "json", dumps, json.loads
+
+
+def _orjson_backend():
+    import orjson
+
+    def dumps(obj):
+        return orjson.dumps(obj, default=str)
+
+    return "orjson", dumps, orjson.loads
+
+
+def _msgspec_backend():
+    import msgspec
+
+    encoder = msgspec.json.Encoder(enc_hook=str)
+    return "msgspec", encoder.encode, msgspec.json.decode
+
+
+BACKENDS = {
+    "orjson": _orjson_backend,
+    "msgspec": _msgspec_backend,
+    "json": _stdlib_backend,
+}
+
+
+def load_backend(name="auto"):
+    """Return ``(name, dumps, loads)`` for the requested backend.
+
+    ``"auto"`` tries orjson, msgspec and json in that order. Naming a
+    backend that is not installed raises ``ImportError``.
+    """
+    if name != "auto":
+        return BACKENDS[name]()
+    for candidate in ("orjson", "msgspec"):
+        try:
+            return BACKENDS[candidate]()
+        except ImportError:
+            continue
+    return _stdlib_backend()
+
+
+BACKEND, dumps, loads = load_backend(settings.JSON_CODEC)
@@ -0,0 +1,155 @@
+"""Elasticsearch endpoint pool with load balancing and failover.
+
+``NodePool`` spreads requests over several coordinating nodes:
+
+- ``round_robin`` cycles through live nodes;
+- ``least_outstanding`` picks the live node with the fewest requests
+  currently in flight from this process.
+
+A node that fails (connection error, timeout or gateway status) is marked
+dead and skipped until its resurrection time, which backs off
+exponentially with consecutive failures. When every node is dead the one
+due soonest is tried anyway, so a full outage recovers without a restart.
+
+With sniffing enabled the pool periodically replaces its node list with
+the HTTP publish addresses reported by ``GET /_nodes/_all/http``.
+"""
+
+import itertools
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class _Node:
+    def __init__(self, url):
+        self.url = url
+        self.outstanding = 0
+        self.failures = 0
+        self.dead_until = 0.0
+
+    def alive(self, now):
+        return self.dead_until <= now
+
+
+class NodePool:
+    """Thread-safe pool of Elasticsearch base URLs."""
+
+    STRATEGIES = ("round_robin", "least_outstanding")
+
+    def __init__(self, urls, strategy="round_robin", dead_timeout=60.0,
+                 max_dead_timeout=600.0, sniff_interval=0):
+        if not urls:
+            raise ValueError("NodePool needs at least one URL")
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}; use one of {self.STRATEGIES}")
+        self.strategy = strategy
+        self.dead_timeout = dead_timeout
+        self.max_dead_timeout = max_dead_timeout
+        self.sniff_interval = sniff_interval
+        self.last_sniff = time.monotonic()
+        self._lock = threading.Lock()
+        self._set_nodes(urls)
+
+    def _set_nodes(self, urls):
+        existing = {n.url: n for n in getattr(self, "_nodes", [])}
+        self._nodes = [existing.get(u) or _Node(u) for u in dict.fromkeys(urls)]
+        self._cycle = itertools.cycle(range(len(self._nodes)))
+
+    @property
+    def urls(self):
+        return [n.url for n in self._nodes]
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def acquire(self):
+        """Pick a node for the next request and count it as outstanding."""
+        with self._lock:
+            now = time.monotonic()
+            live = [n for n in self._nodes if n.alive(now)]
+            if not live:
+                node = min(self._nodes, key=lambda n: n.dead_until)
+            elif self.strategy == "least_outstanding":
+                node = min(live, key=lambda n: n.outstanding)
+            else:
+                for _ in range(len(self._nodes)):
+                    node = self._nodes[next(self._cycle)]
+                    if node.alive(now):
+                        break
+            node.outstanding += 1
+            return node.url
+
+    def _find(self, url):
+        for node in self._nodes:
+            if node.url == url:
+                return node
+        return None
+
+    def release(self, url, ok=True):
+        """Return a node after a request; ``ok=False`` marks it dead."""
+        with self._lock:
+            node = self._find(url)
+            if node is None:
+                return  # dropped by a sniff while the request was in flight
+            node.outstanding = max(0, node.outstanding - 1)
+            if ok:
+                node.failures = 0
+                node.dead_until = 0.0
+            else:
+                node.failures += 1
+                timeout = min(
+                    self.max_dead_timeout,
+                    self.dead_timeout * (2 ** (node.failures - 1)),
+                )
+                node.dead_until = time.monotonic() + timeout
+
+    def live_count(self):
+        now = time.monotonic()
+        return sum(1 for n in self._nodes if n.alive(now))
+
+    def sniff_due(self):
+        return bool(self.sniff_interval) and (
+            time.monotonic() - self.last_sniff >= self.sniff_interval
+        )
+
+    def update_from_nodes_info(self, nodes_info, scheme="https"):
+        """Replace the node list from a ``GET /_nodes/_all/http`` response.
+
+        Dedicated master nodes are skipped. If no usable address is found
+        the current list is kept.
+        """
+        urls = []
+        for info in nodes_info.get("nodes", {}).values():
+            roles = set(info.get("roles", []))
+            if roles and roles <= {"master", "voting_only"}:
+                continue
+            address = info.get("http", {}).get("publish_address")
+            if not address:
+                continue
+            # "hostname/1.2.3.4:9200" - prefer the hostname so TLS verifies
+            hostname, _, ip_port = address.rpartition("/")
+            port = ip_port.rsplit(":", 1)[-1]
+            urls.append(f"{scheme}://{hostname}:{port}" if hostname else f"{scheme}://{ip_port}")
+        with self._lock:
+            self.last_sniff = time.monotonic()
+            if urls:
+                self._set_nodes(urls)
+        return self.urls
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "url": n.url,
+                    "alive": n.alive(now),
+                    "outstanding": n.outstanding,
+                    "failures": n.failures,
+                }
+                for n in self._nodes
+            ]
+
+
+def scheme_of(url):
+    return urlsplit(url).scheme or "https"
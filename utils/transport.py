@@ -0,0 +1,117 @@
+"""Pooled, keep-alive HTTP transport shared by all Pravaah clients.
+
+Every ``PravaahClient`` in a process shares one ``requests.Session`` so
+that tool calls, bulk batches and converse requests reuse warm TCP/TLS
+connections instead of paying a fresh handshake per call.
+"""
+
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import settings
+
+# Methods that can be repeated without changing the outcome
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def build_session(pool_connections=None, pool_maxsize=None):
+    """Create a session with a keep-alive connection pool per host.
+
+    ``pool_connections`` is the number of distinct hosts whose pools are
+    cached; ``pool_maxsize`` is the number of connections kept alive per
+    host and should be at least the number of threads issuing requests.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections or settings.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize or settings.HTTP_POOL_MAXSIZE,
+        pool_block=settings.HTTP_POOL_BLOCK,
+        max_retries=0,  # retries are handled by request_with_retry
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+def shared_session():
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def close_shared_session():
+    """Close the process-wide session and drop its pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Seconds to wait before retry number ``attempt`` (0-based).
+
+    Uses "full jitter" exponential backoff: a uniform draw between zero
+    and ``HTTP_BACKOFF_BASE * 2**attempt``, capped at ``HTTP_BACKOFF_MAX``.
+    A server-supplied ``Retry-After`` (in seconds) is honoured as a floor.
+    """
+    ceiling = min(settings.HTTP_BACKOFF_MAX, settings.HTTP_BACKOFF_BASE * (2 ** attempt))
+    delay = random.uniform(0, ceiling)
+    if retry_after:
+        try:
+            delay = max(delay, min(float(retry_after), settings.HTTP_BACKOFF_MAX))
+        except ValueError:
+            pass  # HTTP-date form; fall back to the jittered delay
+    return delay
+
+
+def is_idempotent(method, idempotent=None):
+    """Whether a request may be repeated safely; defaults by HTTP method."""
+    return method.upper() in IDEMPOTENT_METHODS if idempotent is None else idempotent
+
+
+def retry_statuses(idempotent):
+    """Statuses worth retrying: 429 always, gateway errors only if idempotent.
+
+    A 502/503/504 from a proxy often means the request was applied anyway,
+    so repeating a POST could index a document or run an agent turn twice.
+    """
+    if idempotent:
+        return settings.HTTP_RETRY_STATUSES
+    return tuple(s for s in settings.HTTP_RETRY_STATUSES if s == 429)
+
+
+def request_with_retry(session, method, url, max_retries=None, idempotent=None, **kwargs):
+    """Send a request, retrying on throttling and gateway errors.
+
+    Responses whose status is in ``HTTP_RETRY_STATUSES`` (429/502/503/504
+    by default) are retried with jittered exponential backoff - 429 for
+    every request, the gateway errors only for idempotent ones (GET, HEAD,
+    PUT, DELETE, or ``idempotent=True`` for read-only POSTs such as
+    searches). The final response is returned as-is; callers still call
+    ``raise_for_status``.
+    """
+    if max_retries is None:
+        max_retries = settings.HTTP_MAX_RETRIES
+    retryable = retry_statuses(is_idempotent(method, idempotent))
+    attempt = 0
+    while True:
+        resp = session.request(method, url, **kwargs)
+        if resp.status_code not in retryable or attempt >= max_retries:
+            return resp
+        delay = backoff_delay(attempt, resp.headers.get("Retry-After"))
+        resp.close()
+        time.sleep(delay)
+        attempt += 1